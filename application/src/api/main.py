@@ -1,19 +1,43 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from pydantic import BaseModel
 from typing import List, Dict, Optional
+from contextlib import asynccontextmanager
 from datetime import datetime
+import time
 import uvicorn
 from ..services.fraud_detection_service import FraudDetectionService
+from ..monitoring.metrics import CONTENT_TYPE_LATEST, REQUEST_SECONDS, render_metrics
+from ..monitoring.streaming_monitor import DEFAULT_SCORE_EDGES, MonitorSidecar, StreamingMonitor
+from ..monitoring.tracing import current_span, tracer
+
+# Initialize monitoring sidecar and service
+monitor_sidecar = MonitorSidecar(StreamingMonitor(
+    window_size=1000,
+    feature_edges={
+        'amount': [10, 25, 50, 100, 250, 500, 1000, 2500, 5000],
+        'ml_prediction': DEFAULT_SCORE_EDGES,
+        'llm_risk_score': DEFAULT_SCORE_EDGES
+    },
+    min_precision=0.5,
+    min_recall=0.5
+))
+fraud_service = FraudDetectionService(monitor=monitor_sidecar)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    monitor_sidecar.start()
+    try:
+        yield
+    finally:
+        await monitor_sidecar.stop()
 
 app = FastAPI(
     title="AI-Powered Fraud Detection API",
     description="API for detecting fraudulent transactions using ML and LLM",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-# Initialize service
-fraud_service = FraudDetectionService()
-
 class Transaction(BaseModel):
     transaction_id: str
     amount: float
@@ -21,11 +45,13 @@ class Transaction(BaseModel):
     location: str
     timestamp: datetime
     customer_history: Optional[Dict] = None
+    # Needed for reusing analyses of the same customer's near-duplicate transactions
+    customer_id: Optional[str] = None
 
 class TransactionResponse(BaseModel):
     transaction_id: str
     timestamp: str
-    ml_prediction: Dict
+    ml_prediction: float
     llm_analysis: Dict
     combined_risk_score: float
     fraud_indicators: List[str]
@@ -37,11 +63,37 @@ class BatchResponse(BaseModel):
     batch_report: Optional[str] = None
     high_risk_count: int
 
+class FraudLabel(BaseModel):
+    transaction_id: str
+    is_fraud: bool
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    with tracer.start_span(f"HTTP {request.method} {request.url.path}") as span:
+        span.set_attribute('http.method', request.method)
+        span.set_attribute('http.target', request.url.path)
+        response = await call_next(request)
+        span.set_attribute('http.status_code', response.status_code)
+        return response
+
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    start = time.perf_counter()
+    try:
+        return await call_next(request)
+    finally:
+        # Label by route template (set during routing) to keep label cardinality bounded
+        route = request.scope.get('route')
+        endpoint = getattr(route, 'path', None) or 'unmatched'
+        REQUEST_SECONDS.labels(endpoint=endpoint).observe(time.perf_counter() - start)
+
 @app.post("/analyze", response_model=TransactionResponse)
 async def analyze_transaction(transaction: Transaction):
     """
     Analyze a single transaction for potential fraud.
     """
+    # Time between the request span start and this event is body parsing and validation
+    current_span().add_event('request.validated')
     try:
         result = await fraud_service.analyze_transaction(transaction.dict())
         return result
@@ -53,12 +105,35 @@ async def analyze_batch(transactions: List[Transaction]):
     """
     Analyze multiple transactions for potential fraud.
     """
+    current_span().add_event('request.validated')
     try:
         result = await fraud_service.analyze_batch([tx.dict() for tx in transactions])
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/feedback")
+async def record_feedback(label: FraudLabel):
+    """
+    Record a confirmed fraud label for a previously analyzed transaction.
+    """
+    matched = monitor_sidecar.record_label(label.transaction_id, label.is_fraud)
+    return {"transaction_id": label.transaction_id, "matched": matched}
+
+@app.get("/monitoring")
+async def monitoring_snapshot():
+    """
+    Current drift and performance monitoring state.
+    """
+    return monitor_sidecar.snapshot()
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Service metrics in the Prometheus text exposition format.
+    """
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
 @app.get("/health")
 async def health_check():
     """
@@ -0,0 +1,3 @@
+"""
+Configuration for the fraud detection service
+"""
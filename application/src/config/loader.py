@@ -0,0 +1,25 @@
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import yaml
+
+# application/config/settings.yaml, shipped next to src/ in the container image
+DEFAULT_SETTINGS_PATH = Path(__file__).resolve().parents[2] / 'config' / 'settings.yaml'
+
+
+def load_settings(path: Optional[str] = None) -> Dict[str, Any]:
+    """Load the service settings.
+
+    Args:
+        path: Settings file; defaults to the FRAUD_SETTINGS_PATH environment
+            variable, then to the bundled config/settings.yaml
+
+    Returns:
+        Parsed settings, or an empty dictionary if the file does not exist
+    """
+    settings_path = Path(path or os.getenv('FRAUD_SETTINGS_PATH', DEFAULT_SETTINGS_PATH))
+    if not settings_path.exists():
+        return {}
+    with open(settings_path, 'r') as file:
+        return yaml.safe_load(file) or {}
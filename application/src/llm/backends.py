@@ -0,0 +1,205 @@
+import asyncio
+import functools
+import hashlib
+import json
+import math
+import os
+import random
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+import openai
+
+
+class LLMBackendError(Exception):
+    """Raised by a backend when a completion cannot be produced."""
+
+
+class LLMBackend(ABC):
+    """Chat completion backend used by the fraud analysis client.
+
+    ``chat`` returns the assistant message as a dictionary with ``content``
+    and, when a function call was requested and made, ``function_call``
+    (``name`` and JSON ``arguments``) - the same shape as OpenAI messages.
+    """
+
+    model_name = 'unknown'
+
+    @abstractmethod
+    async def chat(self, messages: List[Dict[str, str]], temperature: float = 0.3,
+                   functions: Optional[List[Dict[str, Any]]] = None,
+                   function_call: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Produce the assistant reply for a list of chat messages."""
+
+
+class OpenAIBackend(LLMBackend):
+    def __init__(self, model: str = "gpt-3.5-turbo", api_key: Optional[str] = None):
+        """Completions from the OpenAI chat API.
+
+        Args:
+            model: Chat model name
+            api_key: API key; defaults to the OPENAI_API_KEY environment variable
+        """
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        if not self.api_key:
+            raise ValueError("OPENAI_API_KEY environment variable not set")
+        openai.api_key = self.api_key
+        self.model_name = model
+
+    async def chat(self, messages: List[Dict[str, str]], temperature: float = 0.3,
+                   functions: Optional[List[Dict[str, Any]]] = None,
+                   function_call: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        options = {}
+        if functions:
+            options['functions'] = functions
+        if function_call:
+            options['function_call'] = function_call
+
+        response = await openai.ChatCompletion.acreate(
+            model=self.model_name,
+            messages=messages,
+            temperature=temperature,
+            **options
+        )
+        return response.choices[0].message
+
+
+class StubBackend(LLMBackend):
+    def __init__(self, latency_ms: float = 200.0, latency_jitter_ms: float = 50.0,
+                 latency_distribution: str = 'normal', error_rate: float = 0.0,
+                 seed: Optional[int] = 42):
+        """Deterministic offline backend for load testing.
+
+        Replies depend only on the prompt: the same transaction always
+        gets the same risk score. Latency and failures are drawn from a
+        seeded generator so runs are reproducible.
+
+        Args:
+            latency_ms: Mean simulated latency
+            latency_jitter_ms: Standard deviation of the simulated latency
+                (``normal`` and ``lognormal``)
+            latency_distribution: ``constant``, ``normal`` or ``lognormal``
+            error_rate: Probability that a call raises LLMBackendError
+            seed: Seed for the latency and error generator
+        """
+        if latency_distribution not in ('constant', 'normal', 'lognormal'):
+            raise ValueError(f"Unknown latency distribution: {latency_distribution}")
+        self.model_name = 'stub'
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.latency_distribution = latency_distribution
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+
+    async def chat(self, messages: List[Dict[str, str]], temperature: float = 0.3,
+                   functions: Optional[List[Dict[str, Any]]] = None,
+                   function_call: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        await asyncio.sleep(self._sample_latency() / 1000.0)
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise LLMBackendError("Simulated LLM backend failure")
+
+        prompt = messages[-1]['content']
+        digest = hashlib.sha256(prompt.encode('utf-8')).digest()
+        risk_score = round(digest[0] / 255.0, 2)
+        indicators = ["Unusual transaction amount"] if digest[1] % 2 else ["Unfamiliar merchant"]
+        recommendations = ["Verify with customer"] if risk_score >= 0.5 else ["No action required"]
+
+        if functions:
+            return {
+                'role': 'assistant',
+                'content': None,
+                'function_call': {
+                    'name': (function_call or {}).get('name', functions[0]['name']),
+                    'arguments': json.dumps({
+                        'risk_score': risk_score,
+                        'fraud_indicators': indicators,
+                        'recommendations': recommendations,
+                        'summary': 'Deterministic stub analysis'
+                    })
+                }
+            }
+
+        content = (
+            f"Risk score: {risk_score}\n\n"
+            "Fraud indicators:\n" + "\n".join(indicators) + "\n\n"
+            "Recommendations:\n" + "\n".join(recommendations)
+        )
+        return {'role': 'assistant', 'content': content}
+
+    def _sample_latency(self) -> float:
+        if self.latency_distribution == 'constant' or self.latency_ms <= 0:
+            return max(self.latency_ms, 0.0)
+        if self.latency_distribution == 'normal':
+            return max(self._random.gauss(self.latency_ms, self.latency_jitter_ms), 0.0)
+        # Log-space parameters giving the configured mean and standard deviation
+        variance = math.log1p((self.latency_jitter_ms / self.latency_ms) ** 2)
+        mu = math.log(self.latency_ms) - variance / 2
+        return self._random.lognormvariate(mu, math.sqrt(variance))
+
+
+class LocalModelBackend(LLMBackend):
+    def __init__(self, model_path: str, n_ctx: int = 2048, n_threads: Optional[int] = None,
+                 max_tokens: int = 512):
+        """Small chat model run on CPU through llama-cpp-python.
+
+        Generation is blocking, so it runs in the default executor and is
+        serialized (a llama.cpp context is not safe for concurrent use).
+
+        Args:
+            model_path: Path to a GGUF model file
+            n_ctx: Context window size
+            n_threads: CPU threads used for generation (defaults to all cores)
+            max_tokens: Maximum tokens generated per reply
+        """
+        try:
+            from llama_cpp import Llama
+        except ImportError as e:
+            raise ImportError("llama-cpp-python is required for the local LLM backend") from e
+
+        self.model_name = os.path.basename(model_path)
+        self.max_tokens = max_tokens
+        self._llm = Llama(model_path=model_path, n_ctx=n_ctx, n_threads=n_threads, verbose=False)
+        self._lock = threading.Lock()
+
+    async def chat(self, messages: List[Dict[str, str]], temperature: float = 0.3,
+                   functions: Optional[List[Dict[str, Any]]] = None,
+                   function_call: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        if functions:
+            # Small local models have no function calling; ask for the
+            # arguments as a bare JSON object instead
+            schema = json.dumps(functions[0]['parameters'])
+            messages = list(messages) + [{
+                'role': 'system',
+                'content': f"Respond only with a JSON object matching this schema: {schema}"
+            }]
+
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(None, functools.partial(self._generate, messages, temperature))
+        return response['choices'][0]['message']
+
+    def _generate(self, messages: List[Dict[str, str]], temperature: float) -> Dict[str, Any]:
+        with self._lock:
+            return self._llm.create_chat_completion(
+                messages=messages,
+                temperature=temperature,
+                max_tokens=self.max_tokens
+            )
+
+
+def create_backend(settings: Optional[Dict[str, Any]] = None) -> LLMBackend:
+    """Create the backend selected in the ``llm`` settings section.
+
+    The ``LLM_BACKEND`` environment variable overrides the configured
+    backend, e.g. to start the API against the stub for load tests.
+    """
+    settings = settings or {}
+    backend = os.getenv('LLM_BACKEND', settings.get('backend', 'openai'))
+
+    if backend == 'openai':
+        return OpenAIBackend(model=settings.get('model', 'gpt-3.5-turbo'))
+    if backend == 'stub':
+        return StubBackend(**settings.get('stub', {}))
+    if backend == 'local':
+        return LocalModelBackend(**settings.get('local', {}))
+    raise ValueError(f"Unknown LLM backend: {backend}")
@@ -1,55 +1,109 @@
-import os
-from typing import Dict, Any, List
-import openai
+import re
+import logging
+from typing import Dict, Any, List, Optional
 from datetime import datetime
+from .backends import LLMBackend, create_backend
+from .prompt_builder import PromptBuilder
+from .report_generator import ReportGenerator
+from .similarity_cache import SimilarityCache
+from .structured_output import ANALYSIS_FUNCTION, parse_structured_analysis
+from ..config.loader import load_settings
+from ..monitoring.metrics import LLM_CACHE_HITS, LLM_FALLBACKS, LLM_LATENCY_SECONDS, LLM_PARSE_SECONDS
+from ..monitoring.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+# Free-text extraction patterns, used when no structured payload is returned
+RISK_SCORE_PATTERN = re.compile(r'risk\s*score:?\s*(\d*\.?\d+)')
+FRAUD_INDICATORS_PATTERN = re.compile(r'(?:fraud\s*)?indicators:?\s*(.*?)(?:\n\n|\Z)', re.DOTALL | re.IGNORECASE)
+RECOMMENDATIONS_PATTERN = re.compile(r'(?:recommended\s*)?(?:actions|recommendations):?\s*(.*?)(?:\n\n|\Z)', re.DOTALL | re.IGNORECASE)
 
 class OpenAIClient:
-    def __init__(self):
-        """Initialize the OpenAI client."""
-        self.api_key = os.getenv("OPENAI_API_KEY")
-        if not self.api_key:
-            raise ValueError("OPENAI_API_KEY environment variable not set")
-        openai.api_key = self.api_key
+    def __init__(self, structured_output: bool = True, prompt_builder: Optional[PromptBuilder] = None,
+                 backend: Optional[LLMBackend] = None, analysis_cache: Optional[SimilarityCache] = None):
+        """Initialize the OpenAI client.
+        
+        Args:
+            structured_output: Request analyses as JSON through function calling,
+                falling back to free-text extraction when that fails
+            prompt_builder: Builder enforcing the prompt token budget
+            backend: Chat completion backend; defaults to the one selected in
+                the ``llm`` section of settings.yaml
+            analysis_cache: Cache reusing analyses of near-duplicate transactions;
+                defaults to the ``llm.cache`` settings
+        """
+        llm_settings = load_settings().get('llm') or {}
+        self.backend = backend or create_backend(llm_settings)
+        # An empty cache is falsy (it has a length), so test for None explicitly
+        if analysis_cache is None:
+            analysis_cache = SimilarityCache.from_settings(llm_settings.get('cache'))
+        self.analysis_cache = analysis_cache
+        self.report_options = llm_settings.get('report') or {}
+        self.structured_output = structured_output
+        self.prompt_builder = prompt_builder or PromptBuilder()
     
+    @tracer.trace('OpenAIClient.analyze_transaction')
     async def analyze_transaction(self, transaction: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze a transaction using OpenAI's API.
+        """Analyze a transaction using the configured LLM backend.
         
         Args:
             transaction: Dictionary containing transaction details
             
         Returns:
-            Dictionary containing analysis results
+            Dictionary containing analysis results; ``cached`` is True when the
+            analysis of a near-duplicate transaction was reused
         """
+        if self.analysis_cache is not None:
+            cached = self.analysis_cache.lookup(transaction)
+            if cached is not None:
+                LLM_CACHE_HITS.inc()
+                return cached
+        
         prompt = self._create_analysis_prompt(transaction)
         
+        structured_options = {}
+        if self.structured_output:
+            structured_options = {
+                "functions": [ANALYSIS_FUNCTION],
+                "function_call": {"name": ANALYSIS_FUNCTION["name"]}
+            }
+        
         try:
-            response = await openai.ChatCompletion.acreate(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a fraud detection expert analyzing financial transactions."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3
-            )
+            with LLM_LATENCY_SECONDS.labels(operation='analysis').time(), \
+                    tracer.start_span('llm.chat_completion', {'llm.operation': 'analysis', 'llm.model': self.backend.model_name}):
+                message = await self.backend.chat(
+                    [
+                        {"role": "system", "content": "You are a fraud detection expert analyzing financial transactions."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.3,
+                    **structured_options
+                )
             
-            analysis = response.choices[0].message.content
+            function_call = message.get("function_call")
             
-            return {
-                "raw_analysis": analysis,
-                "risk_score": self._extract_risk_score(analysis),
-                "fraud_indicators": self._extract_fraud_indicators(analysis),
-                "recommendations": self._extract_recommendations(analysis)
-            }
+            with LLM_PARSE_SECONDS.time(), tracer.start_span('OpenAIClient.parse_analysis'):
+                analysis = self._parse_analysis(
+                    message.get("content") or "",
+                    function_call["arguments"] if function_call else None
+                )
+            
+            if self.analysis_cache is not None:
+                self.analysis_cache.store(transaction, analysis)
+            return {**analysis, "cached": False}
             
         except Exception as e:
-            print(f"Error in OpenAI API call: {str(e)}")
+            logger.error(f"Error in LLM call: {str(e)}")
+            LLM_FALLBACKS.labels(operation='analysis').inc()
             return {
                 "raw_analysis": "Error in analysis",
                 "risk_score": 0.5,
                 "fraud_indicators": ["API Error"],
-                "recommendations": ["Please try again later"]
+                "recommendations": ["Please try again later"],
+                "cached": False
             }
     
+    @tracer.trace('OpenAIClient.generate_fraud_report')
     async def generate_fraud_report(self, incidents: List[Dict[str, Any]]) -> str:
         """Generate a fraud report for multiple incidents.
         
@@ -59,93 +113,77 @@ class OpenAIClient:
         Returns:
             String containing the generated report
         """
-        prompt = self._create_report_prompt(incidents)
+        generator = self.create_report_generator()
+        for incident in incidents:
+            generator.add(incident)
+        return await generator.finish() or "No incidents to report"
+    
+    def create_report_generator(self) -> ReportGenerator:
+        """Create a map-reduce report generator configured from the ``llm.report`` settings.
+        
+        Incidents can be added while a batch is still being analyzed.
+        """
+        return ReportGenerator(self, **self.report_options)
+    
+    async def complete(self, prompt: str, system_prompt: str, operation: str) -> Optional[str]:
+        """Run a free-text completion.
         
+        Args:
+            prompt: User prompt
+            system_prompt: System prompt
+            operation: Label for latency and fallback metrics
+            
+        Returns:
+            The completion text, or None if the call failed
+        """
         try:
-            response = await openai.ChatCompletion.acreate(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a fraud detection expert generating incident reports."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3
-            )
+            with LLM_LATENCY_SECONDS.labels(operation=operation).time(), \
+                    tracer.start_span('llm.chat_completion', {'llm.operation': operation, 'llm.model': self.backend.model_name}):
+                message = await self.backend.chat(
+                    [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.3
+                )
             
-            return response.choices[0].message.content
+            return message.get("content")
             
         except Exception as e:
-            print(f"Error in OpenAI API call: {str(e)}")
-            return "Error generating fraud report"
+            logger.error(f"Error in LLM call: {str(e)}")
+            LLM_FALLBACKS.labels(operation=operation).inc()
+            return None
     
     def _create_analysis_prompt(self, transaction: Dict[str, Any]) -> str:
         """Create a prompt for transaction analysis."""
-        return f"""
-        Analyze the following transaction for potential fraud:
-        
-        Transaction ID: {transaction['transaction_id']}
-        Amount: ${transaction['amount']}
-        Merchant: {transaction['merchant_name']}
-        Location: {transaction['location']}
-        Timestamp: {transaction['timestamp']}
-        
-        Customer History:
-        {self._format_customer_history(transaction.get('customer_history', {}))}
-        
-        Please provide:
-        1. A risk score between 0 and 1
-        2. List of potential fraud indicators
-        3. Recommendations for further action
-        """
-    
-    def _create_report_prompt(self, incidents: List[Dict[str, Any]]) -> str:
-        """Create a prompt for fraud report generation."""
-        incidents_text = "\n\n".join([
-            f"Incident {i+1}:\n" +
-            f"Transaction ID: {inc['transaction_id']}\n" +
-            f"Amount: ${inc['amount']}\n" +
-            f"Merchant: {inc['merchant']}\n" +
-            f"Risk Score: {inc['risk_score']}\n" +
-            f"Fraud Indicators: {', '.join(inc['fraud_indicators'])}"
-            for i, inc in enumerate(incidents)
-        ])
-        
-        return f"""
-        Generate a comprehensive fraud report for the following incidents:
-        
-        {incidents_text}
-        
-        Please include:
-        1. Summary of incidents
-        2. Common patterns and trends
-        3. Risk assessment
-        4. Recommended actions
-        """
+        return self.prompt_builder.build_analysis_prompt(transaction)
     
-    def _format_customer_history(self, history: Dict[str, Any]) -> str:
-        """Format customer history for the prompt."""
-        if not history:
-            return "No customer history available"
-        
-        text = []
-        if 'previous_transactions' in history:
-            text.append("Previous Transactions:")
-            for tx in history['previous_transactions']:
-                text.append(f"- ${tx['amount']} at {tx['merchant']} on {tx['date']}")
-        
-        if 'average_transaction' in history:
-            text.append(f"Average Transaction: ${history['average_transaction']}")
-        
-        if 'location_changes' in history:
-            text.append(f"Location Changes: {history['location_changes']}")
+    def _parse_analysis(self, analysis: str, arguments: Optional[str] = None) -> Dict[str, Any]:
+        """Parse a completion, preferring the structured payload over regex extraction."""
+        structured = parse_structured_analysis(arguments) or parse_structured_analysis(analysis)
+        if structured is not None:
+            return {
+                "raw_analysis": analysis or arguments,
+                "risk_score": structured["risk_score"],
+                "fraud_indicators": structured["fraud_indicators"],
+                "recommendations": structured["recommendations"],
+                "parse_mode": "structured"
+            }
         
-        return "\n".join(text)
+        return {
+            "raw_analysis": analysis,
+            "risk_score": self._extract_risk_score(analysis),
+            "fraud_indicators": self._extract_fraud_indicators(analysis),
+            "recommendations": self._extract_recommendations(analysis),
+            "parse_mode": "regex"
+        }
     
+    @tracer.trace('OpenAIClient._extract_risk_score')
     def _extract_risk_score(self, analysis: str) -> float:
         """Extract risk score from analysis text."""
         try:
             # Look for risk score in the format "risk score: X" or "risk: X"
-            import re
-            match = re.search(r'risk\s*score:?\s*(\d*\.?\d+)', analysis.lower())
+            match = RISK_SCORE_PATTERN.search(analysis.lower())
             if match:
                 score = float(match.group(1))
                 return min(max(score, 0.0), 1.0)
@@ -153,13 +191,13 @@ class OpenAIClient:
             pass
         return 0.5  # Default to medium risk if extraction fails
     
+    @tracer.trace('OpenAIClient._extract_fraud_indicators')
     def _extract_fraud_indicators(self, analysis: str) -> List[str]:
         """Extract fraud indicators from analysis text."""
         indicators = []
         try:
             # Look for indicators in the format "indicators:" or "fraud indicators:"
-            import re
-            match = re.search(r'(?:fraud\s*)?indicators:?\s*(.*?)(?:\n\n|\Z)', analysis, re.DOTALL | re.IGNORECASE)
+            match = FRAUD_INDICATORS_PATTERN.search(analysis)
             if match:
                 indicators_text = match.group(1)
                 indicators = [ind.strip() for ind in indicators_text.split('\n') if ind.strip()]
@@ -167,13 +205,13 @@ class OpenAIClient:
             pass
         return indicators or ["Unable to extract indicators"]
     
+    @tracer.trace('OpenAIClient._extract_recommendations')
     def _extract_recommendations(self, analysis: str) -> List[str]:
         """Extract recommendations from analysis text."""
         recommendations = []
         try:
             # Look for recommendations in the format "recommendations:" or "recommended actions:"
-            import re
-            match = re.search(r'(?:recommended\s*)?(?:actions|recommendations):?\s*(.*?)(?:\n\n|\Z)', analysis, re.DOTALL | re.IGNORECASE)
+            match = RECOMMENDATIONS_PATTERN.search(analysis)
             if match:
                 recs_text = match.group(1)
                 recommendations = [rec.strip() for rec in recs_text.split('\n') if rec.strip()]
@@ -0,0 +1,173 @@
+import math
+import re
+import statistics
+from string import Formatter
+from typing import Any, Dict, List, Optional, Tuple
+
+# Word pieces and punctuation; used to approximate BPE token counts offline
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+class TokenCounter:
+    def __init__(self, model: str = "gpt-3.5-turbo"):
+        """Count prompt tokens locally.
+
+        Uses tiktoken when it is installed and its encoding is available,
+        otherwise an offline approximation that slightly overestimates
+        typical BPE counts (one token per short word or symbol, one per
+        four characters of longer words).
+        """
+        self._encoding = None
+        try:
+            import tiktoken
+            self._encoding = tiktoken.encoding_for_model(model)
+        except Exception:
+            pass
+
+    def count(self, text: str) -> int:
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        return sum(math.ceil(len(piece) / 4) for piece in _TOKEN_PATTERN.findall(text))
+
+
+class PromptTemplate:
+    def __init__(self, template: str, counter: TokenCounter):
+        """A prompt template parsed once.
+
+        The literal text is split out at construction so rendering is a
+        single join, and its token cost is known without recounting it on
+        every request.
+        """
+        self._parts: List[Tuple[str, Optional[str]]] = [
+            (literal, field) for literal, field, _, _ in Formatter().parse(template)
+        ]
+        self.static_tokens = counter.count("".join(literal for literal, _ in self._parts))
+
+    def render(self, values: Dict[str, Any]) -> str:
+        pieces = []
+        for literal, field in self._parts:
+            pieces.append(literal)
+            if field is not None:
+                pieces.append(str(values[field]))
+        return "".join(pieces)
+
+
+ANALYSIS_TEMPLATE = """
+Analyze the following transaction for potential fraud:
+
+Transaction ID: {transaction_id}
+Amount: ${amount}
+Merchant: {merchant_name}
+Location: {location}
+Timestamp: {timestamp}
+
+Customer History:
+{customer_history}
+
+Please provide:
+1. A risk score between 0 and 1
+2. List of potential fraud indicators
+3. Recommendations for further action
+"""
+
+
+class PromptBuilder:
+    def __init__(self, max_prompt_tokens: int = 1200, recent_transactions: int = 5,
+                 anomalous_transactions: int = 3, model: str = "gpt-3.5-turbo"):
+        """Build analysis prompts within a per-request token budget.
+
+        Customer history is compressed into numeric aggregates plus the
+        most relevant individual transactions: the most recent ones first,
+        then the largest outliers by amount. Transactions are added only
+        while the prompt stays within ``max_prompt_tokens``.
+
+        Args:
+            max_prompt_tokens: Token budget for the user prompt
+            recent_transactions: Most recent transactions to consider listing
+            anomalous_transactions: Most anomalous transactions to consider listing
+            model: Model whose tokenizer is used when available
+        """
+        self.max_prompt_tokens = max_prompt_tokens
+        self.recent_transactions = recent_transactions
+        self.anomalous_transactions = anomalous_transactions
+        self.counter = TokenCounter(model)
+        self.analysis_template = PromptTemplate(ANALYSIS_TEMPLATE, self.counter)
+
+    def build_analysis_prompt(self, transaction: Dict[str, Any]) -> str:
+        """Create the transaction analysis prompt."""
+        values = {
+            'transaction_id': transaction['transaction_id'],
+            'amount': transaction['amount'],
+            'merchant_name': transaction['merchant_name'],
+            'location': transaction['location'],
+            'timestamp': transaction['timestamp']
+        }
+        used = self.analysis_template.static_tokens + sum(
+            self.counter.count(str(value)) for value in values.values()
+        )
+        values['customer_history'] = self.format_customer_history(
+            transaction.get('customer_history') or {},
+            max(self.max_prompt_tokens - used, 0)
+        )
+        return self.analysis_template.render(values)
+
+    def format_customer_history(self, history: Dict[str, Any], token_budget: int) -> str:
+        """Summarize customer history within ``token_budget`` tokens."""
+        if not history:
+            return "No customer history available"
+
+        lines = []
+        transactions = history.get('previous_transactions') or []
+        if transactions:
+            lines.extend(self._aggregate_lines(transactions))
+
+        if 'average_transaction' in history:
+            lines.append(f"Average Transaction: ${history['average_transaction']}")
+        if 'location_changes' in history:
+            lines.append(f"Location Changes: {history['location_changes']}")
+
+        used = self.counter.count("\n".join(lines))
+        selected = []
+        header = "Relevant Previous Transactions:"
+        header_tokens = self.counter.count(header)
+        for tx in self._relevant_transactions(transactions):
+            line = f"- ${tx['amount']} at {tx['merchant']} on {tx['date']}"
+            cost = self.counter.count(line) + (0 if selected else header_tokens)
+            if used + cost > token_budget:
+                break
+            selected.append(line)
+            used += cost
+
+        if selected:
+            lines.extend([header] + selected)
+        return "\n".join(lines)
+
+    def _aggregate_lines(self, transactions: List[Dict[str, Any]]) -> List[str]:
+        amounts = [float(tx['amount']) for tx in transactions]
+        dates = sorted(str(tx['date']) for tx in transactions if tx.get('date'))
+        lines = [
+            f"Previous Transactions: {len(amounts)}"
+            + (f" between {dates[0]} and {dates[-1]}" if dates else ""),
+            f"Amounts: mean ${statistics.fmean(amounts):.2f}, median ${statistics.median(amounts):.2f}, "
+            f"max ${max(amounts):.2f}"
+            + (f", std ${statistics.pstdev(amounts):.2f}" if len(amounts) > 1 else ""),
+            f"Distinct Merchants: {len({tx.get('merchant') for tx in transactions})}"
+        ]
+        return lines
+
+    def _relevant_transactions(self, transactions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Most recent transactions first, then the largest amount outliers."""
+        if not transactions:
+            return []
+        recent = sorted(transactions, key=lambda tx: str(tx.get('date', '')), reverse=True)
+        selected = recent[:self.recent_transactions]
+
+        amounts = [float(tx['amount']) for tx in transactions]
+        mean = statistics.fmean(amounts)
+        std = statistics.pstdev(amounts) or 1.0
+        outliers = sorted(
+            recent[self.recent_transactions:],
+            key=lambda tx: abs(float(tx['amount']) - mean) / std,
+            reverse=True
+        )
+        return selected + outliers[:self.anomalous_transactions]
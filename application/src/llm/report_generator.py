@@ -0,0 +1,152 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+REPORT_SYSTEM_PROMPT = "You are a fraud detection expert generating incident reports."
+
+
+def format_incidents(incidents: List[Dict[str, Any]]) -> str:
+    """Render incidents for a report prompt."""
+    return "\n\n".join([
+        f"Incident {i+1}:\n" +
+        f"Transaction ID: {inc['transaction_id']}\n" +
+        f"Amount: ${inc['amount']}\n" +
+        f"Merchant: {inc['merchant']}\n" +
+        f"Risk Score: {inc['risk_score']}\n" +
+        f"Fraud Indicators: {', '.join(inc['fraud_indicators'])}"
+        for i, inc in enumerate(incidents)
+    ])
+
+
+def report_prompt(incidents_text: str) -> str:
+    """Prompt for the final, comprehensive fraud report."""
+    return f"""
+        Generate a comprehensive fraud report for the following incidents:
+
+        {incidents_text}
+
+        Please include:
+        1. Summary of incidents
+        2. Common patterns and trends
+        3. Risk assessment
+        4. Recommended actions
+        """
+
+
+def chunk_prompt(incidents: List[Dict[str, Any]]) -> str:
+    """Prompt summarizing one chunk of related incidents."""
+    return f"""
+        Summarize the following related fraud incidents for inclusion in a larger report:
+
+        {format_incidents(incidents)}
+
+        Please include the number of incidents, their total amount, shared patterns,
+        the highest-risk transaction IDs and recommended actions. Be concise.
+        """
+
+
+def merge_prompt(summaries: List[str]) -> str:
+    """Prompt merging partial summaries into one intermediate summary."""
+    sections = "\n\n".join(f"Summary {i+1}:\n{summary}" for i, summary in enumerate(summaries))
+    return f"""
+        Merge the following partial fraud incident summaries into a single concise summary:
+
+        {sections}
+
+        Keep incident counts, amounts, shared patterns, highest-risk transaction IDs
+        and recommended actions.
+        """
+
+
+def cluster_key(incident: Dict[str, Any]) -> str:
+    """Group incidents by their primary fraud indicator."""
+    indicators = incident.get('fraud_indicators') or []
+    return " ".join(indicators[0].lower().split()) if indicators else 'unspecified'
+
+
+class ReportGenerator:
+    def __init__(self, llm_client: Any, chunk_size: int = 20, fan_in: int = 4, max_concurrency: int = 4):
+        """Map-reduce fraud report generation.
+
+        Incidents are clustered by primary fraud indicator as they arrive.
+        Each cluster is summarized in chunks of ``chunk_size`` as soon as a
+        chunk fills up, while the batch is still being analyzed. ``finish``
+        summarizes the remaining partial chunks and merges all summaries
+        ``fan_in`` at a time until a single final report is produced. Small
+        batches skip the map step and get a single report call.
+
+        Args:
+            llm_client: Client providing ``complete(prompt, system_prompt, operation)``
+            chunk_size: Incidents per chunk summary, bounding each prompt's size
+            fan_in: Summaries merged per reduce call
+            max_concurrency: Maximum concurrent LLM calls for this report
+        """
+        if chunk_size < 1 or fan_in < 2:
+            raise ValueError("chunk_size must be at least 1 and fan_in at least 2")
+        self.llm_client = llm_client
+        self.chunk_size = chunk_size
+        self.fan_in = fan_in
+        self.incident_count = 0
+        self._clusters: Dict[str, List[Dict[str, Any]]] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def add(self, incident: Dict[str, Any]) -> None:
+        """Add a high-risk incident, starting its chunk summary once the chunk is full."""
+        self.incident_count += 1
+        key = cluster_key(incident)
+        cluster = self._clusters.setdefault(key, [])
+        cluster.append(incident)
+        if len(cluster) >= self.chunk_size:
+            self._clusters[key] = []
+            self._tasks.append(asyncio.ensure_future(self._summarize_chunk(cluster)))
+
+    async def finish(self) -> Optional[str]:
+        """Produce the final report, or None if no incidents were added."""
+        if self.incident_count == 0:
+            return None
+
+        if not self._tasks and self.incident_count <= self.chunk_size:
+            incidents = [incident for cluster in self._clusters.values() for incident in cluster]
+            report = await self._complete(report_prompt(format_incidents(incidents)), 'report')
+            return report or "Error generating fraud report"
+
+        for cluster in self._clusters.values():
+            if cluster:
+                self._tasks.append(asyncio.ensure_future(self._summarize_chunk(cluster)))
+        self._clusters = {}
+        summaries = list(await asyncio.gather(*self._tasks))
+        self._tasks = []
+
+        while len(summaries) > self.fan_in:
+            groups = [summaries[i:i + self.fan_in] for i in range(0, len(summaries), self.fan_in)]
+            summaries = list(await asyncio.gather(*(self._merge(group) for group in groups)))
+
+        sections = "\n\n".join(f"Summary {i+1}:\n{summary}" for i, summary in enumerate(summaries))
+        report = await self._complete(report_prompt(sections), 'report')
+        return report or "Error generating fraud report"
+
+    def cancel(self) -> None:
+        """Cancel chunk summaries still in flight."""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    async def _summarize_chunk(self, incidents: List[Dict[str, Any]]) -> str:
+        incidents = sorted(incidents, key=lambda inc: inc['risk_score'], reverse=True)
+        summary = await self._complete(chunk_prompt(incidents), 'report_chunk')
+        if summary:
+            return summary
+        # Keep the incidents in the report even when their summary failed
+        ids = ", ".join(str(inc['transaction_id']) for inc in incidents)
+        total = sum(float(inc['amount']) for inc in incidents)
+        return f"{len(incidents)} incidents totalling ${total:.2f} (summary unavailable): {ids}"
+
+    async def _merge(self, summaries: List[str]) -> str:
+        if len(summaries) == 1:
+            return summaries[0]
+        merged = await self._complete(merge_prompt(summaries), 'report_merge')
+        return merged or "\n\n".join(summaries)
+
+    async def _complete(self, prompt: str, operation: str) -> Optional[str]:
+        async with self._semaphore:
+            return await self.llm_client.complete(prompt, REPORT_SYSTEM_PROMPT, operation)
@@ -0,0 +1,161 @@
+import copy
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# Hours are grouped into 3-hour bands, so 01:10 and 02:50 share a bucket
+HOUR_BAND_HOURS = 3
+
+
+def _normalize(value: Any) -> str:
+    return " ".join(str(value or "").lower().split())
+
+
+def _hour(timestamp: Any) -> Optional[int]:
+    if hasattr(timestamp, 'hour'):
+        return timestamp.hour
+    try:
+        return int(str(timestamp)[11:13])
+    except ValueError:
+        return None
+
+
+def customer_identity(transaction: Dict[str, Any]) -> Optional[str]:
+    """The customer or account a transaction belongs to, if it says."""
+    history = transaction.get('customer_history') or {}
+    for value in (transaction.get('customer_id'), transaction.get('account_id'),
+                  history.get('customer_id'), history.get('account_id')):
+        if value not in (None, ''):
+            return str(value)
+    return None
+
+
+def transaction_signature(transaction: Dict[str, Any]) -> Tuple[Tuple, List[float]]:
+    """Normalize a transaction into a bucket key and a numeric vector.
+
+    The key holds the features that must match exactly (customer,
+    merchant, location, hour band), so analyses are only shared between
+    transactions of the same customer. The vector holds log-scaled amount
+    and customer history aggregates, so distances between vectors compare
+    relative rather than absolute differences.
+    """
+    hour = _hour(transaction.get('timestamp'))
+    key = (
+        customer_identity(transaction),
+        _normalize(transaction.get('merchant_name')),
+        _normalize(transaction.get('location')),
+        hour // HOUR_BAND_HOURS if hour is not None else None
+    )
+
+    history = transaction.get('customer_history') or {}
+    previous = history.get('previous_transactions') or []
+    amounts = [float(tx['amount']) for tx in previous if 'amount' in tx]
+    mean_amount = sum(amounts) / len(amounts) if amounts else float(history.get('average_transaction') or 0.0)
+    vector = [
+        math.log1p(max(float(transaction['amount']), 0.0)),
+        math.log1p(len(amounts)),
+        math.log1p(max(mean_amount, 0.0)),
+        math.log1p(float(history.get('location_changes') or 0))
+    ]
+    return key, vector
+
+
+class SimilarityCache:
+    def __init__(self, similarity_threshold: float = 0.95, ttl_seconds: float = 900.0,
+                 max_entries: int = 10000, max_bucket_size: int = 32):
+        """Reuse LLM analyses of near-duplicate transactions.
+
+        Transactions are bucketed on their customer and exact categorical
+        features and compared within the bucket on their numeric vector.
+        Transactions without a customer or account id bypass the cache, as
+        their sparse history cannot tell customers apart. Similarity is
+        ``exp(-distance)``, so a threshold of 0.95 allows roughly a 5%
+        difference in amount with identical history.
+
+        Args:
+            similarity_threshold: Minimum similarity for reusing an analysis (0 to 1)
+            ttl_seconds: Age after which a cached analysis is no longer reused
+            max_entries: Total analyses kept; the least recently used bucket is evicted
+            max_bucket_size: Analyses kept per bucket; the oldest is evicted
+        """
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bucket_size = max_bucket_size
+        self._buckets: 'OrderedDict[Tuple, List[Tuple[float, List[float], str, Dict[str, Any]]]]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict[str, Any]]) -> Optional['SimilarityCache']:
+        """Create a cache from the ``llm.cache`` settings, or None when disabled."""
+        if not settings or not settings.get('enabled', False):
+            return None
+        options = {k: v for k, v in settings.items() if k != 'enabled'}
+        return cls(**options)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def lookup(self, transaction: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Find the most similar recent analysis.
+
+        Returns:
+            Copy of the cached analysis annotated with ``cached``,
+            ``cache_similarity`` and ``cached_from_transaction_id``, or None
+        """
+        key, vector = transaction_signature(transaction)
+        if key[0] is None:
+            return None
+        now = time.monotonic()
+        best = None
+        best_similarity = self.similarity_threshold
+        with self._lock:
+            entries = self._buckets.get(key)
+            if not entries:
+                return None
+            self._buckets.move_to_end(key)
+            for created, cached_vector, transaction_id, analysis in entries:
+                if now - created > self.ttl_seconds:
+                    continue
+                similarity = math.exp(-math.dist(vector, cached_vector))
+                if similarity >= best_similarity:
+                    best, best_similarity = (transaction_id, analysis), similarity
+
+        if best is None:
+            return None
+        # Deep copy, so callers editing indicator or recommendation lists leave the entry intact
+        return {
+            **copy.deepcopy(best[1]),
+            'cached': True,
+            'cache_similarity': round(best_similarity, 4),
+            'cached_from_transaction_id': best[0]
+        }
+
+    def store(self, transaction: Dict[str, Any], analysis: Dict[str, Any]) -> None:
+        """Remember an analysis for later near-duplicates of the same customer."""
+        key, vector = transaction_signature(transaction)
+        if key[0] is None:
+            return
+        analysis = copy.deepcopy(analysis)
+        now = time.monotonic()
+        with self._lock:
+            entries = self._buckets.setdefault(key, [])
+            self._buckets.move_to_end(key)
+            live = [entry for entry in entries if now - entry[0] <= self.ttl_seconds]
+            live.append((now, vector, transaction.get('transaction_id'), analysis))
+            if len(live) > self.max_bucket_size:
+                live = live[-self.max_bucket_size:]
+            self._size += len(live) - len(entries)
+            self._buckets[key] = live
+
+            while self._size > self.max_entries and len(self._buckets) > 1:
+                _, evicted = self._buckets.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+            self._size = 0
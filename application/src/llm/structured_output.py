@@ -0,0 +1,126 @@
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Function definition sent to the chat completion API; the model is forced
+# to call it, so its arguments come back as a JSON object matching the schema
+ANALYSIS_FUNCTION = {
+    "name": "report_fraud_analysis",
+    "description": "Report the fraud analysis of a financial transaction.",
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "risk_score": {
+                "type": "number",
+                "minimum": 0,
+                "maximum": 1,
+                "description": "Probability that the transaction is fraudulent"
+            },
+            "fraud_indicators": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Observed indicators of potential fraud"
+            },
+            "recommendations": {
+                "type": "array",
+                "items": {"type": "string"},
+                "description": "Recommended follow-up actions"
+            },
+            "summary": {
+                "type": "string",
+                "description": "One or two sentence explanation of the assessment"
+            }
+        },
+        "required": ["risk_score", "fraud_indicators", "recommendations"]
+    }
+}
+
+
+def _compile_field(spec: Dict[str, Any]) -> Callable[[Any], Tuple[bool, Any]]:
+    """Turn one property schema into a check returning (valid, normalized value)."""
+    field_type = spec["type"]
+
+    if field_type == "number":
+        low = spec.get("minimum", float("-inf"))
+        high = spec.get("maximum", float("inf"))
+
+        def check_number(value):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                return False, None
+            return True, min(max(float(value), low), high)
+        return check_number
+
+    if field_type == "string":
+        def check_string(value):
+            return isinstance(value, str), value
+        return check_string
+
+    if field_type == "array" and spec["items"]["type"] == "string":
+        def check_string_list(value):
+            if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+                return False, None
+            return True, [item.strip() for item in value if item.strip()]
+        return check_string_list
+
+    raise ValueError(f"Unsupported schema type: {field_type}")
+
+
+def compile_validator(schema: Dict[str, Any]) -> Callable[[Any], Optional[Dict[str, Any]]]:
+    """Compile an object schema into a validator.
+
+    The schema is walked once here; the returned function only runs the
+    prebuilt per-field checks.
+
+    Returns:
+        Function mapping a decoded payload to its normalized form, or None
+        when the payload does not match the schema
+    """
+    required = frozenset(schema.get("required", []))
+    checks: List[Tuple[str, bool, Callable]] = [
+        (name, name in required, _compile_field(spec))
+        for name, spec in schema["properties"].items()
+    ]
+
+    def validate(payload: Any) -> Optional[Dict[str, Any]]:
+        if not isinstance(payload, dict):
+            return None
+        result = {}
+        for name, is_required, check in checks:
+            if name not in payload:
+                if is_required:
+                    return None
+                continue
+            valid, value = check(payload[name])
+            if not valid:
+                return None
+            result[name] = value
+        return result
+
+    return validate
+
+
+_validate_analysis = compile_validator(ANALYSIS_FUNCTION["parameters"])
+
+
+def parse_structured_analysis(payload: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Decode and validate a JSON analysis in a single pass.
+
+    Accepts function-call arguments or a message body containing only a
+    JSON object (optionally wrapped in a Markdown code fence).
+
+    Returns:
+        Normalized analysis fields, or None if the payload is not valid
+    """
+    if not payload:
+        return None
+    text = payload.strip()
+    if text.startswith("```"):
+        text = text.strip("`")
+        if text.startswith("json"):
+            text = text[4:]
+        text = text.strip()
+    if not text.startswith("{"):
+        return None
+    try:
+        return _validate_analysis(json.loads(text))
+    except ValueError:
+        return None
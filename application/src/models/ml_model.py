@@ -4,6 +4,7 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime
 import joblib
 from pathlib import Path
+from ..monitoring.tracing import tracer
 
 class FraudDetectionModel:
     def __init__(self, model_path: Optional[str] = None):
@@ -36,6 +37,7 @@ class FraudDetectionModel:
             }
         }
     
+    @tracer.trace('FraudDetectionModel.predict')
     def predict(self, features: Dict[str, Any]) -> float:
         """Predict fraud probability for a transaction.
         
@@ -61,16 +63,15 @@ class FraudDetectionModel:
             risk_score += 0.3
         
         # Time-based risk
-        hour = datetime.fromisoformat(features['timestamp']).hour
-        if hour in self.model['rules']['suspicious_hours']:
+        if features['hour'] in self.model['rules']['suspicious_hours']:
             risk_score += 0.2
         
-        # Merchant-based risk
-        if features['merchant_name'] in self.model['rules']['suspicious_merchants']:
+        # Merchant-based risk (prepare_features scores suspicious merchants at 0.8)
+        if features['merchant_risk_score'] >= 0.8:
             risk_score += 0.3
         
         # Location-based risk
-        if features['location'] in self.model['rules']['suspicious_locations']:
+        if features['location_risk_score'] >= 0.8:
             risk_score += 0.2
         
         return min(risk_score, 1.0)
@@ -83,9 +84,12 @@ class FraudDetectionModel:
         """Load a model from disk."""
         self.model = joblib.load(path)
     
+    @tracer.trace('FraudDetectionModel.prepare_features')
     def prepare_features(self, transaction: Dict[str, Any]) -> Dict[str, Any]:
         """Prepare features for prediction from raw transaction data."""
-        timestamp = datetime.fromisoformat(transaction['timestamp'])
+        timestamp = transaction['timestamp']
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp)
         
         return {
             'amount': float(transaction['amount']),
@@ -93,7 +97,7 @@ class FraudDetectionModel:
             'day_of_week': timestamp.weekday(),
             'merchant_risk_score': self._calculate_merchant_risk(transaction['merchant_name']),
             'location_risk_score': self._calculate_location_risk(transaction['location']),
-            'customer_risk_score': self._calculate_customer_risk(transaction.get('customer_history', {}))
+            'customer_risk_score': self._calculate_customer_risk(transaction.get('customer_history') or {})
         }
     
     def _calculate_merchant_risk(self, merchant_name: str) -> float:
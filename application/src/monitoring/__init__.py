@@ -0,0 +1,3 @@
+"""
+Monitoring for the fraud detection service
+"""
\ No newline at end of file
@@ -0,0 +1,55 @@
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+
+# Spans sub-millisecond local steps up to multi-second LLM calls
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+FEATURE_PREP_SECONDS = Histogram(
+    'fraud_feature_prep_seconds',
+    'Time spent preparing model features for a transaction',
+    buckets=LATENCY_BUCKETS
+)
+ML_INFERENCE_SECONDS = Histogram(
+    'fraud_ml_inference_seconds',
+    'Time spent in ML model prediction for a transaction',
+    buckets=LATENCY_BUCKETS
+)
+LLM_LATENCY_SECONDS = Histogram(
+    'fraud_llm_request_seconds',
+    'Latency of LLM completion calls',
+    ['operation'],
+    buckets=LATENCY_BUCKETS
+)
+LLM_PARSE_SECONDS = Histogram(
+    'fraud_llm_response_parse_seconds',
+    'Time spent extracting structured results from LLM responses',
+    buckets=LATENCY_BUCKETS
+)
+REQUEST_SECONDS = Histogram(
+    'fraud_api_request_seconds',
+    'Total time spent handling an API request, including body parsing, validation and serialization',
+    ['endpoint'],
+    buckets=LATENCY_BUCKETS
+)
+
+LLM_FALLBACKS = Counter(
+    'fraud_llm_fallbacks_total',
+    'LLM calls that failed and fell back to default results',
+    ['operation']
+)
+LLM_CACHE_HITS = Counter(
+    'fraud_llm_cache_hits_total',
+    'Transaction analyses served from the LLM analysis cache'
+)
+REVIEW_FLAGS = Counter(
+    'fraud_review_flags_total',
+    'Transactions flagged for manual review'
+)
+
+
+def render_metrics() -> bytes:
+    """Render all registered metrics in the Prometheus text exposition format."""
+    return generate_latest()
+
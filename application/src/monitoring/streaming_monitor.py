@@ -0,0 +1,430 @@
+import asyncio
+import bisect
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Inner bin edges for scores in [0, 1] (ten equal-width bins)
+DEFAULT_SCORE_EDGES = [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9]
+
+# Floor applied to bin proportions so PSI stays finite for empty bins
+_EPSILON = 1e-6
+
+
+def population_stability_index(reference_counts: np.ndarray, current_counts: np.ndarray) -> float:
+    """Compute the PSI between two histograms sharing the same bins."""
+    n_ref = reference_counts.sum()
+    n_cur = current_counts.sum()
+    if n_ref == 0 or n_cur == 0:
+        return 0.0
+    ref_p = np.clip(reference_counts / n_ref, _EPSILON, None)
+    cur_p = np.clip(current_counts / n_cur, _EPSILON, None)
+    return float(np.sum((cur_p - ref_p) * np.log(cur_p / ref_p)))
+
+
+class WindowedHistogram:
+    def __init__(self, edges: Sequence[float], window_size: int):
+        """Histogram over the most recent observations of a single value.
+
+        Memory is fixed at ``window_size`` bin indices: each new value
+        evicts the oldest one from its bin.
+
+        Args:
+            edges: Sorted inner bin edges; values below the first edge and
+                above the last one fall into open-ended outer bins
+            window_size: Number of most recent observations to keep
+        """
+        self.edges = [float(edge) for edge in edges]
+        self.window_size = window_size
+        self.counts = np.zeros(len(self.edges) + 1, dtype=np.int64)
+        self._ring = np.full(window_size, -1, dtype=np.int64)
+        self._position = 0
+        self._filled = 0
+
+    @property
+    def is_full(self) -> bool:
+        return self._filled == self.window_size
+
+    def add(self, value: float) -> None:
+        """Add a single observation to the window."""
+        bin_index = bisect.bisect_right(self.edges, value)
+        evicted = self._ring[self._position]
+        if evicted >= 0:
+            self.counts[evicted] -= 1
+        self._ring[self._position] = bin_index
+        self.counts[bin_index] += 1
+        self._position = (self._position + 1) % self.window_size
+        self._filled = min(self._filled + 1, self.window_size)
+
+    def add_many(self, values: Sequence[float]) -> None:
+        """Add a micro-batch of observations to the window."""
+        bins = np.searchsorted(self.edges, np.asarray(values, dtype=np.float64), side='right')
+        if len(bins) > self.window_size:
+            bins = bins[-self.window_size:]
+        positions = (self._position + np.arange(len(bins))) % self.window_size
+        evicted = self._ring[positions]
+        np.subtract.at(self.counts, evicted[evicted >= 0], 1)
+        np.add.at(self.counts, bins, 1)
+        self._ring[positions] = bins
+        self._position = int((self._position + len(bins)) % self.window_size)
+        self._filled = min(self._filled + len(bins), self.window_size)
+
+
+class DelayedLabelConfusionMatrix:
+    def __init__(self, max_pending: int = 100000):
+        """Running confusion matrix for labels that arrive after scoring.
+
+        Args:
+            max_pending: Maximum number of predictions kept while waiting
+                for their label; the oldest ones are dropped beyond that
+        """
+        self.max_pending = max_pending
+        self._pending: "OrderedDict[str, bool]" = OrderedDict()
+        self.true_positives = 0
+        self.false_positives = 0
+        self.true_negatives = 0
+        self.false_negatives = 0
+        self.expired_predictions = 0
+        self.unmatched_labels = 0
+
+    def record_prediction(self, transaction_id: str, predicted_fraud: bool) -> None:
+        """Remember a prediction until its label arrives."""
+        self._pending[transaction_id] = bool(predicted_fraud)
+        if len(self._pending) > self.max_pending:
+            self._pending.popitem(last=False)
+            self.expired_predictions += 1
+
+    def record_label(self, transaction_id: str, is_fraud: bool) -> bool:
+        """Match a label with its prediction.
+
+        Returns:
+            bool: Whether a pending prediction was found for the label
+        """
+        predicted = self._pending.pop(transaction_id, None)
+        if predicted is None:
+            self.unmatched_labels += 1
+            return False
+
+        if predicted and is_fraud:
+            self.true_positives += 1
+        elif predicted:
+            self.false_positives += 1
+        elif is_fraud:
+            self.false_negatives += 1
+        else:
+            self.true_negatives += 1
+        return True
+
+    @property
+    def labelled(self) -> int:
+        return self.true_positives + self.false_positives + self.true_negatives + self.false_negatives
+
+    def metrics(self) -> Dict[str, Any]:
+        """Precision, recall and F1 over all labelled predictions."""
+        tp, fp, fn = self.true_positives, self.false_positives, self.false_negatives
+        precision = tp / (tp + fp) if tp + fp else None
+        recall = tp / (tp + fn) if tp + fn else None
+        f1 = None
+        if precision and recall:
+            f1 = 2 * precision * recall / (precision + recall)
+        return {
+            'labelled': self.labelled,
+            'pending': len(self._pending),
+            'true_positives': tp,
+            'false_positives': fp,
+            'true_negatives': self.true_negatives,
+            'false_negatives': fn,
+            'precision': precision,
+            'recall': recall,
+            'f1_score': f1
+        }
+
+
+class StreamingMonitor:
+    def __init__(
+        self,
+        window_size: int = 1000,
+        score_edges: Optional[Sequence[float]] = None,
+        feature_edges: Optional[Dict[str, Sequence[float]]] = None,
+        reference_counts: Optional[Dict[str, Sequence[int]]] = None,
+        psi_threshold: float = 0.2,
+        min_precision: Optional[float] = None,
+        min_recall: Optional[float] = None,
+        min_labelled: int = 50,
+        check_interval: int = 100,
+        max_pending_labels: int = 100000,
+        alert_handlers: Optional[List[Callable[[Dict[str, Any]], None]]] = None
+    ):
+        """Constant-memory drift and performance monitor for scored events.
+
+        Each event is a dictionary with ``transaction_id``, ``score``,
+        ``predicted_fraud`` and an optional ``features`` mapping. Scores and
+        the configured features are tracked in sliding-window histograms and
+        compared to a reference histogram with PSI. When no reference is
+        given for a stream, its first full window becomes the reference.
+
+        Args:
+            window_size: Number of most recent events per histogram
+            score_edges: Inner bin edges for the score histogram
+            feature_edges: Inner bin edges for each monitored feature
+            reference_counts: Reference bin counts keyed by stream name
+                (``'score'`` or a feature name)
+            psi_threshold: PSI above which a drift alert is raised
+            min_precision: Precision below which an alert is raised
+            min_recall: Recall below which an alert is raised
+            min_labelled: Labels required before performance is checked
+            check_interval: Number of events between threshold checks
+            max_pending_labels: Predictions kept while waiting for labels
+            alert_handlers: Callables invoked with each raised alert
+        """
+        self.window_size = window_size
+        self.psi_threshold = psi_threshold
+        self.min_precision = min_precision
+        self.min_recall = min_recall
+        self.min_labelled = min_labelled
+        self.check_interval = check_interval
+        self.alert_handlers = list(alert_handlers or [])
+
+        self.histograms: Dict[str, WindowedHistogram] = {
+            'score': WindowedHistogram(score_edges or DEFAULT_SCORE_EDGES, window_size)
+        }
+        for feature, edges in (feature_edges or {}).items():
+            self.histograms[feature] = WindowedHistogram(edges, window_size)
+
+        self.reference: Dict[str, np.ndarray] = {}
+        for name, counts in (reference_counts or {}).items():
+            if name in self.histograms:
+                self.reference[name] = np.asarray(counts, dtype=np.int64)
+
+        self.confusion_matrix = DelayedLabelConfusionMatrix(max_pending_labels)
+        self.events_seen = 0
+        self.alerts: List[Dict[str, Any]] = []
+        self._breached: Dict[str, bool] = {}
+        self._events_since_check = 0
+
+    def observe(self, event: Dict[str, Any]) -> None:
+        """Consume a single scored event."""
+        self.histograms['score'].add(float(event['score']))
+        features = event.get('features') or {}
+        for name, histogram in self.histograms.items():
+            if name != 'score' and features.get(name) is not None:
+                histogram.add(float(features[name]))
+
+        self.record_prediction(event)
+        self._after_events(1)
+
+    def observe_many(self, events: Iterable[Dict[str, Any]], record_predictions: bool = True) -> None:
+        """Consume a micro-batch of scored events.
+
+        Args:
+            events: Scored events
+            record_predictions: Whether to register the events' predictions
+                for label matching; off when the caller already did
+        """
+        events = list(events)
+        if not events:
+            return
+
+        self.histograms['score'].add_many([float(event['score']) for event in events])
+        for name, histogram in self.histograms.items():
+            if name == 'score':
+                continue
+            values = [
+                float(event['features'][name]) for event in events
+                if (event.get('features') or {}).get(name) is not None
+            ]
+            if values:
+                histogram.add_many(values)
+
+        if record_predictions:
+            for event in events:
+                self.record_prediction(event)
+
+        self._after_events(len(events))
+
+    def record_prediction(self, event: Dict[str, Any]) -> None:
+        """Register a scored event's prediction until its label arrives."""
+        if event.get('transaction_id') is not None:
+            self.confusion_matrix.record_prediction(event['transaction_id'], event.get('predicted_fraud', False))
+
+    def record_label(self, transaction_id: str, is_fraud: bool) -> bool:
+        """Record a delayed ground-truth label for a scored transaction."""
+        return self.confusion_matrix.record_label(transaction_id, is_fraud)
+
+    def drift(self) -> Dict[str, Optional[float]]:
+        """PSI of each monitored stream against its reference."""
+        return {
+            name: population_stability_index(self.reference[name], histogram.counts)
+            if name in self.reference else None
+            for name, histogram in self.histograms.items()
+        }
+
+    def check_thresholds(self) -> List[Dict[str, Any]]:
+        """Evaluate alert thresholds and return newly raised alerts.
+
+        An alert is raised once when a threshold is crossed and re-armed
+        when the metric recovers, so a persistent breach is not re-reported
+        on every check.
+        """
+        self._freeze_references()
+        raised = []
+
+        for name, psi in self.drift().items():
+            if psi is not None:
+                alert = self._evaluate(f'psi:{name}', psi, self.psi_threshold, psi >= self.psi_threshold)
+                if alert:
+                    raised.append(alert)
+
+        performance = self.confusion_matrix.metrics()
+        if performance['labelled'] >= self.min_labelled:
+            for metric, threshold in (('precision', self.min_precision), ('recall', self.min_recall)):
+                value = performance[metric]
+                if threshold is None or value is None:
+                    continue
+                alert = self._evaluate(metric, value, threshold, value < threshold)
+                if alert:
+                    raised.append(alert)
+
+        return raised
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current monitoring state as a JSON-serialisable dictionary."""
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'events_seen': self.events_seen,
+            'window_size': self.window_size,
+            'histograms': {name: histogram.counts.tolist() for name, histogram in self.histograms.items()},
+            'psi': self.drift(),
+            'performance': self.confusion_matrix.metrics(),
+            'active_alerts': sorted(key for key, breached in self._breached.items() if breached)
+        }
+
+    def _after_events(self, count: int) -> None:
+        self.events_seen += count
+        self._events_since_check += count
+        if self._events_since_check >= self.check_interval:
+            self._events_since_check = 0
+            self.check_thresholds()
+
+    def _freeze_references(self) -> None:
+        """Use the first full window as the reference for unreferenced streams."""
+        for name, histogram in self.histograms.items():
+            if name not in self.reference and histogram.is_full:
+                self.reference[name] = histogram.counts.copy()
+
+    def _evaluate(self, key: str, value: float, threshold: float, breached: bool) -> Optional[Dict[str, Any]]:
+        was_breached = self._breached.get(key, False)
+        self._breached[key] = breached
+        if not breached or was_breached:
+            return None
+
+        alert = {
+            'alert': key,
+            'value': value,
+            'threshold': threshold,
+            'timestamp': datetime.now().isoformat()
+        }
+        logger.warning(f"Monitoring threshold crossed for {key}: {value:.4f} (threshold {threshold})")
+        self.alerts.append(alert)
+        del self.alerts[:-100]
+        for handler in self.alert_handlers:
+            try:
+                handler(alert)
+            except Exception:
+                logger.exception(f"Alert handler failed for {key}")
+        return alert
+
+
+class MonitorSidecar:
+    def __init__(self, monitor: StreamingMonitor, max_queue_size: int = 10000, batch_size: int = 100):
+        """Run a StreamingMonitor as a background task in the API process.
+
+        Request handlers hand events over with :meth:`submit`, which never
+        blocks; the task drains the queue in micro-batches. Events are
+        dropped (and counted) when the queue is full or the task has not
+        been started, so monitoring can never slow down scoring.
+        Predictions are registered for label matching on submit, so a
+        label arriving before its event is drained still matches.
+
+        Args:
+            monitor: Monitor fed by the sidecar
+            max_queue_size: Maximum number of events waiting to be consumed
+            batch_size: Maximum number of events consumed per micro-batch
+        """
+        self.monitor = monitor
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.dropped_events = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> asyncio.Task:
+        """Start consuming events on the running event loop."""
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._task = asyncio.ensure_future(self._run())
+        return self._task
+
+    async def stop(self) -> None:
+        """Consume the events still queued and stop the background task."""
+        if self._task is None:
+            return
+        self._drain()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._queue = None
+
+    def submit(self, event: Dict[str, Any]) -> bool:
+        """Queue a scored event without blocking.
+
+        Returns:
+            bool: Whether the event was queued
+        """
+        self.monitor.record_prediction(event)
+        if self._queue is None:
+            self.dropped_events += 1
+            return False
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.dropped_events += 1
+            return False
+
+    def record_label(self, transaction_id: str, is_fraud: bool) -> bool:
+        """Forward a delayed label to the monitor."""
+        return self.monitor.record_label(transaction_id, is_fraud)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Monitor snapshot including sidecar queue statistics."""
+        return {
+            **self.monitor.snapshot(),
+            'queued_events': self._queue.qsize() if self._queue else 0,
+            'dropped_events': self.dropped_events
+        }
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                self.monitor.observe_many(batch, record_predictions=False)
+            except Exception:
+                logger.exception("Streaming monitor failed to consume a batch")
+
+    def _drain(self) -> None:
+        batch = []
+        while not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        if batch:
+            self.monitor.observe_many(batch, record_predictions=False)
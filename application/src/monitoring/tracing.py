@@ -0,0 +1,243 @@
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, TextIO
+
+logger = logging.getLogger(__name__)
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar('fraud_current_span', default=None)
+
+
+class Span:
+    __slots__ = (
+        'name', 'trace_id', 'span_id', 'parent_span_id', 'sampled',
+        'start_time_unix_nano', 'end_time_unix_nano', 'attributes',
+        'events', 'status', '_tracer', '_token'
+    )
+
+    def __init__(self, tracer: 'Tracer', name: str, trace_id: int, parent_span_id: Optional[int],
+                 sampled: bool, attributes: Optional[Dict[str, Any]] = None):
+        """A timed operation within a trace.
+
+        Unsampled spans are only created for trace roots, so that their
+        descendants inherit the sampling decision; they are never exported.
+        """
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = random.getrandbits(64)
+        self.parent_span_id = parent_span_id
+        self.sampled = sampled
+        self.attributes = dict(attributes) if attributes else {}
+        self.events: List[Dict[str, Any]] = []
+        self.status = 'STATUS_CODE_UNSET'
+        self.start_time_unix_nano = 0
+        self.end_time_unix_nano = 0
+        self._tracer = tracer
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        """Record a point in time within the span."""
+        self.events.append({
+            'name': name,
+            'timeUnixNano': time.time_ns(),
+            'attributes': attributes or {}
+        })
+
+    def __enter__(self) -> 'Span':
+        self.start_time_unix_nano = time.time_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.end_time_unix_nano = time.time_ns()
+        _current_span.reset(self._token)
+        if exc is not None:
+            self.status = 'STATUS_CODE_ERROR'
+            self.add_event('exception', {
+                'exception.type': exc_type.__name__,
+                'exception.message': str(exc)
+            })
+        if self.sampled:
+            self._tracer._export(self)
+        return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The span in OTLP JSON field naming."""
+        return {
+            'traceId': f'{self.trace_id:032x}',
+            'spanId': f'{self.span_id:016x}',
+            'parentSpanId': f'{self.parent_span_id:016x}' if self.parent_span_id else '',
+            'name': self.name,
+            'startTimeUnixNano': self.start_time_unix_nano,
+            'endTimeUnixNano': self.end_time_unix_nano,
+            'attributes': self.attributes,
+            'events': self.events,
+            'status': {'code': self.status},
+            'resource': {'service.name': self._tracer.service_name}
+        }
+
+
+class _NoopSpan:
+    """Shared do-nothing span returned when a span is not sampled."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        pass
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class ConsoleSpanExporter:
+    def __init__(self, stream: Optional[TextIO] = None):
+        """Write finished spans as JSON lines to a stream (stdout by default)."""
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self.stream.write(line + '\n')
+
+    def shutdown(self) -> None:
+        self.stream.flush()
+
+
+class FileSpanExporter:
+    def __init__(self, path: str):
+        """Append finished spans as JSON lines to a local file."""
+        self.path = path
+        self._file = open(path, 'a', buffering=1)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._file.write(line + '\n')
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class InMemorySpanExporter:
+    def __init__(self):
+        """Keep finished spans in memory, mainly for tests."""
+        self.spans: List[Dict[str, Any]] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span.to_dict())
+
+    def shutdown(self) -> None:
+        pass
+
+
+class Tracer:
+    def __init__(self, service_name: str = 'fraud-detection', sample_ratio: float = 0.0, exporter: Any = None):
+        """Create spans with parent-based, trace-ratio sampling.
+
+        Args:
+            service_name: Reported as the ``service.name`` resource attribute
+            sample_ratio: Fraction of traces recorded (0 disables tracing)
+            exporter: Object with ``export(span)`` and ``shutdown()``
+        """
+        self.service_name = service_name
+        self.sample_ratio = sample_ratio
+        self.exporter = exporter
+
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        """Start a span as a child of the current one; use it as a context manager."""
+        if self.sample_ratio <= 0.0 or self.exporter is None:
+            return NOOP_SPAN
+
+        parent = _current_span.get()
+        if parent is None:
+            sampled = self.sample_ratio >= 1.0 or random.random() < self.sample_ratio
+            return Span(self, name, random.getrandbits(128), None, sampled, attributes)
+        if not parent.sampled:
+            return NOOP_SPAN
+        return Span(self, name, parent.trace_id, parent.span_id, True, attributes)
+
+    def trace(self, name: Optional[str] = None) -> Callable:
+        """Decorator running a function (sync or async) inside a span."""
+        def decorator(func: Callable) -> Callable:
+            span_name = name or func.__qualname__
+
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.start_span(span_name):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.start_span(span_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _export(self, span: Span) -> None:
+        try:
+            self.exporter.export(span)
+        except Exception:
+            logger.exception("Failed to export span")
+
+
+def current_span():
+    """The active span, or a no-op span when nothing is being recorded."""
+    span = _current_span.get()
+    return span if span is not None and span.sampled else NOOP_SPAN
+
+
+def _exporter_from_env() -> Any:
+    exporter = os.getenv('OTEL_TRACES_EXPORTER', 'console').lower()
+    if exporter == 'console':
+        return ConsoleSpanExporter()
+    if exporter == 'file':
+        return FileSpanExporter(os.getenv('FRAUD_TRACES_FILE', 'traces.jsonl'))
+    return None
+
+
+def configure_tracing(sample_ratio: Optional[float] = None, exporter: Any = None) -> Tracer:
+    """Reconfigure the shared tracer.
+
+    Without arguments the settings come from the standard OpenTelemetry
+    environment variables: ``OTEL_TRACES_SAMPLER_ARG`` (sampling ratio,
+    default 0) and ``OTEL_TRACES_EXPORTER`` (``console``, ``file`` or
+    ``none``); ``FRAUD_TRACES_FILE`` names the file for the file exporter.
+    """
+    if sample_ratio is None:
+        sample_ratio = float(os.getenv('OTEL_TRACES_SAMPLER_ARG', '0'))
+    if exporter is None and sample_ratio > 0:
+        exporter = _exporter_from_env()
+
+    if tracer.exporter is not None and tracer.exporter is not exporter:
+        tracer.exporter.shutdown()
+    tracer.sample_ratio = sample_ratio
+    tracer.exporter = exporter
+    return tracer
+
+
+tracer = Tracer(service_name=os.getenv('OTEL_SERVICE_NAME', 'fraud-detection'))
+configure_tracing()
@@ -1,19 +1,30 @@
-from typing import Dict, Any, List
+import asyncio
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 from ..models.ml_model import FraudDetectionModel
 from ..llm.openai_client import OpenAIClient
+from ..monitoring.metrics import FEATURE_PREP_SECONDS, ML_INFERENCE_SECONDS, REVIEW_FLAGS
+from ..monitoring.streaming_monitor import MonitorSidecar
+from ..monitoring.tracing import current_span, tracer
 
 class FraudDetectionService:
-    def __init__(self, risk_threshold: float = 0.7):
+    def __init__(self, risk_threshold: float = 0.7, monitor: Optional[MonitorSidecar] = None,
+                 llm_client: Optional[OpenAIClient] = None, batch_concurrency: int = 8):
         """Initialize the fraud detection service.
         
         Args:
             risk_threshold: Threshold for flagging transactions for review (0 to 1)
+            monitor: Optional monitoring sidecar fed with every scored transaction
+            llm_client: LLM analysis client; defaults to one using the configured backend
+            batch_concurrency: Transactions analyzed concurrently within a batch
         """
         self.ml_model = FraudDetectionModel()
-        self.llm_client = OpenAIClient()
+        self.llm_client = llm_client or OpenAIClient()
         self.risk_threshold = risk_threshold
+        self.monitor = monitor
+        self.batch_concurrency = batch_concurrency
     
+    @tracer.trace('FraudDetectionService.analyze_transaction')
     async def analyze_transaction(self, transaction: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze a single transaction using both ML and LLM.
         
@@ -23,6 +34,8 @@ class FraudDetectionService:
         Returns:
             Dictionary containing analysis results
         """
+        current_span().set_attribute('transaction.id', transaction.get('transaction_id'))
+        
         # Get ML prediction
         ml_prediction = self._get_ml_prediction(transaction)
         
@@ -34,13 +47,22 @@ class FraudDetectionService:
         
         # Determine if review is needed
         needs_review = self._determine_review_needed(combined_analysis['combined_risk_score'])
+        if needs_review:
+            REVIEW_FLAGS.inc()
+        
+        if self.monitor is not None:
+            self._publish_to_monitor(transaction, combined_analysis, needs_review)
         
         return {
+            'transaction_id': transaction['transaction_id'],
             **combined_analysis,
+            'fraud_indicators': llm_analysis['fraud_indicators'],
+            'recommendations': llm_analysis['recommendations'],
             'needs_review': needs_review,
             'timestamp': datetime.now().isoformat()
         }
     
+    @tracer.trace('FraudDetectionService.analyze_batch')
     async def analyze_batch(self, transactions: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Analyze multiple transactions concurrently.
         
@@ -50,32 +72,34 @@ class FraudDetectionService:
         Returns:
             Dictionary containing batch analysis results
         """
-        results = []
-        high_risk_count = 0
+        results: List[Optional[Dict[str, Any]]] = [None] * len(transactions)
+        semaphore = asyncio.Semaphore(self.batch_concurrency)
         
-        # Process each transaction
-        for transaction in transactions:
-            result = await self.analyze_transaction(transaction)
-            results.append(result)
-            
-            if result['needs_review']:
-                high_risk_count += 1
+        # The report is built incrementally: chunks of high-risk incidents
+        # are summarized while the rest of the batch is still being analyzed
+        report_generator = self.llm_client.create_report_generator()
         
-        # Generate batch report if there are high-risk transactions
-        batch_report = None
-        if high_risk_count > 0:
-            high_risk_incidents = [
-                {
+        async def analyze(index: int, transaction: Dict[str, Any]) -> None:
+            async with semaphore:
+                result = await self.analyze_transaction(transaction)
+            results[index] = result
+            if result['needs_review']:
+                report_generator.add({
                     'transaction_id': result['transaction_id'],
-                    'amount': result['amount'],
-                    'merchant': result['merchant_name'],
+                    'amount': transaction['amount'],
+                    'merchant': transaction['merchant_name'],
                     'risk_score': result['combined_risk_score'],
-                    'fraud_indicators': result['llm_analysis']['fraud_indicators']
-                }
-                for result in results
-                if result['needs_review']
-            ]
-            batch_report = await self.llm_client.generate_fraud_report(high_risk_incidents)
+                    'fraud_indicators': result['fraud_indicators']
+                })
+        
+        try:
+            await asyncio.gather(*(analyze(i, tx) for i, tx in enumerate(transactions)))
+        except Exception:
+            report_generator.cancel()
+            raise
+        
+        high_risk_count = sum(1 for result in results if result['needs_review'])
+        batch_report = await report_generator.finish()
         
         return {
             'results': results,
@@ -86,8 +110,10 @@ class FraudDetectionService:
     
     def _get_ml_prediction(self, transaction: Dict[str, Any]) -> float:
         """Get ML model prediction for a transaction."""
-        features = self.ml_model.prepare_features(transaction)
-        return self.ml_model.predict(features)
+        with FEATURE_PREP_SECONDS.time():
+            features = self.ml_model.prepare_features(transaction)
+        with ML_INFERENCE_SECONDS.time():
+            return self.ml_model.predict(features)
     
     def _combine_analyses(self, ml_prediction: float, llm_analysis: Dict[str, Any]) -> Dict[str, Any]:
         """Combine ML and LLM analyses into a single result."""
@@ -106,6 +132,19 @@ class FraudDetectionService:
             'combined_risk_score': combined_risk_score
         }
     
+    def _publish_to_monitor(self, transaction: Dict[str, Any], analysis: Dict[str, Any], needs_review: bool) -> None:
+        """Hand a scored transaction to the monitoring sidecar."""
+        self.monitor.submit({
+            'transaction_id': transaction.get('transaction_id'),
+            'score': analysis['combined_risk_score'],
+            'predicted_fraud': needs_review,
+            'features': {
+                'amount': float(transaction['amount']),
+                'ml_prediction': analysis['ml_prediction'],
+                'llm_risk_score': analysis['llm_analysis']['risk_score']
+            }
+        })
+    
     def _determine_review_needed(self, risk_score: float) -> bool:
         """Determine if a transaction needs manual review."""
         return risk_score >= self.risk_threshold 
\ No newline at end of file
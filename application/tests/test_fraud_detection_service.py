@@ -0,0 +1,31 @@
+from datetime import datetime
+import pytest
+from application.src.llm.backends import StubBackend
+from application.src.llm.openai_client import OpenAIClient
+from application.src.services.fraud_detection_service import FraudDetectionService
+
+# Fields of the API's TransactionResponse model
+RESPONSE_FIELDS = {
+    "transaction_id", "timestamp", "ml_prediction", "llm_analysis",
+    "combined_risk_score", "fraud_indicators", "needs_review", "recommendations"
+}
+
+@pytest.mark.asyncio
+async def test_analysis_result_matches_response_model():
+    """Results carry every TransactionResponse field, with a float ML score."""
+    client = OpenAIClient(backend=StubBackend(latency_ms=0))
+    service = FraudDetectionService(llm_client=client)
+
+    result = await service.analyze_transaction({
+        "transaction_id": "TX7",
+        "amount": 120.0,
+        "merchant_name": "Grocery Store",
+        "location": "Home City",
+        "timestamp": datetime(2024, 1, 1, 14, 0)
+    })
+
+    assert RESPONSE_FIELDS <= set(result)
+    assert result["transaction_id"] == "TX7"
+    assert isinstance(result["ml_prediction"], float)
+    assert result["fraud_indicators"] == result["llm_analysis"]["fraud_indicators"]
+    assert result["recommendations"] == result["llm_analysis"]["recommendations"]
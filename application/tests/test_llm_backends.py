@@ -0,0 +1,84 @@
+import json
+from datetime import datetime
+import pytest
+from application.src.llm.backends import LLMBackendError, StubBackend, create_backend
+from application.src.llm.openai_client import OpenAIClient
+from application.src.services.fraud_detection_service import FraudDetectionService
+
+MESSAGES = [
+    {"role": "system", "content": "You are a fraud detection expert."},
+    {"role": "user", "content": "Transaction ID: TX1\nAmount: $250.0"}
+]
+
+@pytest.mark.asyncio
+async def test_stub_is_deterministic():
+    """The same prompt gets the same reply regardless of the seed."""
+    functions = [{"name": "report_fraud_analysis", "parameters": {}}]
+    first = await StubBackend(latency_ms=0, seed=1).chat(MESSAGES, functions=functions)
+    second = await StubBackend(latency_ms=0, seed=2).chat(MESSAGES, functions=functions)
+
+    assert first == second
+    assert first["function_call"]["name"] == "report_fraud_analysis"
+    assert 0.0 <= json.loads(first["function_call"]["arguments"])["risk_score"] <= 1.0
+
+@pytest.mark.asyncio
+async def test_stub_error_rate():
+    """Failures follow the configured error rate."""
+    backend = StubBackend(latency_ms=0, error_rate=0.3, seed=7)
+    errors = 0
+    for _ in range(1000):
+        try:
+            await backend.chat(MESSAGES)
+        except LLMBackendError:
+            errors += 1
+
+    assert 250 < errors < 350
+
+@pytest.mark.parametrize("distribution", ["normal", "lognormal"])
+def test_stub_latency_mean_and_jitter(distribution):
+    """latency_ms is the mean and latency_jitter_ms the standard deviation."""
+    backend = StubBackend(latency_ms=200, latency_jitter_ms=50, latency_distribution=distribution, seed=3)
+    samples = [backend._sample_latency() for _ in range(20000)]
+    mean = sum(samples) / len(samples)
+    std = (sum((sample - mean) ** 2 for sample in samples) / len(samples)) ** 0.5
+
+    assert mean == pytest.approx(200, rel=0.02)
+    assert std == pytest.approx(50, rel=0.05)
+
+def test_create_backend_env_override(monkeypatch):
+    """LLM_BACKEND takes precedence over the configured backend."""
+    monkeypatch.setenv("LLM_BACKEND", "stub")
+    backend = create_backend({"backend": "openai", "stub": {"latency_ms": 5}})
+
+    assert isinstance(backend, StubBackend)
+    assert backend.latency_ms == 5
+    with pytest.raises(ValueError):
+        monkeypatch.setenv("LLM_BACKEND", "unknown")
+        create_backend({})
+
+@pytest.mark.asyncio
+async def test_service_end_to_end_with_stub():
+    """A transaction as parsed by the API is scored without network access."""
+    client = OpenAIClient(backend=StubBackend(latency_ms=0))
+    service = FraudDetectionService(risk_threshold=0.6, llm_client=client)
+    transactions = [
+        {
+            "transaction_id": f"TX{i}",
+            "amount": 5000.0,
+            "merchant_name": "Unknown",
+            "location": "High Risk Area",
+            "timestamp": datetime(2024, 1, 1, 3, 0),
+            "customer_history": None
+        }
+        for i in range(2)
+    ]
+
+    batch = await service.analyze_batch(transactions)
+    result = batch["results"][0]
+
+    assert result["transaction_id"] == "TX0"
+    assert result["ml_prediction"] == 1.0
+    assert result["llm_analysis"]["parse_mode"] == "structured"
+    assert result["fraud_indicators"] and result["recommendations"]
+    assert batch["high_risk_count"] == 2
+    assert batch["batch_report"].startswith("Risk score")
@@ -0,0 +1,21 @@
+from application.src.monitoring.metrics import (
+    FEATURE_PREP_SECONDS,
+    LLM_FALLBACKS,
+    REVIEW_FLAGS,
+    render_metrics
+)
+
+def test_metrics_exposition_format():
+    """Timed sections and counters show up in the text exposition output."""
+    with FEATURE_PREP_SECONDS.time():
+        pass
+    LLM_FALLBACKS.labels(operation='analysis').inc()
+    REVIEW_FLAGS.inc()
+
+    output = render_metrics().decode()
+
+    assert "# TYPE fraud_feature_prep_seconds histogram" in output
+    assert 'fraud_feature_prep_seconds_bucket{le="0.0005"}' in output
+    assert 'fraud_llm_fallbacks_total{operation="analysis"}' in output
+    assert "fraud_review_flags_total" in output
+    assert "# TYPE fraud_api_request_seconds histogram" in output
@@ -0,0 +1,42 @@
+from datetime import datetime
+import pytest
+from application.src.models.ml_model import FraudDetectionModel
+
+def _transaction(**overrides):
+    transaction = {
+        "transaction_id": "TX1",
+        "amount": 50.0,
+        "merchant_name": "Grocery Store",
+        "location": "Home City",
+        "timestamp": "2024-01-01T14:00:00",
+        "customer_history": None
+    }
+    transaction.update(overrides)
+    return transaction
+
+@pytest.mark.parametrize("overrides, expected", [
+    ({}, 0.0),
+    ({"amount": 5000.0}, 0.3),
+    ({"timestamp": "2024-01-01T03:00:00"}, 0.2),
+    ({"merchant_name": "Unknown"}, 0.3),
+    ({"location": "High Risk Area"}, 0.2),
+    ({"amount": 5000.0, "merchant_name": "Unknown", "location": "High Risk Area",
+      "timestamp": "2024-01-01T03:00:00"}, 1.0),
+])
+def test_rule_based_model_scores_prepared_features(overrides, expected):
+    """Each rule reads the feature that prepare_features derives for it."""
+    model = FraudDetectionModel()
+    features = model.prepare_features(_transaction(**overrides))
+
+    assert model.predict(features) == pytest.approx(expected)
+
+def test_prepare_features_accepts_parsed_timestamps():
+    """The API passes datetimes; stored transactions carry ISO strings."""
+    model = FraudDetectionModel()
+    parsed = model.prepare_features(_transaction(timestamp=datetime(2024, 1, 6, 3, 0)))
+    serialized = model.prepare_features(_transaction(timestamp="2024-01-06T03:00:00"))
+
+    assert parsed == serialized
+    assert parsed["hour"] == 3
+    assert parsed["day_of_week"] == 5
+    assert parsed["customer_risk_score"] == 0.5
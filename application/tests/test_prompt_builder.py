@@ -0,0 +1,55 @@
+import pytest
+from application.src.llm.prompt_builder import PromptBuilder
+
+@pytest.fixture
+def transaction():
+    return {
+        "transaction_id": "TX123456",
+        "amount": 1500.00,
+        "merchant_name": "Online Electronics Store",
+        "location": "New York, NY",
+        "timestamp": "2024-02-01T10:00:00"
+    }
+
+def _history(n):
+    return {
+        "previous_transactions": [
+            {"amount": 20.0 + i % 50, "merchant": f"Merchant {i % 9}", "date": f"2023-{1 + i % 12:02d}-{1 + i % 28:02d}"}
+            for i in range(n)
+        ] + [{"amount": 9000.0, "merchant": "Jeweller", "date": "2022-06-01"}],
+        "average_transaction": 45.0,
+        "location_changes": 3
+    }
+
+def test_long_history_stays_within_budget(transaction):
+    """Prompt size no longer grows with the number of previous transactions."""
+    builder = PromptBuilder(max_prompt_tokens=400)
+    transaction["customer_history"] = _history(5000)
+
+    prompt = builder.build_analysis_prompt(transaction)
+
+    assert builder.counter.count(prompt) <= 400
+    assert "Previous Transactions: 5001" in prompt
+    assert "$9000.0 at Jeweller" in prompt
+    assert "Location Changes: 3" in prompt
+
+def test_short_history_is_listed(transaction):
+    """Small histories keep every transaction in the prompt."""
+    builder = PromptBuilder()
+    transaction["customer_history"] = {
+        "previous_transactions": [
+            {"amount": 100.00, "merchant": "Local Grocery", "date": "2024-01-01"},
+            {"amount": 50.00, "merchant": "Coffee Shop", "date": "2024-01-02"}
+        ]
+    }
+
+    prompt = builder.build_analysis_prompt(transaction)
+
+    assert "- $100.0 at Local Grocery on 2024-01-01" in prompt
+    assert "- $50.0 at Coffee Shop on 2024-01-02" in prompt
+    assert "Transaction ID: TX123456" in prompt
+
+def test_missing_history(transaction):
+    """Transactions without history say so instead of failing."""
+    transaction["customer_history"] = None
+    assert "No customer history available" in PromptBuilder().build_analysis_prompt(transaction)
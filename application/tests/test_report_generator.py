@@ -0,0 +1,70 @@
+import asyncio
+import pytest
+from application.src.llm.report_generator import ReportGenerator, cluster_key
+
+class FakeClient:
+    def __init__(self, fail_operations=()):
+        self.calls = []
+        self.fail_operations = fail_operations
+
+    async def complete(self, prompt, system_prompt, operation):
+        self.calls.append(operation)
+        await asyncio.sleep(0)
+        if operation in self.fail_operations:
+            return None
+        return f"{operation} #{len(self.calls)}"
+
+def _incident(i, indicator="Unusual amount"):
+    return {
+        "transaction_id": f"TX{i}",
+        "amount": 100.0 + i,
+        "merchant": "Store",
+        "risk_score": 0.8,
+        "fraud_indicators": [indicator]
+    }
+
+def test_cluster_key_uses_primary_indicator():
+    assert cluster_key(_incident(1, " Unusual  Amount")) == "unusual amount"
+    assert cluster_key({"fraud_indicators": []}) == "unspecified"
+
+@pytest.mark.asyncio
+async def test_small_batch_uses_single_call():
+    client = FakeClient()
+    generator = ReportGenerator(client, chunk_size=5)
+    for i in range(3):
+        generator.add(_incident(i))
+
+    assert await generator.finish() == "report #1"
+    assert client.calls == ["report"]
+
+@pytest.mark.asyncio
+async def test_no_incidents_returns_none():
+    assert await ReportGenerator(FakeClient()).finish() is None
+
+@pytest.mark.asyncio
+async def test_chunks_start_before_finish_and_merge_hierarchically():
+    """Full chunks are summarized as incidents arrive; summaries are reduced fan_in at a time."""
+    client = FakeClient()
+    generator = ReportGenerator(client, chunk_size=2, fan_in=2)
+    for i in range(8):
+        generator.add(_incident(i, "Unusual amount" if i % 2 else "New merchant"))
+    await asyncio.sleep(0.01)
+
+    assert client.calls.count("report_chunk") == 4
+
+    report = await generator.finish()
+    assert client.calls.count("report_chunk") == 4
+    assert client.calls.count("report_merge") == 2
+    assert client.calls[-1] == "report"
+    assert report.startswith("report")
+
+@pytest.mark.asyncio
+async def test_failed_chunk_keeps_incident_ids():
+    client = FakeClient(fail_operations=("report_chunk", "report"))
+    generator = ReportGenerator(client, chunk_size=2)
+    for i in range(3):
+        generator.add(_incident(i))
+
+    summary = await generator._summarize_chunk([_incident(1), _incident(2)])
+    assert "TX1, TX2" in summary
+    assert await generator.finish() == "Error generating fraud report"
@@ -0,0 +1,103 @@
+import pytest
+from application.src.llm.backends import StubBackend
+from application.src.llm.openai_client import OpenAIClient
+from application.src.llm.similarity_cache import SimilarityCache, transaction_signature
+
+def _transaction(transaction_id, amount=120.0, merchant="Coffee Shop", timestamp="2024-01-01T08:15:00",
+                 customer_id="C1"):
+    return {
+        "transaction_id": transaction_id,
+        "customer_id": customer_id,
+        "amount": amount,
+        "merchant_name": merchant,
+        "location": "Paris",
+        "timestamp": timestamp,
+        "customer_history": {
+            "previous_transactions": [
+                {"amount": 100.0, "merchant": "Coffee Shop", "date": "2023-12-30"},
+                {"amount": 110.0, "merchant": "Bakery", "date": "2023-12-31"}
+            ]
+        }
+    }
+
+def test_signature_normalizes_categorical_features():
+    """Case, whitespace and minutes within the hour band do not change the bucket."""
+    key, _ = transaction_signature(_transaction("TX1", merchant="Coffee  Shop"))
+    other_key, _ = transaction_signature(_transaction("TX2", merchant="coffee shop", timestamp="2024-01-02T06:40:00"))
+
+    assert key == other_key
+
+def test_lookup_respects_threshold_and_ttl():
+    """Near-duplicates reuse the analysis; different amounts or stale entries do not."""
+    cache = SimilarityCache(similarity_threshold=0.95)
+    analysis = {"risk_score": 0.4, "fraud_indicators": [], "recommendations": []}
+    cache.store(_transaction("TX1"), analysis)
+
+    hit = cache.lookup(_transaction("TX2", amount=123.0))
+    assert hit["cached"] is True
+    assert hit["cached_from_transaction_id"] == "TX1"
+    assert hit["risk_score"] == 0.4
+    assert cache.lookup(_transaction("TX3", amount=200.0)) is None
+    assert cache.lookup(_transaction("TX4", merchant="Jeweller")) is None
+
+    cache.ttl_seconds = -1
+    assert cache.lookup(_transaction("TX2", amount=123.0)) is None
+
+def test_analyses_are_not_shared_across_customers():
+    cache = SimilarityCache(similarity_threshold=0.95)
+    sparse = {**_transaction("TX1", customer_id="C1"), "customer_history": None}
+    cache.store(sparse, {"risk_score": 0.9})
+
+    assert cache.lookup({**sparse, "transaction_id": "TX2", "customer_id": "C2"}) is None
+    assert cache.lookup({**sparse, "transaction_id": "TX3"})["risk_score"] == 0.9
+
+    anonymous = {**sparse, "customer_id": None}
+    cache.store(anonymous, {"risk_score": 0.1})
+    assert cache.lookup(anonymous) is None
+
+def test_cached_analysis_is_copied():
+    cache = SimilarityCache()
+    analysis = {"risk_score": 0.8, "fraud_indicators": ["Unusual amount"], "recommendations": ["Call customer"]}
+    cache.store(_transaction("TX1"), analysis)
+    analysis["fraud_indicators"].append("changed after storing")
+
+    hit = cache.lookup(_transaction("TX2"))
+    hit["fraud_indicators"].append("changed by a caller")
+    hit["recommendations"].clear()
+
+    again = cache.lookup(_transaction("TX3"))
+    assert again["fraud_indicators"] == ["Unusual amount"]
+    assert again["recommendations"] == ["Call customer"]
+
+def test_eviction_bounds_size():
+    cache = SimilarityCache(max_entries=4, max_bucket_size=2)
+    for i in range(10):
+        cache.store(_transaction(f"TX{i}", merchant=f"Shop {i % 5}"), {"risk_score": 0.1})
+
+    assert len(cache) <= 4
+
+@pytest.mark.asyncio
+async def test_client_reuses_cached_analysis():
+    """Only the first of two near-duplicate transactions reaches the backend."""
+    calls = []
+
+    class CountingBackend(StubBackend):
+        async def chat(self, messages, **options):
+            calls.append(messages)
+            return await super().chat(messages, **options)
+
+    client = OpenAIClient(backend=CountingBackend(latency_ms=0), analysis_cache=SimilarityCache())
+    first = await client.analyze_transaction(_transaction("TX1"))
+    second = await client.analyze_transaction(_transaction("TX2", amount=121.0))
+
+    assert len(calls) == 1
+    assert first["cached"] is False
+    assert second["cached"] is True
+    assert second["risk_score"] == first["risk_score"]
+
+def test_cache_is_opt_in():
+    """The shipped settings leave reuse off; enabling it takes an explicit setting."""
+    client = OpenAIClient(backend=StubBackend(latency_ms=0))
+
+    assert client.analysis_cache is None
+    assert SimilarityCache.from_settings({"enabled": True, "similarity_threshold": 0.9}).similarity_threshold == 0.9
@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+import numpy as np
+from application.src.monitoring.streaming_monitor import (
+    MonitorSidecar,
+    StreamingMonitor,
+    WindowedHistogram
+)
+
+def _events(scores, start=0):
+    return [
+        {"transaction_id": f"TX{start + i}", "score": score, "predicted_fraud": score >= 0.7}
+        for i, score in enumerate(scores)
+    ]
+
+def test_windowed_histogram_evicts_oldest():
+    """Single and batched updates keep only the last window of values."""
+    single = WindowedHistogram([0.5], window_size=4)
+    batched = WindowedHistogram([0.5], window_size=4)
+    values = [0.1, 0.2, 0.9, 0.8, 0.7, 0.6]
+
+    for value in values:
+        single.add(value)
+    batched.add_many(values[:3])
+    batched.add_many(values[3:])
+
+    assert single.counts.tolist() == [0, 4]
+    assert batched.counts.tolist() == [0, 4]
+    assert single.is_full
+
+def test_score_shift_raises_single_alert():
+    """A shifted score distribution raises one PSI alert until it recovers."""
+    alerts = []
+    monitor = StreamingMonitor(window_size=500, check_interval=100, alert_handlers=[alerts.append])
+    rng = np.random.default_rng(0)
+
+    monitor.observe_many(_events(rng.beta(2, 8, 500)))
+    monitor.check_thresholds()
+    assert alerts == []
+
+    for start in range(500, 1500, 100):
+        monitor.observe_many(_events(rng.beta(8, 2, 100), start))
+
+    assert [alert["alert"] for alert in alerts] == ["psi:score"]
+    assert monitor.snapshot()["psi"]["score"] > 0.2
+
+def test_delayed_labels_update_confusion_matrix():
+    """Labels arriving after scoring are matched to their predictions."""
+    monitor = StreamingMonitor(min_precision=0.9, min_labelled=2)
+    for event in _events([0.9, 0.8, 0.1]):
+        monitor.observe(event)
+
+    assert monitor.record_label("TX0", True)
+    assert monitor.record_label("TX1", False)
+    assert not monitor.record_label("TX99", True)
+    alerts = monitor.check_thresholds()
+
+    performance = monitor.snapshot()["performance"]
+    assert performance["true_positives"] == 1
+    assert performance["false_positives"] == 1
+    assert performance["pending"] == 1
+    assert [alert["alert"] for alert in alerts] == ["precision"]
+
+@pytest.mark.asyncio
+async def test_sidecar_consumes_submitted_events():
+    """The sidecar task feeds queued events into the monitor."""
+    sidecar = MonitorSidecar(StreamingMonitor(), batch_size=10)
+    assert not sidecar.submit(_events([0.5])[0])
+
+    sidecar.start()
+    for event in _events([0.2] * 25):
+        assert sidecar.submit(event)
+    await asyncio.sleep(0)
+    await sidecar.stop()
+
+    assert sidecar.monitor.events_seen == 25
+    assert sidecar.dropped_events == 1
+
+@pytest.mark.asyncio
+async def test_sidecar_matches_labels_before_events_are_drained():
+    """Feedback arriving right after scoring matches its queued prediction once."""
+    sidecar = MonitorSidecar(StreamingMonitor())
+    sidecar.start()
+    sidecar.submit(_events([0.9])[0])
+
+    assert sidecar.record_label("TX0", True)
+    await sidecar.stop()
+
+    performance = sidecar.monitor.snapshot()["performance"]
+    assert performance["true_positives"] == 1
+    assert performance["pending"] == 0
+    assert sidecar.monitor.events_seen == 1
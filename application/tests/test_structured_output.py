@@ -0,0 +1,79 @@
+import json
+import pytest
+import openai
+from application.src.llm.openai_client import OpenAIClient
+from application.src.llm.structured_output import parse_structured_analysis
+
+def _completion(content=None, arguments=None):
+    message = {"role": "assistant", "content": content}
+    if arguments is not None:
+        message["function_call"] = {"name": "report_fraud_analysis", "arguments": arguments}
+    return type("Completion", (), {"choices": [type("Choice", (), {"message": message})()]})()
+
+def test_parse_valid_payload():
+    """Valid payloads are decoded, clamped and trimmed in one pass."""
+    result = parse_structured_analysis(json.dumps({
+        "risk_score": 1.4,
+        "fraud_indicators": [" Unusual amount ", ""],
+        "recommendations": ["Call customer"],
+        "summary": "High amount at a new merchant"
+    }))
+
+    assert result == {
+        "risk_score": 1.0,
+        "fraud_indicators": ["Unusual amount"],
+        "recommendations": ["Call customer"],
+        "summary": "High amount at a new merchant"
+    }
+
+@pytest.mark.parametrize("payload", [
+    None,
+    "Risk score: 0.8",
+    '{"risk_score": "high", "fraud_indicators": [], "recommendations": []}',
+    '{"risk_score": 0.3, "fraud_indicators": []}',
+    '{"risk_score": 0.3, "fraud_indicators": [1], "recommendations": []}',
+    '{"risk_score": 0.3,',
+])
+def test_parse_rejects_invalid_payload(payload):
+    """Anything that does not match the schema falls through to None."""
+    assert parse_structured_analysis(payload) is None
+
+def test_parse_accepts_fenced_json():
+    """JSON returned in a Markdown code fence is still parsed."""
+    content = '```json\n{"risk_score": 0.2, "fraud_indicators": [], "recommendations": ["None"]}\n```'
+    assert parse_structured_analysis(content)["risk_score"] == 0.2
+
+@pytest.mark.asyncio
+async def test_client_uses_function_call_and_falls_back(monkeypatch):
+    """The client requests the analysis function and falls back to regex extraction."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    requests = []
+    responses = [
+        _completion(arguments='{"risk_score": 0.9, "fraud_indicators": ["Velocity"], "recommendations": ["Block card"]}'),
+        _completion(content="Risk score: 0.7\n\nFraud indicators:\nNew merchant")
+    ]
+
+    async def fake_acreate(**kwargs):
+        requests.append(kwargs)
+        return responses.pop(0)
+
+    monkeypatch.setattr(openai.ChatCompletion, "acreate", fake_acreate)
+    client = OpenAIClient()
+    client.analysis_cache = None
+    transaction = {
+        "transaction_id": "TX1",
+        "amount": 10.0,
+        "merchant_name": "Store",
+        "location": "Paris",
+        "timestamp": "2024-01-01T10:00:00"
+    }
+
+    structured = await client.analyze_transaction(transaction)
+    fallback = await client.analyze_transaction(transaction)
+
+    assert requests[0]["function_call"] == {"name": "report_fraud_analysis"}
+    assert structured["parse_mode"] == "structured"
+    assert structured["risk_score"] == 0.9
+    assert structured["fraud_indicators"] == ["Velocity"]
+    assert fallback["parse_mode"] == "regex"
+    assert fallback["risk_score"] == 0.7
@@ -0,0 +1,81 @@
+import time
+import pytest
+from application.src.monitoring.tracing import InMemorySpanExporter, Tracer, current_span
+
+@pytest.fixture
+def exporter():
+    return InMemorySpanExporter()
+
+def test_spans_are_nested_and_exported(exporter):
+    """Child spans share the trace and point at their parent."""
+    tracer = Tracer(sample_ratio=1.0, exporter=exporter)
+
+    with tracer.start_span("request") as root:
+        with tracer.start_span("predict", {"model": "rule_based"}):
+            current_span().set_attribute("score", 0.4)
+
+    child, parent = exporter.spans
+    assert parent["name"] == "request" and parent["parentSpanId"] == ""
+    assert child["traceId"] == parent["traceId"]
+    assert child["parentSpanId"] == parent["spanId"]
+    assert child["attributes"] == {"model": "rule_based", "score": 0.4}
+    assert child["endTimeUnixNano"] >= child["startTimeUnixNano"]
+
+@pytest.mark.asyncio
+async def test_trace_decorator_records_errors(exporter):
+    """Decorated coroutines are timed and exceptions mark the span as failed."""
+    tracer = Tracer(sample_ratio=1.0, exporter=exporter)
+
+    @tracer.trace("llm.call")
+    async def failing_call():
+        raise RuntimeError("timeout")
+
+    with pytest.raises(RuntimeError):
+        await failing_call()
+
+    span = exporter.spans[0]
+    assert span["name"] == "llm.call"
+    assert span["status"]["code"] == "STATUS_CODE_ERROR"
+    assert span["events"][0]["attributes"]["exception.message"] == "timeout"
+
+def test_unsampled_trace_suppresses_children(exporter):
+    """Descendants follow the sampling decision of the trace root."""
+    tracer = Tracer(sample_ratio=1e-12, exporter=exporter)
+
+    with tracer.start_span("request"):
+        with tracer.start_span("predict"):
+            pass
+
+    assert exporter.spans == []
+
+def test_span_overhead_when_sampling_is_off(exporter):
+    """With sampling off, span context managers and decorators cost microseconds at most."""
+    tracer = Tracer(sample_ratio=0.0, exporter=exporter)
+
+    @tracer.trace("noop")
+    def traced():
+        return None
+
+    def untraced():
+        return None
+
+    iterations = 100000
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with tracer.start_span("noop"):
+            pass
+    span_cost = (time.perf_counter() - start) / iterations
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        traced()
+    decorated_cost = (time.perf_counter() - start) / iterations
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        untraced()
+    baseline_cost = (time.perf_counter() - start) / iterations
+
+    assert span_cost < 3e-6
+    assert decorated_cost - baseline_cost < 3e-6
+    assert exporter.spans == []
@@ -1,15 +1,156 @@
 import boto3
+import hashlib
+import os
+import threading
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+MB = 1024 * 1024
+# Files are transferred in parallel by a shared pool; large files are also
+# split into multipart chunks moved by their own threads
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_MULTIPART_THRESHOLD = 16 * MB
+DEFAULT_MULTIPART_CHUNKSIZE = 16 * MB
+DEFAULT_MULTIPART_CONCURRENCY = 4
+
+def local_path(local_dir, key, prefix=''):
+    """Where ``key`` is written under ``local_dir``; None for folder markers.
+
+    Raises:
+        ValueError: The key escapes ``local_dir``, e.g. through ``..`` parts
+    """
+    relative = key[len(prefix):] if prefix and key.startswith(prefix) else key
+    if key.endswith('/') or not relative.strip('/'):
+        return None
+    file_path = os.path.join(local_dir, *relative.strip('/').split('/'))
+    root = os.path.abspath(local_dir)
+    normalized = os.path.abspath(file_path)
+    if normalized == root or os.path.commonpath([root, normalized]) != root:
+        raise ValueError(f"S3 key {key!r} resolves outside {local_dir!r}")
+    return file_path
 
 class S3Client:
-    def __init__(self, aws_region):
-        self.s3 = boto3.client('s3', region_name=aws_region)
+    def __init__(self, aws_region, max_workers=DEFAULT_MAX_WORKERS,
+                 multipart_threshold=DEFAULT_MULTIPART_THRESHOLD,
+                 multipart_chunksize=DEFAULT_MULTIPART_CHUNKSIZE,
+                 multipart_concurrency=DEFAULT_MULTIPART_CONCURRENCY):
+        # Enough pooled connections for every file and part in flight
+        config = Config(max_pool_connections=max_workers * multipart_concurrency,
+                        retries={'max_attempts': 10, 'mode': 'adaptive'})
+        self.s3 = boto3.client('s3', region_name=aws_region, config=config)
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunksize,
+            max_concurrency=multipart_concurrency,
+        )
+        self.max_workers = max_workers
+        self._executor = None
+        self._executor_lock = threading.Lock()
 
     def upload_file(self, file_path, bucket, key):
-        self.s3.upload_file(file_path, bucket, key)
+        self.s3.upload_file(file_path, bucket, key, Config=self.transfer_config)
 
     def download_file(self, bucket, key, file_path):
-        self.s3.download_file(bucket, key, file_path)
+        self.s3.download_file(bucket, key, file_path, Config=self.transfer_config)
+
+    def iter_objects(self, bucket, prefix):
+        """Every object under ``prefix`` (``Key``, ``ETag``, ``Size``, ...), one listing page at a time."""
+        paginator = self.s3.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            yield from page.get('Contents', [])
+
+    def iter_files(self, bucket, prefix):
+        for obj in self.iter_objects(bucket, prefix):
+            yield obj['Key']
 
     def list_files(self, bucket, prefix):
-        response = self.s3.list_objects_v2(Bucket=bucket, Prefix=prefix)
-        return [obj['Key'] for obj in response.get('Contents', [])] 
\ No newline at end of file
+        return list(self.iter_files(bucket, prefix))
+
+    def download_files(self, bucket, keys, local_dir, prefix=''):
+        """Download many objects in parallel.
+
+        Keys are written under ``local_dir`` with ``prefix`` removed, keeping
+        the rest of the key as subdirectories. Folder markers (keys ending
+        in ``/``, or the prefix itself) are skipped. ``keys`` may be a lazy
+        iterable such as ``iter_files``; only a bounded number of downloads
+        is queued at a time.
+
+        Raises:
+            ValueError: A key would be written outside ``local_dir``
+
+        Yields:
+            (key, local path) pairs as downloads finish
+        """
+        def download(item):
+            key, file_path = item
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            self.download_file(bucket, key, file_path)
+            return key, file_path
+        files = ((key, local_path(local_dir, key, prefix)) for key in keys)
+        return self._map(download, ((key, file_path) for key, file_path in files if file_path is not None))
+
+    def upload_files(self, file_paths, bucket, prefix=''):
+        """Upload local files in parallel to ``prefix`` + file name.
+
+        Yields:
+            (local path, key) pairs as uploads finish
+        """
+        def upload(file_path):
+            key = prefix + os.path.basename(file_path)
+            self.upload_file(file_path, bucket, key)
+            return file_path, key
+        return self._map(upload, file_paths)
+
+    def iter_content_hashes(self, bucket, keys):
+        """SHA-256 of each object's bytes, streamed in parallel without writing to disk.
+
+        Yields:
+            (key, hex digest) pairs as objects finish; the digest is None
+            when the object cannot be read
+        """
+        def content_hash(key):
+            try:
+                body = self.s3.get_object(Bucket=bucket, Key=key)['Body']
+            except ClientError:
+                return key, None
+            digest = hashlib.sha256()
+            for chunk in body.iter_chunks(MB):
+                digest.update(chunk)
+            return key, digest.hexdigest()
+        return self._map(content_hash, keys)
+
+    def close(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    def _map(self, function, items):
+        """Run ``function`` over ``items`` on the shared pool, yielding results in completion order."""
+        executor = self._get_executor()
+        # Bound the queue so a huge key listing is not turned into futures all at once
+        max_pending = self.max_workers * 2
+        pending = set()
+        items = iter(items)
+        try:
+            while True:
+                for item in items:
+                    pending.add(executor.submit(function, item))
+                    if len(pending) >= max_pending:
+                        break
+                if not pending:
+                    return
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='s3-transfer')
+            return self._executor
@@ -1,29 +1,220 @@
 import boto3
+import heapq
+import json
+import logging
 import time
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+# Job status polls back off from the initial interval to the maximum
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_MAX_POLL_INTERVAL = 15.0
+POLL_BACKOFF = 1.5
+DEFAULT_MAX_CONCURRENT_JOBS = 10
+# Blocks per GetDocumentTextDetection page (the API maximum)
+RESULT_PAGE_SIZE = 1000
+# Errors that outlasted the client's retries but only mean "ask again later"
+THROTTLING_ERRORS = ('ThrottlingException', 'ProvisionedThroughputExceededException', 'LimitExceededException')
+
+logger = logging.getLogger(__name__)
+
+class TextractJobError(Exception):
+    pass
 
 class TextractClient:
-    def __init__(self, aws_region):
-        self.client = boto3.client('textract', region_name=aws_region)
+    def __init__(self, aws_region, max_attempts=10):
+        # Adaptive retries absorb throttling and concurrent-job limit errors
+        config = Config(retries={'max_attempts': max_attempts, 'mode': 'adaptive'})
+        self.client = boto3.client('textract', region_name=aws_region, config=config)
 
-    def start_document_text_detection(self, s3_bucket, s3_key):
-        response = self.client.start_document_text_detection(
-            DocumentLocation={
+    def start_document_text_detection(self, s3_bucket, s3_key, notification_channel=None):
+        params = {
+            'DocumentLocation': {
                 'S3Object': {
                     'Bucket': s3_bucket,
                     'Name': s3_key
                 }
             }
-        )
+        }
+        if notification_channel:
+            params['NotificationChannel'] = notification_channel
+        response = self.client.start_document_text_detection(**params)
         return response['JobId']
 
+    def get_job_status(self, job_id):
+        """One status poll; asks for a single block to keep the response small."""
+        response = self.client.get_document_text_detection(JobId=job_id, MaxResults=1)
+        return response['JobStatus'], response
+
     def get_document_text_detection(self, job_id):
+        """All blocks of a job, waiting for it to finish. Prefer ``iter_document_text_blocks`` for long documents."""
         while True:
-            response = self.client.get_document_text_detection(JobId=job_id)
-            status = response['JobStatus']
-            if status in ['SUCCEEDED', 'FAILED']:
+            status, response = self.get_job_status(job_id)
+            if status != 'IN_PROGRESS':
                 break
             time.sleep(2)
-        if status == 'SUCCEEDED':
-            return response['Blocks']
+        if status in ('SUCCEEDED', 'PARTIAL_SUCCESS'):
+            return list(self.iter_document_text_blocks(job_id))
         else:
-            raise Exception(f"Textract job failed: {response}") 
\ No newline at end of file
+            raise TextractJobError(f"Textract job failed: {response}")
+
+    def iter_document_text_pages(self, job_id, page_size=RESULT_PAGE_SIZE):
+        """Result pages of a finished job, fetched one ``NextToken`` at a time."""
+        params = {'JobId': job_id, 'MaxResults': page_size}
+        while True:
+            response = self.client.get_document_text_detection(**params)
+            if response['JobStatus'] not in ('SUCCEEDED', 'PARTIAL_SUCCESS'):
+                raise TextractJobError(f"Textract job {job_id} is {response['JobStatus']}: "
+                                       f"{response.get('StatusMessage', '')}")
+            yield response['Blocks']
+            if not response.get('NextToken'):
+                return
+            params['NextToken'] = response['NextToken']
+
+    def iter_document_text_blocks(self, job_id, page_size=RESULT_PAGE_SIZE):
+        """Blocks of a finished job, streamed; only one result page is held at a time."""
+        for blocks in self.iter_document_text_pages(job_id, page_size):
+            yield from blocks
+
+    def detect_documents_text(self, s3_bucket, s3_keys, **tracker_options):
+        """Run text detection on many documents concurrently.
+
+        Yields one result dict per document as its job finishes; see
+        ``TextractJobTracker``.
+        """
+        return TextractJobTracker(self, **tracker_options).run(s3_bucket, s3_keys)
+
+
+class TextractJobTracker:
+    def __init__(self, textract, max_concurrent_jobs=DEFAULT_MAX_CONCURRENT_JOBS,
+                 poll_interval=DEFAULT_POLL_INTERVAL, max_poll_interval=DEFAULT_MAX_POLL_INTERVAL,
+                 notification_channel=None, sqs_client=None, queue_url=None):
+        """Pipelined Textract jobs: submit up to a limit, collect as they finish.
+
+        Jobs are started until ``max_concurrent_jobs`` are running and each
+        running job is polled on its own schedule, backing off from
+        ``poll_interval`` to ``max_poll_interval``; a finished job frees a
+        slot for the next document straight away.
+
+        With ``notification_channel`` (an SNS topic and role) and the SQS
+        queue subscribed to that topic, completions are taken from the
+        queue instead, and polling only remains as a slow fallback for
+        lost notifications.
+        """
+        self.textract = textract
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.notification_channel = notification_channel
+        self.sqs = sqs_client
+        self.queue_url = queue_url
+
+    def run(self, s3_bucket, s3_keys):
+        """Yield ``{'s3_key', 'job_id', 'status', 'blocks', 'error'}`` per document, in completion order.
+
+        ``blocks`` is a lazy iterator over the job's result pages. A document
+        whose job cannot be started (a bad object, or the job limit still
+        exceeded after retries) is yielded straight away with its error and
+        no ``job_id``. A status poll that is throttled is retried later with
+        backoff; any other polling error fails that job alone. The other
+        jobs carry on.
+        """
+        keys = iter(s3_keys)
+        running = {}  # job_id -> s3_key
+        started = set()  # every job of this run, for telling its notifications apart
+        intervals = {}  # job_id -> current poll interval
+        schedule = []  # (next poll time, job_id)
+        exhausted = False
+        use_queue = bool(self.notification_channel and self.sqs and self.queue_url)
+
+        while True:
+            while not exhausted and len(running) < self.max_concurrent_jobs:
+                s3_key = next(keys, None)
+                if s3_key is None:
+                    exhausted = True
+                    break
+                try:
+                    job_id = self.textract.start_document_text_detection(
+                        s3_bucket, s3_key, notification_channel=self.notification_channel)
+                except ClientError as e:
+                    yield {'s3_key': s3_key, 'job_id': None, 'status': 'FAILED', 'blocks': [], 'error': str(e)}
+                    continue
+                running[job_id] = s3_key
+                started.add(job_id)
+                intervals[job_id] = self.max_poll_interval if use_queue else self.poll_interval
+                heapq.heappush(schedule, (time.monotonic() + intervals[job_id], job_id))
+            if not running:
+                return
+
+            due = set()
+            if use_queue:
+                due.update(self._receive_completions(schedule[0][0] - time.monotonic(), started))
+            else:
+                time.sleep(max(schedule[0][0] - time.monotonic(), 0))
+            now = time.monotonic()
+            while schedule and schedule[0][0] <= now:
+                due.add(heapq.heappop(schedule)[1])
+
+            for job_id in due:
+                if job_id not in running:
+                    continue
+                try:
+                    status, response = self.textract.get_job_status(job_id)
+                except ClientError as e:
+                    if e.response.get('Error', {}).get('Code') in THROTTLING_ERRORS:
+                        status = 'IN_PROGRESS'
+                    else:
+                        del intervals[job_id]
+                        yield {'s3_key': running.pop(job_id), 'job_id': job_id, 'status': 'FAILED', 'blocks': [],
+                               'error': str(e)}
+                        continue
+                if status == 'IN_PROGRESS':
+                    intervals[job_id] = min(intervals[job_id] * POLL_BACKOFF, self.max_poll_interval)
+                    heapq.heappush(schedule, (time.monotonic() + intervals[job_id], job_id))
+                    continue
+                s3_key = running.pop(job_id)
+                del intervals[job_id]
+                yield self._result(s3_key, job_id, status, response)
+            # Completed jobs may still have entries in the schedule; drop them lazily
+            while schedule and schedule[0][1] not in running:
+                heapq.heappop(schedule)
+
+    def _result(self, s3_key, job_id, status, response):
+        if status in ('SUCCEEDED', 'PARTIAL_SUCCESS'):
+            blocks = self.textract.iter_document_text_blocks(job_id)
+            return {'s3_key': s3_key, 'job_id': job_id, 'status': status, 'blocks': blocks, 'error': None}
+        error = response.get('StatusMessage') or f"Textract job {status}"
+        return {'s3_key': s3_key, 'job_id': job_id, 'status': status, 'blocks': [], 'error': error}
+
+    def _receive_completions(self, wait_seconds, job_ids):
+        """Ids of completed jobs among ``job_ids``, long-polling the queue for up to ``wait_seconds``.
+
+        Only notifications for ``job_ids`` are deleted; others, such as those
+        of another run sharing the queue, become visible again. When the
+        queue cannot be read, this waits as long as it would have and leaves
+        the jobs to the fallback polls.
+        """
+        try:
+            response = self.sqs.receive_message(
+                QueueUrl=self.queue_url,
+                MaxNumberOfMessages=10,
+                WaitTimeSeconds=int(min(max(wait_seconds, 0), 20))
+            )
+        except ClientError as e:
+            logger.warning(f"Cannot read Textract completions from {self.queue_url}: {e}")
+            time.sleep(min(max(wait_seconds, 0), 20))
+            return []
+        completed = []
+        for message in response.get('Messages', []):
+            body = json.loads(message['Body'])
+            # SNS wraps the notification unless raw message delivery is enabled
+            notification = json.loads(body['Message']) if 'Message' in body else body
+            if notification.get('JobId') not in job_ids:
+                continue
+            completed.append(notification['JobId'])
+            try:
+                self.sqs.delete_message(QueueUrl=self.queue_url, ReceiptHandle=message['ReceiptHandle'])
+            except ClientError as e:
+                # Redelivered later, when the job is no longer running, and deleted then
+                logger.warning(f"Cannot delete Textract completion for job {notification['JobId']}: {e}")
+        return completed
@@ -0,0 +1,12 @@
+import yaml
+
+def load_config(config):
+    """Parsed configuration from a YAML file path, or ``config`` itself if it is already parsed.
+
+    Recipes accept either, so a pipeline can parse the file once and hand
+    the same dict to every stage.
+    """
+    if isinstance(config, dict):
+        return config
+    with open(config, 'r') as f:
+        return yaml.safe_load(f)
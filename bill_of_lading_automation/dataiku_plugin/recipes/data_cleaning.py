@@ -2,6 +2,7 @@
 # Cleans and normalizes OCR output
 
 def clean_ocr_blocks(blocks):
+    # blocks may be a lazy iterator over Textract result pages; it is read once
     # Placeholder: implement text normalization, remove noise, handle tables
     cleaned = []
     for block in blocks:
@@ -10,12 +11,14 @@ def clean_ocr_blocks(blocks):
             cleaned.append(block['Text'].strip())
     return cleaned
 
+def clean_result(result):
+    cleaned_text = clean_ocr_blocks(result['blocks'])
+    # Local documents are identified by their path
+    doc_key = result['s3_key'] if 's3_key' in result else result['local_path']
+    return {'s3_key': doc_key, 'cleaned_text': cleaned_text}
+
 def run_cleaning(ocr_results):
-    cleaned_results = []
-    for result in ocr_results:
-        cleaned_text = clean_ocr_blocks(result['blocks'])
-        cleaned_results.append({'s3_key': result['s3_key'], 'cleaned_text': cleaned_text})
-    return cleaned_results
+    return [clean_result(result) for result in ocr_results]
 
 # Example usage:
 # cleaned = run_cleaning(ocr_results)
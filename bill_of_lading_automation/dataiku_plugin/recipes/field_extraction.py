@@ -1,7 +1,7 @@
 # Field Extraction Recipe
 # Extracts structured fields from cleaned text using regex
 import re
-import yaml
+from ...config.config_utils import load_config
 
 def extract_fields(cleaned_text, field_patterns):
     fields = {}
@@ -15,15 +15,12 @@ def extract_fields(cleaned_text, field_patterns):
             fields[field] = match.group(1) if match else None
     return fields
 
-def run_field_extraction(config_path, cleaned_results):
-    with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
-    field_patterns = config['fields']
-    extracted = []
-    for result in cleaned_results:
-        fields = extract_fields(result['cleaned_text'], field_patterns)
-        extracted.append({'s3_key': result['s3_key'], 'fields': fields})
-    return extracted
+def extract_result(result, field_patterns):
+    return {'s3_key': result['s3_key'], 'fields': extract_fields(result['cleaned_text'], field_patterns)}
+
+def run_field_extraction(config, cleaned_results):
+    field_patterns = load_config(config)['fields']
+    return [extract_result(result, field_patterns) for result in cleaned_results]
 
 # Example usage:
 # extracted = run_field_extraction('config/sample_config.yaml', cleaned)
@@ -1,23 +1,44 @@
 # Ingest Bill of Lading Document Recipe
 # Reads files from S3 or local storage and outputs document metadata
 import os
-import yaml
-from ..aws.s3_utils import S3Client
+from ...aws.s3_utils import S3Client
+from ...config.config_utils import load_config
+from ...storage.manifest_utils import open_manifest
 
-def run_ingest(config_path):
-    with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+def iter_ingest(config, manifest=None):
+    """Yield documents to process as they are listed; only unprocessed ones when a manifest is given"""
     ocr_conf = config['ocr']
     if ocr_conf['engine'] == 'aws_textract':
         s3 = S3Client(ocr_conf['aws_region'])
-        files = s3.list_files(ocr_conf['s3_bucket'], ocr_conf['s3_input_prefix'])
-        # Output: list of S3 keys
-        return [{'s3_key': key} for key in files]
+        # Listing is paginated, so prefixes with more than 1000 documents are complete
+        objects = s3.iter_objects(ocr_conf['s3_bucket'], ocr_conf['s3_input_prefix'])
+        docs = ({'s3_key': obj['Key'], 'etag': obj['ETag'].strip('"'), 'size': obj['Size']} for obj in objects)
+        key_field = 's3_key'
     else:
         # Local directory ingestion (placeholder)
         local_dir = ocr_conf.get('local_input_dir', './input')
         files = [os.path.join(local_dir, f) for f in os.listdir(local_dir)]
-        return [{'local_path': f} for f in files]
+        # Modification time stands in for an ETag
+        docs = ({'local_path': f, 'etag': str(os.stat(f).st_mtime_ns), 'size': os.stat(f).st_size} for f in files)
+        key_field = 'local_path'
+    if manifest is None:
+        # Output: S3 keys (or local paths)
+        for doc in docs:
+            yield {key_field: doc[key_field]}
+        return
+    # Incremental: only new, changed or unfinished documents
+    docs = ({'doc_key': doc[key_field], **doc} for doc in docs)
+    for doc in manifest.filter_unprocessed(docs):
+        yield {key_field: doc[key_field], 'etag': doc['etag'], 'size': doc['size']}
+
+def run_ingest(config):
+    config = load_config(config)
+    manifest = open_manifest(config)
+    try:
+        return list(iter_ingest(config, manifest))
+    finally:
+        if manifest is not None:
+            manifest.close()
 
 # Example usage:
 # docs = run_ingest('config/sample_config.yaml')
@@ -1,31 +1,78 @@
 # Integration Recipe
 # Outputs validated data to database, CSV, or API
-import yaml
 import csv
+from ...config.config_utils import load_config
+from ...storage.manifest_utils import open_manifest
+
+# Documents are marked completed in the manifest this many at a time
+CHECKPOINT_BATCH_SIZE = 100
 
 def output_to_csv(validated, csv_path):
-    with open(csv_path, 'w', newline='') as csvfile:
-        fieldnames = ['s3_key'] + list(validated[0]['fields'].keys()) + ['errors']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
+    """Append rows as they arrive; the header comes from the first row's fields.
+
+    Incremental runs only pass on new documents, so earlier output is kept.
+    The file is not opened until there is a row, and the header is written
+    only when the file is new or empty.
+    """
+    csvfile = None
+    writer = None
+    try:
         for row in validated:
+            if writer is None:
+                csvfile = open(csv_path, 'a', newline='')
+                fieldnames = ['s3_key'] + list(row['fields'].keys()) + ['errors']
+                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                if csvfile.tell() == 0:
+                    writer.writeheader()
             out = {'s3_key': row['s3_key'], **row['fields'], 'errors': ';'.join(row['errors'])}
             writer.writerow(out)
+    finally:
+        if csvfile is not None:
+            csvfile.close()
+
+def checkpoint_completed(validated, manifest, batch_size=CHECKPOINT_BATCH_SIZE):
+    """Pass rows through, marking them completed once the output has taken them."""
+    batch = []
+    for row in validated:
+        yield row
+        batch.append(row['s3_key'])
+        if len(batch) >= batch_size:
+            manifest.mark_completed(batch)
+            batch = []
+    if batch:
+        manifest.mark_completed(batch)
+
+def run_integration(config, validated, manifest=None):
+    """Write validated rows to the configured output.
 
-def run_integration(config_path, validated):
-    with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
+    ``validated`` may be a stream; rows are written as they arrive. Pass an
+    open ``manifest`` to share it with other stages; otherwise the
+    configured one is opened for this call.
+    """
+    config = load_config(config)
     integration_conf = config['integration']
-    if integration_conf['output_type'] == 'csv':
-        output_to_csv(validated, integration_conf['csv_path'])
-    elif integration_conf['output_type'] == 'database':
-        # Placeholder: implement DB integration
-        pass
-    elif integration_conf['output_type'] == 'api':
-        # Placeholder: implement API integration
-        pass
-    else:
-        raise ValueError('Unsupported output type')
+    own_manifest = manifest is None
+    if own_manifest:
+        manifest = open_manifest(config)
+    try:
+        if manifest is not None:
+            # Checkpoint: these documents are done and are skipped by the next incremental ingest
+            validated = checkpoint_completed(validated, manifest)
+        if integration_conf['output_type'] == 'csv':
+            output_to_csv(validated, integration_conf['csv_path'])
+        elif integration_conf['output_type'] == 'database':
+            # Placeholder: implement DB integration
+            for row in validated:
+                pass
+        elif integration_conf['output_type'] == 'api':
+            # Placeholder: implement API integration
+            for row in validated:
+                pass
+        else:
+            raise ValueError('Unsupported output type')
+    finally:
+        if own_manifest and manifest is not None:
+            manifest.close()
 
 # Example usage:
 # run_integration('config/sample_config.yaml', validated) 
\ No newline at end of file
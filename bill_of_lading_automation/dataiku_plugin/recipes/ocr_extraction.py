@@ -1,25 +1,249 @@
 # OCR Extraction Recipe
-# Uses AWS Textract to extract text from documents
-import yaml
-from ..aws.textract_utils import TextractClient
+# Uses AWS Textract (or local Tesseract) to extract text from documents
+import hashlib
+import json
+import logging
+import queue
+import threading
+import boto3
+from ...aws.s3_utils import S3Client
+from ...aws.textract_utils import TextractClient
+from ...config.config_utils import load_config
+from ...storage.manifest_utils import open_manifest
+from ...storage.ocr_cache_utils import open_ocr_cache, sha256_file
 
-def run_ocr(config_path, docs):
-    with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
-    ocr_conf = config['ocr']
+logger = logging.getLogger(__name__)
+
+# Documents buffered between cache lookup, OCR and the consumer of iter_cached_ocr
+DEFAULT_QUEUE_SIZE = 100
+
+_DONE = object()
+
+class _Failure:
+    def __init__(self, error):
+        self.error = error
+
+def record_ocr_result(manifest, doc_key, error):
+    if error:
+        logger.warning(f"OCR failed for {doc_key}: {error}")
+        if manifest is not None:
+            manifest.mark_failed(doc_key, error)
+    elif manifest is not None:
+        manifest.mark_stage([doc_key], 'ocr')
+
+def iter_textract_ocr(ocr_conf, docs, manifest=None):
+    """Yield OCR results as Textract jobs finish, keeping many jobs in flight"""
+    textract = TextractClient(ocr_conf['aws_region'])
+    tracker_options = {
+        'max_concurrent_jobs': ocr_conf.get('max_concurrent_jobs', 10),
+        'poll_interval': ocr_conf.get('poll_interval_seconds', 1.0),
+        'max_poll_interval': ocr_conf.get('max_poll_interval_seconds', 15.0),
+    }
+    if ocr_conf.get('sns_topic_arn') and ocr_conf.get('sqs_queue_url'):
+        # Completion notifications instead of polling every job
+        tracker_options.update(
+            notification_channel={'SNSTopicArn': ocr_conf['sns_topic_arn'], 'RoleArn': ocr_conf['sns_role_arn']},
+            sqs_client=boto3.client('sqs', region_name=ocr_conf['aws_region']),
+            queue_url=ocr_conf['sqs_queue_url'],
+        )
+    s3_keys = (doc['s3_key'] for doc in docs)
+    for result in textract.detect_documents_text(ocr_conf['s3_bucket'], s3_keys, **tracker_options):
+        record_ocr_result(manifest, result['s3_key'], result['error'])
+        yield {'s3_key': result['s3_key'], 'blocks': result['blocks'], 'error': result['error']}
+
+def tesseract_options(ocr_conf):
+    """Tesseract settings that change its output"""
+    return {
+        'lang': ocr_conf.get('tesseract_lang', 'eng'),
+        'dpi': ocr_conf.get('tesseract_dpi', 300),
+        'preprocess': ocr_conf.get('tesseract_preprocess', True),
+    }
+
+def iter_local_ocr(ocr_conf, docs, manifest=None):
+    """Yield OCR results from Tesseract running on local CPUs, page by page in a process pool"""
+    # Imported here so Textract-only deployments do not need Pillow or Tesseract
+    from ...local.tesseract_utils import TesseractOCR
+    tesseract = TesseractOCR(**tesseract_options(ocr_conf), max_workers=ocr_conf.get('tesseract_workers'))
+    try:
+        paths = (doc['local_path'] for doc in docs)
+        for result in tesseract.detect_documents_text(paths):
+            record_ocr_result(manifest, result['local_path'], result['error'])
+            yield result
+    finally:
+        tesseract.close()
+
+def iter_content_hashes(ocr_conf, docs):
+    """(document key, SHA-256 of its bytes) per document; None when it cannot be read"""
     if ocr_conf['engine'] == 'aws_textract':
-        textract = TextractClient(ocr_conf['aws_region'])
-        results = []
-        for doc in docs:
-            s3_key = doc['s3_key']
-            job_id = textract.start_document_text_detection(ocr_conf['s3_bucket'], s3_key)
-            blocks = textract.get_document_text_detection(job_id)
-            results.append({'s3_key': s3_key, 'blocks': blocks})
-        return results
-    else:
+        s3 = S3Client(ocr_conf['aws_region'])
+        try:
+            yield from s3.iter_content_hashes(ocr_conf['s3_bucket'], (doc['s3_key'] for doc in docs))
+        finally:
+            s3.close()
+        return
+    for doc in docs:
+        try:
+            yield doc['local_path'], sha256_file(doc['local_path'])
+        except OSError:
+            yield doc['local_path'], None
+
+def cache_key(ocr_conf, content_hash):
+    """Cache key for a document's content OCR'd with the configured engine and its output-affecting options"""
+    settings = {'engine': ocr_conf['engine']}
+    if ocr_conf['engine'] == 'tesseract':
+        settings.update(tesseract_options(ocr_conf))
+    digest = hashlib.sha256(json.dumps(settings, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+    return f'{digest}:{content_hash}'
+
+def iter_cached_ocr(ocr_conf, docs, iter_ocr, cache, manifest=None, queue_size=DEFAULT_QUEUE_SIZE):
+    """Serve documents whose content is already cached and OCR one copy of each new content.
+
+    Cache lookup and OCR run on their own threads. Lookup yields each hit
+    as soon as it is found and forwards only misses to the OCR engine,
+    so a mostly cached backlog streams through instead of waiting for the
+    next OCR result. Both feed one bounded queue to the consumer, so
+    neither runs more than ``queue_size`` documents ahead of it. A
+    document sharing content with one already submitted waits for its
+    result instead of being OCR'd twice. Results of successful OCR are
+    materialized so they can be stored. Entries are keyed by
+    ``cache_key``, so switching the engine or its options does not serve
+    blocks produced under the old settings.
+    """
+    key_field = 's3_key' if ocr_conf['engine'] == 'aws_textract' else 'local_path'
+    lock = threading.Lock()
+    waiting = {}  # content hash (or key when unreadable) -> keys of documents with that content
+    submitted = {}  # key sent to OCR -> its entry in waiting
+    to_consumer = queue.Queue(maxsize=queue_size)
+    to_ocr = queue.Queue(maxsize=queue_size)
+    stopped = threading.Event()
+
+    def put(handoff, item):
+        # Time out now and then so an abandoned stage notices and exits
+        while not stopped.is_set():
+            try:
+                handoff.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def look_up():
+        for doc_key, content_hash in iter_content_hashes(ocr_conf, docs):
+            with lock:
+                if content_hash is not None and content_hash in waiting:
+                    waiting[content_hash].append(doc_key)
+                    continue
+            blocks = cache.get(cache_key(ocr_conf, content_hash)) if content_hash is not None else None
+            if blocks is not None:
+                record_ocr_result(manifest, doc_key, None)
+                if not put(to_consumer, {key_field: doc_key, 'blocks': blocks, 'error': None}):
+                    return
+                continue
+            content_hash = content_hash or ('key', doc_key)
+            with lock:
+                waiting[content_hash] = [doc_key]
+                submitted[doc_key] = content_hash
+            if not put(to_ocr, {key_field: doc_key}):
+                return
+
+    def misses():
+        while True:
+            try:
+                item = to_ocr.get(timeout=0.1)
+            except queue.Empty:
+                if stopped.is_set():
+                    return
+                continue
+            if item is _DONE:
+                return
+            yield item
+
+    def recognize():
+        ocr_results = iter_ocr(ocr_conf, misses(), manifest)
+        try:
+            for result in ocr_results:
+                with lock:
+                    content_hash = submitted.pop(result[key_field])
+                blocks = result['blocks']
+                if not result['error']:
+                    blocks = list(blocks)
+                    if isinstance(content_hash, str):
+                        cache.put(cache_key(ocr_conf, content_hash), blocks)
+                # Stored before release, so a later copy either joins the wait or hits the cache
+                with lock:
+                    doc_keys = waiting.pop(content_hash)
+                for doc_key in doc_keys:
+                    if doc_key != result[key_field]:
+                        record_ocr_result(manifest, doc_key, result['error'])
+                    if not put(to_consumer, {**result, key_field: doc_key, 'blocks': blocks}):
+                        return
+        finally:
+            ocr_results.close()
+
+    def run(stage, after=None):
+        try:
+            stage()
+        except BaseException as e:
+            put(to_consumer, _Failure(e))
+        finally:
+            if after is not None:
+                after()
+            put(to_consumer, _DONE)
+
+    threads = [
+        threading.Thread(target=run, args=(look_up, lambda: put(to_ocr, _DONE)), name='ocr-cache-lookup',
+                         daemon=True),
+        threading.Thread(target=run, args=(recognize,), name='ocr-cache-misses', daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        running = len(threads)
+        while running:
+            item = to_consumer.get()
+            if item is _DONE:
+                running -= 1
+            elif isinstance(item, _Failure):
+                raise item.error
+            else:
+                yield item
+    finally:
+        stopped.set()
+        for thread in threads:
+            thread.join()
+
+def iter_ocr_results(config, docs, manifest=None, cache=None):
+    """Yield OCR results as each document finishes, going through the cache when one is given"""
+    ocr_conf = config['ocr']
+    if ocr_conf['engine'] not in ('aws_textract', 'tesseract'):
         # Placeholder for other OCR engines
-        return []
+        return
+    iter_ocr = iter_textract_ocr if ocr_conf['engine'] == 'aws_textract' else iter_local_ocr
+    if cache is None:
+        yield from iter_ocr(ocr_conf, docs, manifest)
+    else:
+        yield from iter_cached_ocr(ocr_conf, docs, iter_ocr, cache, manifest)
+
+def log_cache_stats(cache):
+    stats = cache.stats()
+    logger.info(f"OCR cache: {stats['hits']} hits, {stats['misses']} misses, "
+                f"{stats['evictions']} evictions, {stats['entries']} entries ({stats['size_bytes']} bytes)")
+
+def run_ocr(config, docs):
+    config = load_config(config)
+    manifest = open_manifest(config)
+    cache = open_ocr_cache(config)
+    try:
+        results = list(iter_ocr_results(config, docs, manifest, cache))
+        if cache is not None:
+            log_cache_stats(cache)
+        return results
+    finally:
+        if manifest is not None:
+            manifest.close()
+        if cache is not None:
+            cache.close()
 
 # Example usage:
 # ocr_results = run_ocr('config/sample_config.yaml', docs)
-# print(ocr_results) 
\ No newline at end of file
+# print(ocr_results) 
\ No newline at end of file
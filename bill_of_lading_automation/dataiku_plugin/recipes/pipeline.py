@@ -0,0 +1,180 @@
+# Pipeline Recipe
+# Runs ingestion through integration as one stream: each document moves on as soon as its OCR finishes
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from functools import partial
+from ...config.config_utils import load_config
+from ...storage.manifest_utils import open_manifest
+from ...storage.ocr_cache_utils import open_ocr_cache
+from .data_cleaning import clean_result
+from .field_extraction import extract_result
+from .ingest_document import iter_ingest
+from .integration import run_integration
+from .ocr_extraction import iter_ocr_results, log_cache_stats
+from .validation import validate_result
+
+logger = logging.getLogger(__name__)
+
+# Documents buffered between two stages; a stage that gets this far ahead waits
+DEFAULT_QUEUE_SIZE = 100
+# Threads fetching Textract result pages, which is network-bound
+DEFAULT_IO_WORKERS = 8
+
+_DONE = object()
+
+class _Failure:
+    def __init__(self, error):
+        self.error = error
+
+def threaded_stage(items, name, queue_size=DEFAULT_QUEUE_SIZE):
+    """Run the generator ``items`` in its own thread, handing results over a bounded queue.
+
+    The producing thread blocks once ``queue_size`` items are waiting, so a
+    fast stage cannot run arbitrarily far ahead of a slow one. Exceptions
+    raised by the producer are re-raised to the consumer.
+    """
+    handoff = queue.Queue(maxsize=queue_size)
+    stopped = threading.Event()
+
+    def put(item):
+        # Time out now and then so an abandoned producer notices and exits
+        while not stopped.is_set():
+            try:
+                handoff.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put(_Failure(e))
+            return
+        put(_DONE)
+
+    thread = threading.Thread(target=produce, name=f'pipeline-{name}', daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = handoff.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stopped.set()
+        thread.join()
+
+def pooled_stage(function, items, executor, max_pending):
+    """Apply ``function`` to ``items`` on ``executor`` with at most ``max_pending`` in flight.
+
+    Results are yielded in completion order.
+    """
+    pending = set()
+    items = iter(items)
+    try:
+        while True:
+            for item in items:
+                pending.add(executor.submit(function, item))
+                if len(pending) >= max_pending:
+                    break
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+def load_blocks(result):
+    """Read lazily fetched Textract blocks so the result can go to a worker process."""
+    return {**result, 'blocks': list(result['blocks'])}
+
+def process_document(result, field_patterns, validation_conf):
+    """Cleaning, field extraction and validation of one OCR result; runs in a worker process."""
+    return validate_result(extract_result(clean_result(result), field_patterns), validation_conf)
+
+def run_pipeline(config):
+    """Run every stage end-to-end, streaming documents between them.
+
+    Ingestion and OCR each run on their own thread and feed bounded
+    queues. Textract result pages are fetched on a thread pool, and the
+    CPU-bound cleaning, extraction and validation run in a process pool.
+    Integration writes rows as they arrive. The config is parsed once;
+    the manifest and OCR cache are opened once and shared by all stages.
+    Documents whose OCR failed are left failed in the manifest, so the
+    next incremental run retries them, and are not written out.
+
+    Returns:
+        Counts of documents ingested, failed in OCR, written, and written with validation errors
+    """
+    config = load_config(config)
+    pipeline_conf = config.get('pipeline') or {}
+    queue_size = pipeline_conf.get('queue_size', DEFAULT_QUEUE_SIZE)
+    io_workers = pipeline_conf.get('io_workers', DEFAULT_IO_WORKERS)
+    cpu_workers = pipeline_conf.get('cpu_workers', os.cpu_count() or 1)
+    process = partial(process_document, field_patterns=config['fields'], validation_conf=config['validation'])
+
+    counts = Counter(ingested=0, ocr_failed=0, written=0, invalid=0)
+
+    def ingested(docs):
+        for doc in docs:
+            counts['ingested'] += 1
+            yield doc
+
+    def recognized(ocr_results):
+        for result in ocr_results:
+            if result['error']:
+                counts['ocr_failed'] += 1
+            else:
+                yield result
+
+    def written(validated):
+        for row in validated:
+            counts['written'] += 1
+            counts['invalid'] += bool(row['errors'])
+            yield row
+
+    manifest = open_manifest(config)
+    cache = open_ocr_cache(config)
+    io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix='pipeline-io')
+    # Stages run on threads, so workers are spawned rather than forked
+    cpu_pool = None
+    if cpu_workers > 0:
+        cpu_pool = ProcessPoolExecutor(max_workers=cpu_workers, mp_context=multiprocessing.get_context('spawn'))
+    try:
+        docs = threaded_stage(ingested(iter_ingest(config, manifest)), 'ingest', queue_size)
+        ocr_results = threaded_stage(iter_ocr_results(config, docs, manifest, cache), 'ocr', queue_size)
+        loaded = pooled_stage(load_blocks, recognized(ocr_results), io_pool, io_workers * 2)
+        if cpu_pool is None:
+            validated = map(process, loaded)
+        else:
+            validated = pooled_stage(process, loaded, cpu_pool, cpu_workers * 2)
+        run_integration(config, written(validated), manifest)
+    finally:
+        io_pool.shutdown(wait=True, cancel_futures=True)
+        if cpu_pool is not None:
+            cpu_pool.shutdown(wait=True, cancel_futures=True)
+        if manifest is not None:
+            manifest.close()
+        if cache is not None:
+            log_cache_stats(cache)
+            cache.close()
+    logger.info(f"Pipeline: {counts['ingested']} documents ingested, {counts['ocr_failed']} failed OCR, "
+                f"{counts['written']} written ({counts['invalid']} with validation errors)")
+    return dict(counts)
+
+# Example usage:
+# counts = run_pipeline('config/sample_config.yaml')
+# print(counts)
@@ -1,7 +1,7 @@
 # Validation Recipe
 # Validates extracted fields and applies business rules
-import yaml
 from datetime import datetime
+from ...config.config_utils import load_config
 
 def validate_fields(fields, validation_conf):
     errors = []
@@ -18,15 +18,13 @@ def validate_fields(fields, validation_conf):
     # Placeholder: duplicate check, business rules
     return errors
 
-def run_validation(config_path, extracted):
-    with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
-    validation_conf = config['validation']
-    validated = []
-    for result in extracted:
-        errors = validate_fields(result['fields'], validation_conf)
-        validated.append({'s3_key': result['s3_key'], 'fields': result['fields'], 'errors': errors})
-    return validated
+def validate_result(result, validation_conf):
+    errors = validate_fields(result['fields'], validation_conf)
+    return {'s3_key': result['s3_key'], 'fields': result['fields'], 'errors': errors}
+
+def run_validation(config, extracted):
+    validation_conf = load_config(config)['validation']
+    return [validate_result(result, validation_conf) for result in extracted]
 
 # Example usage:
 # validated = run_validation('config/sample_config.yaml', extracted)
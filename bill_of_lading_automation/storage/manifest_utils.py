@@ -0,0 +1,134 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+# Document states; a document is done only once integration has written it out
+PENDING = 'pending'
+FAILED = 'failed'
+COMPLETED = 'completed'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_key TEXT PRIMARY KEY,
+    etag TEXT,
+    size INTEGER,
+    status TEXT NOT NULL,
+    stage TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated_at TEXT NOT NULL
+)
+"""
+
+class DocumentManifest:
+    def __init__(self, path):
+        """Processed-document manifest in SQLite, keyed by document key plus ETag and size.
+
+        Ingestion emits a document only when it is new, its content changed
+        (different ETag or size), or it never reached ``completed``; so a
+        re-run after a partial pipeline failure resumes with the documents
+        that were not finished. Stages record checkpoints as they go.
+        """
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def filter_unprocessed(self, documents, batch_size=1000):
+        """Yield documents that need processing and mark them pending.
+
+        Args:
+            documents: Iterable of dicts with ``doc_key``, ``etag`` and ``size``
+        """
+        batch = []
+        for document in documents:
+            batch.append(document)
+            if len(batch) >= batch_size:
+                yield from self._filter_batch(batch)
+                batch = []
+        if batch:
+            yield from self._filter_batch(batch)
+
+    def _filter_batch(self, batch):
+        keys = [document['doc_key'] for document in batch]
+        with self._transaction() as conn:
+            placeholders = ','.join('?' * len(keys))
+            known = {
+                row[0]: row[1:] for row in conn.execute(
+                    f'SELECT doc_key, etag, size, status FROM documents WHERE doc_key IN ({placeholders})', keys)
+            }
+            emit = []
+            now = datetime.now().isoformat()
+            for document in batch:
+                previous = known.get(document['doc_key'])
+                changed = previous is None or (previous[0], previous[1]) != (document['etag'], document['size'])
+                if changed:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO documents (doc_key, etag, size, status, stage, attempts, error, '
+                        'updated_at) VALUES (?, ?, ?, ?, NULL, 0, NULL, ?)',
+                        (document['doc_key'], document['etag'], document['size'], PENDING, now))
+                    emit.append(document)
+                elif previous[2] != COMPLETED:
+                    # Retried: pending again until this attempt fails or completes
+                    conn.execute('UPDATE documents SET status = ?, updated_at = ? WHERE doc_key = ?',
+                                 (PENDING, now, document['doc_key']))
+                    emit.append(document)
+        return emit
+
+    def mark_stage(self, doc_keys, stage):
+        """Checkpoint documents as having finished ``stage``."""
+        self._update(doc_keys, 'stage = ?, error = NULL', (stage,))
+
+    def mark_completed(self, doc_keys):
+        """Mark documents completed; ones that failed in this attempt stay failed so they are retried."""
+        self._update(doc_keys, 'status = ?, stage = ?, error = NULL', (COMPLETED, COMPLETED),
+                     where='status != ?', where_values=(FAILED,))
+
+    def mark_failed(self, doc_key, error):
+        self._update([doc_key], 'status = ?, attempts = attempts + 1, error = ?', (FAILED, str(error)))
+
+    def get(self, doc_key):
+        columns = ['doc_key', 'etag', 'size', 'status', 'stage', 'attempts', 'error', 'updated_at']
+        rows = self._query(f'SELECT {", ".join(columns)} FROM documents WHERE doc_key = ?', (doc_key,))
+        return dict(zip(columns, rows[0])) if rows else None
+
+    def unfinished(self):
+        """Keys of documents emitted but not completed, for resuming."""
+        rows = self._query('SELECT doc_key FROM documents WHERE status != ? ORDER BY doc_key', (COMPLETED,))
+        return [row[0] for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _query(self, sql, params):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _update(self, doc_keys, assignments, values, where=None, where_values=()):
+        now = datetime.now().isoformat()
+        condition = f'doc_key = ? AND {where}' if where else 'doc_key = ?'
+        with self._transaction() as conn:
+            conn.executemany(
+                f'UPDATE documents SET {assignments}, updated_at = ? WHERE {condition}',
+                [(*values, now, key, *where_values) for key in doc_keys])
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            with self._conn:
+                yield self._conn
+
+
+def open_manifest(config):
+    """The manifest configured under ``manifest.path``, or None when ingestion is not incremental."""
+    manifest_conf = config.get('manifest') or {}
+    if not manifest_conf.get('path'):
+        return None
+    return DocumentManifest(manifest_conf['path'])
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+HASH_CHUNK_SIZE = 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    content_hash TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+def sha256_file(path):
+    """Hex SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class OCRCache:
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        """OCR results keyed by the SHA-256 of the document bytes and the OCR settings.
+
+        Blocks are stored as zlib-compressed JSON in one SQLite file, so a
+        document re-uploaded under another key or re-run after a failure is
+        not sent to OCR again. When the stored total exceeds ``max_bytes``
+        the least recently used entries are evicted. Hit and miss counts
+        are kept for this instance and, cumulatively, in the store.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, content_hash):
+        """Cached blocks for the content, or None."""
+        with self._transaction() as conn:
+            row = conn.execute('SELECT data FROM entries WHERE content_hash = ?', (content_hash,)).fetchone()
+            if row is None:
+                self.misses += 1
+                self._count(conn, 'misses')
+                return None
+            conn.execute('UPDATE entries SET last_access = ?, hits = hits + 1 WHERE content_hash = ?',
+                               (time.time(), content_hash))
+            self.hits += 1
+            self._count(conn, 'hits')
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, content_hash, blocks):
+        """Store blocks for the content, evicting old entries past ``max_bytes``."""
+        data = zlib.compress(json.dumps(blocks, separators=(',', ':')).encode('utf-8'), 6)
+        if len(data) > self.max_bytes:
+            return
+        with self._transaction() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO entries (content_hash, data, size, last_access) VALUES (?, ?, ?, ?)',
+                (content_hash, data, len(data), time.time()))
+            self._evict(conn)
+
+    def stats(self):
+        """Hit rate of this instance and of the store over all runs, plus its size."""
+        with self._lock:
+            entries, size = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries').fetchone()
+            totals = dict(self._conn.execute('SELECT name, value FROM counters'))
+        lookups = self.hits + self.misses
+        total_lookups = totals.get('hits', 0) + totals.get('misses', 0)
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else None,
+            'evictions': self.evictions,
+            'entries': entries,
+            'size_bytes': size,
+            'total_hit_rate': totals.get('hits', 0) / total_lookups if total_lookups else None,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self, conn):
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = conn.execute('SELECT content_hash, size FROM entries ORDER BY last_access')
+        evicted = []
+        for content_hash, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((content_hash,))
+            total -= size
+        conn.executemany('DELETE FROM entries WHERE content_hash = ?', evicted)
+        self.evictions += len(evicted)
+        self._count(conn, 'evictions', len(evicted))
+
+    def _count(self, conn, name, amount=1):
+        conn.execute(
+            'INSERT INTO counters (name, value) VALUES (?, ?) '
+            'ON CONFLICT(name) DO UPDATE SET value = value + excluded.value', (name, amount))
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            with self._conn:
+                yield self._conn
+
+
+
+def open_ocr_cache(config):
+    """The cache configured under ``ocr_cache.path``, or None when caching is off."""
+    cache_conf = config.get('ocr_cache') or {}
+    if not cache_conf.get('path'):
+        return None
+    max_bytes = int(cache_conf.get('max_size_mb', DEFAULT_MAX_BYTES // (1024 * 1024)) * 1024 * 1024)
+    return OCRCache(cache_conf['path'], max_bytes=max_bytes)
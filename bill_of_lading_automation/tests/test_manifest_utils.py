@@ -0,0 +1,127 @@
+import os
+import sys
+
+import boto3
+import yaml
+from moto import mock_aws
+
+# Add the repository root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..', '..'))
+
+from bill_of_lading_automation.dataiku_plugin.recipes.data_cleaning import run_cleaning
+from bill_of_lading_automation.dataiku_plugin.recipes.field_extraction import run_field_extraction
+from bill_of_lading_automation.dataiku_plugin.recipes.ingest_document import run_ingest
+from bill_of_lading_automation.dataiku_plugin.recipes.integration import run_integration
+from bill_of_lading_automation.dataiku_plugin.recipes.ocr_extraction import cache_key, run_ocr
+from bill_of_lading_automation.dataiku_plugin.recipes.validation import run_validation
+from bill_of_lading_automation.storage.manifest_utils import COMPLETED, FAILED, PENDING, DocumentManifest
+from bill_of_lading_automation.storage.ocr_cache_utils import OCRCache, sha256_file
+
+REGION = 'us-east-1'
+BUCKET = 'bills-of-lading'
+
+
+def _docs(*specs):
+    return [{'doc_key': key, 'etag': etag, 'size': size} for key, etag, size in specs]
+
+
+def test_only_new_changed_or_unfinished_documents_are_emitted(tmp_path):
+    manifest = DocumentManifest(str(tmp_path / 'manifest.sqlite'))
+    docs = _docs(('a.pdf', 'e1', 10), ('b.pdf', 'e2', 20), ('c.pdf', 'e3', 30))
+    assert [doc['doc_key'] for doc in manifest.filter_unprocessed(docs, batch_size=2)] == ['a.pdf', 'b.pdf', 'c.pdf']
+
+    manifest.mark_stage(['a.pdf', 'b.pdf'], 'ocr')
+    manifest.mark_completed(['a.pdf'])
+    manifest.mark_failed('c.pdf', 'Textract job FAILED')
+    assert manifest.get('a.pdf')['status'] == COMPLETED
+    assert manifest.get('c.pdf')['status'] == FAILED and manifest.get('c.pdf')['attempts'] == 1
+
+    # b never completed and c failed: both resume; a is skipped until its content changes
+    assert [doc['doc_key'] for doc in manifest.filter_unprocessed(docs)] == ['b.pdf', 'c.pdf']
+    assert manifest.unfinished() == ['b.pdf', 'c.pdf']
+    changed = _docs(('a.pdf', 'e1-new', 10), ('d.pdf', 'e4', 40))
+    assert [doc['doc_key'] for doc in manifest.filter_unprocessed(changed)] == ['a.pdf', 'd.pdf']
+    assert manifest.get('a.pdf')['status'] == 'pending' and manifest.get('a.pdf')['stage'] is None
+    manifest.close()
+
+    # State survives reopening
+    reopened = DocumentManifest(str(tmp_path / 'manifest.sqlite'))
+    assert reopened.unfinished() == ['a.pdf', 'b.pdf', 'c.pdf', 'd.pdf']
+    reopened.close()
+
+
+@mock_aws
+def test_run_ingest_is_incremental(tmp_path):
+    s3 = boto3.client('s3', region_name=REGION)
+    s3.create_bucket(Bucket=BUCKET)
+    for i in range(3):
+        s3.put_object(Bucket=BUCKET, Key=f'input/bol-{i}.pdf', Body=f'document {i}'.encode())
+    config_path = tmp_path / 'config.yaml'
+    manifest_path = tmp_path / 'state' / 'manifest.sqlite'
+    config_path.write_text(yaml.safe_dump({
+        'ocr': {'engine': 'aws_textract', 'aws_region': REGION, 's3_bucket': BUCKET, 's3_input_prefix': 'input/'},
+        'manifest': {'path': str(manifest_path)},
+    }))
+
+    first = run_ingest(str(config_path))
+    assert [doc['s3_key'] for doc in first] == [f'input/bol-{i}.pdf' for i in range(3)]
+    assert all(doc['etag'] and doc['size'] for doc in first)
+
+    manifest = DocumentManifest(str(manifest_path))
+    manifest.mark_completed(['input/bol-0.pdf', 'input/bol-1.pdf'])
+    manifest.close()
+    s3.put_object(Bucket=BUCKET, Key='input/bol-1.pdf', Body=b'document 1, rescanned')
+    s3.put_object(Bucket=BUCKET, Key='input/bol-3.pdf', Body=b'document 3')
+
+    second = run_ingest(str(config_path))
+    assert [doc['s3_key'] for doc in second] == ['input/bol-1.pdf', 'input/bol-2.pdf', 'input/bol-3.pdf']
+
+
+def test_failed_document_is_not_completed_by_integration(tmp_path):
+    manifest = DocumentManifest(str(tmp_path / 'manifest.sqlite'))
+    list(manifest.filter_unprocessed(_docs(('a.pdf', 'e1', 10))))
+    manifest.mark_failed('a.pdf', 'OCR failed')
+    manifest.mark_completed(['a.pdf'])
+    assert manifest.get('a.pdf')['status'] == FAILED
+
+    # The retry is pending again, so it completes once it gets through
+    assert [doc['doc_key'] for doc in manifest.filter_unprocessed(_docs(('a.pdf', 'e1', 10)))] == ['a.pdf']
+    assert manifest.get('a.pdf')['status'] == PENDING
+    manifest.mark_stage(['a.pdf'], 'ocr')
+    manifest.mark_completed(['a.pdf'])
+    assert manifest.get('a.pdf')['status'] == COMPLETED
+    manifest.close()
+
+
+def test_per_recipe_run_leaves_failed_ocr_to_retry(tmp_path):
+    input_dir = tmp_path / 'input'
+    input_dir.mkdir()
+    readable = input_dir / 'bol-1.png'
+    readable.write_bytes(b'scan of bol-1')
+    unreadable = input_dir / 'unreadable.png'
+    unreadable.write_bytes(b'not an image')
+    # The readable scan's OCR output is cached, so no OCR engine is needed
+    cache = OCRCache(str(tmp_path / 'ocr_cache.sqlite'))
+    cache.put(cache_key({'engine': 'tesseract'}, sha256_file(str(readable))),
+              [{'BlockType': 'LINE', 'Id': '0', 'Text': 'Shipment ID: ABC123', 'Page': 1}])
+    cache.close()
+    config = {
+        'ocr': {'engine': 'tesseract', 'local_input_dir': str(input_dir)},
+        'fields': {'shipment_id': {'pattern': r'Shipment ID: (\w+)'}},
+        'validation': {'required_fields': ['shipment_id'], 'date_format': '%m/%d/%Y'},
+        'integration': {'output_type': 'csv', 'csv_path': str(tmp_path / 'bill_of_lading.csv')},
+        'manifest': {'path': str(tmp_path / 'manifest.sqlite')},
+        'ocr_cache': {'path': str(tmp_path / 'ocr_cache.sqlite')},
+    }
+
+    docs = run_ingest(config)
+    ocr_results = run_ocr(config, docs)
+    validated = run_validation(config, run_field_extraction(config, run_cleaning(ocr_results)))
+    run_integration(config, validated)
+
+    manifest = DocumentManifest(config['manifest']['path'])
+    assert manifest.get(str(readable))['status'] == COMPLETED
+    assert manifest.get(str(unreadable))['status'] == FAILED
+    manifest.close()
+    assert [doc['local_path'] for doc in run_ingest(config)] == [str(unreadable)]
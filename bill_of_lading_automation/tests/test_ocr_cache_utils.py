@@ -0,0 +1,161 @@
+import hashlib
+import os
+import sys
+import time
+
+import boto3
+from moto import mock_aws
+
+# Add the repository root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..', '..'))
+
+from bill_of_lading_automation.aws.s3_utils import S3Client
+from bill_of_lading_automation.dataiku_plugin.recipes.ocr_extraction import cache_key, iter_cached_ocr
+from bill_of_lading_automation.storage.manifest_utils import DocumentManifest
+from bill_of_lading_automation.storage.ocr_cache_utils import OCRCache, sha256_file
+
+REGION = 'us-east-1'
+BUCKET = 'bills-of-lading'
+
+
+def _blocks(text, count=1):
+    return [{'BlockType': 'LINE', 'Id': f'{text}-{i}', 'Text': f'{text} {i}', 'Page': 1} for i in range(count)]
+
+
+def test_cache_round_trip_eviction_and_hit_rate(tmp_path):
+    path = str(tmp_path / 'cache' / 'ocr.sqlite')
+    cache = OCRCache(path)
+    cache.put('a', _blocks('a', 40))
+    # Room for two entries of this size
+    cache.max_bytes = max_bytes = int(cache.stats()['size_bytes'] * 2.5)
+    for name in ('b', 'c'):
+        cache.put(name, _blocks(name, 40))
+    assert cache.stats()['size_bytes'] <= max_bytes
+
+    # The oldest entry went first; reading b makes c the next to go
+    assert cache.get('a') is None
+    assert cache.get('b') == _blocks('b', 40)
+    cache.put('d', _blocks('d', 40))
+    assert cache.get('c') is None
+    assert cache.get('b') is not None and cache.get('d') is not None
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (3, 2) and stats['hit_rate'] == 0.6
+    assert stats['evictions'] == 2 and stats['entries'] == 2
+    cache.close()
+
+    # Counts for this instance start over; the store keeps the totals
+    reopened = OCRCache(path, max_bytes=max_bytes)
+    assert reopened.get('d') == _blocks('d', 40)
+    assert reopened.stats()['hit_rate'] == 1.0
+    assert reopened.stats()['total_hit_rate'] == 4 / 6
+    reopened.close()
+
+
+def test_known_content_skips_ocr_and_duplicates_are_ocrd_once(tmp_path):
+    contents = {'one.png': b'scan 1', 'copy-of-one.png': b'scan 1', 'two.png': b'scan 2'}
+    docs = []
+    for name, data in contents.items():
+        (tmp_path / name).write_bytes(data)
+        docs.append({'local_path': str(tmp_path / name)})
+    docs.append({'local_path': str(tmp_path / 'missing.png')})
+
+    submitted = []
+
+    def fake_ocr(ocr_conf, docs, manifest=None):
+        for doc in docs:
+            submitted.append(os.path.basename(doc['local_path']))
+            if doc['local_path'].endswith('missing.png'):
+                yield {'local_path': doc['local_path'], 'blocks': [], 'error': 'Cannot read document'}
+            else:
+                yield {'local_path': doc['local_path'], 'blocks': iter(_blocks(submitted[-1])), 'error': None}
+
+    ocr_conf = {'engine': 'tesseract'}
+    cache = OCRCache(str(tmp_path / 'ocr.sqlite'))
+    manifest = DocumentManifest(str(tmp_path / 'manifest.sqlite'))
+    list(manifest.filter_unprocessed([{'doc_key': doc['local_path'], 'etag': 'e', 'size': 1} for doc in docs]))
+
+    first = {os.path.basename(r['local_path']): r for r in iter_cached_ocr(ocr_conf, docs, fake_ocr, cache, manifest)}
+    # The copy either waits for one.png's OCR or, hashed after it finished, hits the cache
+    assert sorted(submitted) == ['missing.png', 'one.png', 'two.png']
+    assert first['copy-of-one.png']['blocks'] == first['one.png']['blocks'] == _blocks('one.png')
+    first_hits = cache.stats()['hits']
+    assert first['missing.png']['error'] == 'Cannot read document'
+    assert manifest.get(str(tmp_path / 'copy-of-one.png'))['stage'] == 'ocr'
+
+    submitted.clear()
+    second = {os.path.basename(r['local_path']): r for r in iter_cached_ocr(ocr_conf, docs, fake_ocr, cache, manifest)}
+    assert submitted == ['missing.png']
+    assert second['two.png']['blocks'] == _blocks('two.png')
+    assert second['copy-of-one.png']['blocks'] == _blocks('one.png')
+    assert cache.stats()['hits'] == first_hits + 3
+    manifest.close()
+    cache.close()
+
+
+def test_cache_hits_stream_one_document_at_a_time(tmp_path):
+    cache = OCRCache(str(tmp_path / 'ocr.sqlite'))
+    paths = []
+    for i in range(5):
+        path = tmp_path / f'bol-{i}.png'
+        path.write_bytes(f'scan {i}'.encode())
+        cache.put(cache_key({'engine': 'tesseract'}, sha256_file(str(path))), _blocks(f'bol-{i}'))
+        paths.append(str(path))
+    pulled = []
+
+    def docs():
+        for path in paths:
+            pulled.append(path)
+            yield {'local_path': path}
+
+    def no_ocr(ocr_conf, docs, manifest=None):
+        for doc in docs:
+            raise AssertionError(f"{doc['local_path']} is cached")
+        yield from ()
+
+    results = iter_cached_ocr({'engine': 'tesseract'}, docs(), no_ocr, cache, queue_size=1)
+    first = next(results)
+    time.sleep(0.2)
+    # The hit was yielded without waiting for the rest; lookup is at most the queue ahead
+    assert first['local_path'] == paths[0] and first['blocks'] == _blocks('bol-0')
+    assert len(pulled) <= 3
+    assert [result['local_path'] for result in results] == paths[1:]
+    results.close()
+    cache.close()
+
+
+def test_changing_engine_settings_misses_the_cache(tmp_path):
+    (tmp_path / 'one.png').write_bytes(b'scan 1')
+    docs = [{'local_path': str(tmp_path / 'one.png')}]
+    submitted = []
+
+    def fake_ocr(ocr_conf, docs, manifest=None):
+        for doc in docs:
+            submitted.append(ocr_conf.get('tesseract_lang', 'eng'))
+            yield {'local_path': doc['local_path'], 'blocks': iter(_blocks(submitted[-1])), 'error': None}
+
+    cache = OCRCache(str(tmp_path / 'ocr.sqlite'))
+    for ocr_conf in ({'engine': 'tesseract'}, {'engine': 'tesseract', 'tesseract_lang': 'eng'},
+                     {'engine': 'tesseract', 'tesseract_lang': 'deu'}):
+        results = list(iter_cached_ocr(ocr_conf, docs, fake_ocr, cache))
+    # The explicit default shares entries with the implicit one; another language does not
+    assert submitted == ['eng', 'deu']
+    assert results[0]['blocks'] == _blocks('deu')
+    assert cache_key({'engine': 'aws_textract'}, 'h') != cache_key({'engine': 'tesseract'}, 'h')
+    assert cache_key({'engine': 'tesseract', 'tesseract_dpi': 200}, 'h') != cache_key({'engine': 'tesseract'}, 'h')
+    cache.close()
+
+
+@mock_aws
+def test_s3_objects_are_hashed_by_content():
+    boto3.client('s3', region_name=REGION).create_bucket(Bucket=BUCKET)
+    s3 = S3Client(REGION, max_workers=2)
+    s3.s3.put_object(Bucket=BUCKET, Key='input/a.pdf', Body=b'document a')
+    s3.s3.put_object(Bucket=BUCKET, Key='input/a-again.pdf', Body=b'document a')
+    try:
+        hashes = dict(s3.iter_content_hashes(BUCKET, ['input/a.pdf', 'input/a-again.pdf', 'input/gone.pdf']))
+    finally:
+        s3.close()
+    assert hashes['input/a.pdf'] == hashes['input/a-again.pdf'] == hashlib.sha256(b'document a').hexdigest()
+    assert hashes['input/gone.pdf'] is None
@@ -0,0 +1,99 @@
+import csv
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# Add the repository root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..', '..'))
+
+from bill_of_lading_automation.dataiku_plugin.recipes.ocr_extraction import cache_key
+from bill_of_lading_automation.dataiku_plugin.recipes.pipeline import run_pipeline, threaded_stage
+from bill_of_lading_automation.storage.manifest_utils import COMPLETED, FAILED, DocumentManifest
+from bill_of_lading_automation.storage.ocr_cache_utils import OCRCache, sha256_file
+
+TEXTS = {
+    'bol-1.png': ['Shipment ID: ABC123', 'Date 03/14/2024', 'Carrier: ACME', 'Consignee: Jane Doe'],
+    'bol-2.png': ['Shipment ID: XYZ789', 'Carrier: Oceanic'],
+}
+
+
+def _lines(texts):
+    return [{'BlockType': 'LINE', 'Id': str(i), 'Text': text, 'Page': 1} for i, text in enumerate(texts)]
+
+
+def test_threaded_stage_applies_backpressure_and_reraises():
+    produced = []
+
+    def numbers():
+        for i in range(50):
+            produced.append(i)
+            yield i
+
+    consumed = 0
+    for _ in threaded_stage(numbers(), 'numbers', queue_size=3):
+        consumed += 1
+        time.sleep(0.005)
+        # Queued items plus the one the producer is blocked on
+        assert len(produced) - consumed <= 4
+    assert consumed == 50
+
+    def failing():
+        yield 1
+        raise RuntimeError('listing failed')
+
+    with pytest.raises(RuntimeError, match='listing failed'):
+        list(threaded_stage(failing(), 'failing'))
+    assert not [t for t in threading.enumerate() if t.name.startswith('pipeline-')]
+
+
+@pytest.mark.parametrize('cpu_workers', [0, 2])
+def test_pipeline_streams_documents_end_to_end(tmp_path, cpu_workers):
+    input_dir = tmp_path / 'input'
+    input_dir.mkdir()
+    for name in TEXTS:
+        (input_dir / name).write_bytes(f'scan of {name}'.encode())
+    (input_dir / 'unreadable.png').write_bytes(b'not an image')
+
+    # OCR output for the readable scans is already cached, so no OCR engine is needed
+    cache = OCRCache(str(tmp_path / 'ocr_cache.sqlite'))
+    for name, texts in TEXTS.items():
+        cache.put(cache_key({'engine': 'tesseract'}, sha256_file(str(input_dir / name))), _lines(texts))
+    cache.close()
+
+    csv_path = tmp_path / 'bill_of_lading.csv'
+    config = {
+        'ocr': {'engine': 'tesseract', 'local_input_dir': str(input_dir)},
+        'fields': {
+            'shipment_id': {'pattern': r'Shipment ID: (\w+)'},
+            'date': {'pattern': '([0-9]{2}/[0-9]{2}/[0-9]{4})'},
+            'carrier': {'pattern': 'Carrier: ([A-Za-z0-9 ]+)'},
+        },
+        'validation': {'required_fields': ['shipment_id', 'date', 'carrier'], 'date_format': '%m/%d/%Y'},
+        'integration': {'output_type': 'csv', 'csv_path': str(csv_path)},
+        'manifest': {'path': str(tmp_path / 'manifest.sqlite')},
+        'ocr_cache': {'path': str(tmp_path / 'ocr_cache.sqlite')},
+        'pipeline': {'queue_size': 2, 'io_workers': 2, 'cpu_workers': cpu_workers},
+    }
+
+    counts = run_pipeline(config)
+    assert counts == {'ingested': 3, 'ocr_failed': 1, 'written': 2, 'invalid': 1}
+
+    with open(csv_path, newline='') as f:
+        rows = {os.path.basename(row['s3_key']): row for row in csv.DictReader(f)}
+    assert rows['bol-1.png']['shipment_id'] == 'ABC123' and rows['bol-1.png']['errors'] == ''
+    assert rows['bol-2.png']['carrier'] == 'Oceanic'
+    assert rows['bol-2.png']['errors'] == 'Missing required field: date'
+
+    manifest = DocumentManifest(config['manifest']['path'])
+    assert manifest.get(str(input_dir / 'bol-1.png'))['status'] == COMPLETED
+    assert manifest.get(str(input_dir / 'unreadable.png'))['status'] == FAILED
+    manifest.close()
+
+    # Only the document that failed OCR is picked up again, and earlier output is kept
+    assert run_pipeline(config)['ingested'] == 1
+    with open(csv_path, newline='') as f:
+        assert sorted(os.path.basename(row['s3_key']) for row in csv.DictReader(f)) == ['bol-1.png', 'bol-2.png']
@@ -0,0 +1,91 @@
+import hashlib
+import os
+import sys
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from moto import mock_aws
+
+# Add the repository root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..', '..'))
+
+from bill_of_lading_automation.aws.s3_utils import MB, S3Client
+
+REGION = 'us-east-1'
+BUCKET = 'bills-of-lading'
+
+
+@pytest.fixture
+def s3_client():
+    with mock_aws():
+        boto3.client('s3', region_name=REGION).create_bucket(Bucket=BUCKET)
+        client = S3Client(REGION, max_workers=4, multipart_threshold=5 * MB, multipart_chunksize=5 * MB)
+        yield client
+        client.close()
+
+
+def test_listing_follows_pagination(s3_client):
+    for i in range(1205):
+        s3_client.s3.put_object(Bucket=BUCKET, Key=f'input/doc-{i:04d}.pdf', Body=b'%PDF')
+    s3_client.s3.put_object(Bucket=BUCKET, Key='other/doc.pdf', Body=b'%PDF')
+
+    keys = s3_client.list_files(BUCKET, 'input/')
+    assert len(keys) == 1205
+    assert keys[0] == 'input/doc-0000.pdf' and keys[-1] == 'input/doc-1204.pdf'
+    first = next(s3_client.iter_objects(BUCKET, 'input/'))
+    assert first['Size'] == 4 and first['ETag']
+
+
+def test_bulk_upload_and_download(s3_client, tmp_path):
+    source = tmp_path / 'source'
+    source.mkdir()
+    paths = []
+    for i in range(10):
+        path = source / f'bol-{i}.pdf'
+        path.write_bytes(os.urandom(1024 * (i + 1)))
+        paths.append(str(path))
+    # Large enough to be sent as a multipart upload
+    large = source / 'large.pdf'
+    large.write_bytes(os.urandom(11 * MB))
+    paths.append(str(large))
+
+    uploaded = dict(s3_client.upload_files(paths, BUCKET, prefix='input/2024/'))
+    assert sorted(uploaded.values()) == sorted(f'input/2024/{os.path.basename(path)}' for path in paths)
+    large_etag = s3_client.s3.head_object(Bucket=BUCKET, Key='input/2024/large.pdf')['ETag']
+    assert large_etag.strip('"').endswith('-3')
+
+    target = tmp_path / 'target'
+    downloaded = dict(s3_client.download_files(BUCKET, s3_client.iter_files(BUCKET, 'input/'), str(target),
+                                               prefix='input/'))
+    assert len(downloaded) == len(paths)
+    for path in paths:
+        local = downloaded[f'input/2024/{os.path.basename(path)}']
+        assert local == os.path.join(str(target), '2024', os.path.basename(path))
+        with open(local, 'rb') as copy, open(path, 'rb') as original:
+            assert hashlib.md5(copy.read()).digest() == hashlib.md5(original.read()).digest()
+
+
+def test_bulk_download_reports_errors(s3_client, tmp_path):
+    s3_client.s3.put_object(Bucket=BUCKET, Key='input/present.pdf', Body=b'%PDF')
+    with pytest.raises(ClientError):
+        list(s3_client.download_files(BUCKET, ['input/present.pdf', 'input/missing.pdf'], str(tmp_path)))
+
+
+def test_bulk_download_skips_folder_markers(s3_client, tmp_path):
+    s3_client.s3.put_object(Bucket=BUCKET, Key='input/', Body=b'')
+    s3_client.s3.put_object(Bucket=BUCKET, Key='input/2024/', Body=b'')
+    s3_client.s3.put_object(Bucket=BUCKET, Key='input/2024/bol.pdf', Body=b'%PDF')
+
+    downloaded = dict(s3_client.download_files(BUCKET, s3_client.iter_files(BUCKET, 'input/'), str(tmp_path),
+                                               prefix='input/'))
+    assert downloaded == {'input/2024/bol.pdf': os.path.join(str(tmp_path), '2024', 'bol.pdf')}
+
+
+def test_bulk_download_rejects_keys_outside_local_dir(s3_client, tmp_path):
+    target = tmp_path / 'target'
+    s3_client.s3.put_object(Bucket=BUCKET, Key='input/../../escape.txt', Body=b'outside')
+    with pytest.raises(ValueError, match='outside'):
+        list(s3_client.download_files(BUCKET, s3_client.iter_files(BUCKET, 'input/'), str(target), prefix='input/'))
+    assert not (tmp_path.parent / 'escape.txt').exists()
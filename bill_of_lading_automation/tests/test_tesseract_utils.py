@@ -0,0 +1,148 @@
+import importlib.util
+import os
+import shutil
+import sys
+from concurrent.futures import Future
+
+import pytest
+from PIL import Image, ImageDraw
+
+# Add the repository root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..', '..'))
+
+from bill_of_lading_automation.dataiku_plugin.recipes.data_cleaning import clean_ocr_blocks
+from bill_of_lading_automation.local import tesseract_utils
+from bill_of_lading_automation.local.tesseract_utils import (
+    TesseractOCR, count_pages, otsu_threshold, preprocess_image, words_to_blocks
+)
+
+
+def _page_image(text='Shipment ID: ABC123', size=(800, 200)):
+    image = Image.new('RGB', size, (235, 230, 220))
+    ImageDraw.Draw(image).text((40, 80), text, fill=(30, 30, 30))
+    return image
+
+
+def test_preprocessing_binarizes_and_upscales_small_scans():
+    page = preprocess_image(_page_image())
+    assert page.mode == 'L'
+    assert page.width == 1600 and page.height == 400
+    histogram = page.histogram()
+    assert sum(histogram[1:255]) == 0
+    assert 0 < histogram[0] < page.width * page.height * 0.1
+
+
+def test_otsu_threshold_separates_two_modes():
+    histogram = [0] * 256
+    histogram[40], histogram[200] = 1000, 3000
+    assert 40 <= otsu_threshold(histogram) < 200
+
+
+def test_words_become_textract_style_blocks():
+    data = {
+        'text': ['', 'Shipment', 'ID:', 'ABC123', 'Carrier:', 'ACME', ' '],
+        'conf': ['-1', '96', '91', '88', '95', '90', '-1'],
+        'block_num': [1, 1, 1, 1, 1, 1, 1],
+        'par_num': [1, 1, 1, 1, 1, 1, 1],
+        'line_num': [0, 1, 1, 1, 2, 2, 2],
+        'left': [0, 100, 300, 400, 100, 300, 0],
+        'top': [0, 100, 100, 102, 200, 200, 0],
+        'width': [1000, 180, 80, 150, 160, 120, 0],
+        'height': [500, 30, 30, 28, 30, 30, 0],
+    }
+    blocks = words_to_blocks(data, 1000, 500, page=2)
+
+    lines = [block for block in blocks if block['BlockType'] == 'LINE']
+    assert [line['Text'] for line in lines] == ['Shipment ID: ABC123', 'Carrier: ACME']
+    first = lines[0]
+    assert first['Page'] == 2
+    assert first['Geometry']['BoundingBox'] == pytest.approx({'Left': 0.1, 'Top': 0.2, 'Width': 0.45, 'Height': 0.06})
+    assert first['Confidence'] == pytest.approx((96 + 91 + 88) / 3)
+    words = {block['Id']: block for block in blocks if block['BlockType'] == 'WORD'}
+    assert [words[i]['Text'] for i in first['Relationships'][0]['Ids']] == ['Shipment', 'ID:', 'ABC123']
+    assert 'Shipment ID: ABC123' in clean_ocr_blocks(blocks)
+
+
+def test_multi_frame_images_count_pages(tmp_path):
+    path = str(tmp_path / 'scan.tiff')
+    _page_image('page 1').save(path, save_all=True, append_images=[_page_image('page 2'), _page_image('page 3')])
+    assert count_pages(path) == 3
+
+
+class ImmediateExecutor:
+    """Runs nothing; each page comes back at once as a single LINE block."""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, function, path, page, **options):
+        self.submitted.append(page)
+        future = Future()
+        future.set_result([{'BlockType': 'LINE', 'Id': str(page), 'Text': f'page {page}', 'Page': page}])
+        return future
+
+    def shutdown(self, wait=True):
+        pass
+
+
+def test_pages_of_a_long_document_are_submitted_within_the_bound(tmp_path, monkeypatch):
+    path = str(tmp_path / 'long.tiff')
+    pages = [_page_image(f'page {i}') for i in range(10)]
+    pages[0].save(path, save_all=True, append_images=pages[1:])
+    in_flight = []
+    real_wait = tesseract_utils.wait
+
+    def recording_wait(futures, **kwargs):
+        in_flight.append(len(futures))
+        return real_wait(futures, **kwargs)
+
+    monkeypatch.setattr(tesseract_utils, 'wait', recording_wait)
+    ocr = TesseractOCR(max_workers=1)
+    ocr._executor = executor = ImmediateExecutor()
+    [result] = list(ocr.detect_documents_text([path]))
+
+    assert executor.submitted == list(range(1, 11))
+    assert max(in_flight) <= 2
+    assert result['error'] is None and [block['Page'] for block in result['blocks']] == list(range(1, 11))
+
+
+@pytest.mark.skipif(importlib.util.find_spec('pytesseract') is not None, reason='pytesseract installed')
+def test_page_failures_are_reported_per_document(tmp_path):
+    paths = []
+    for name, page_count in (('one.tiff', 1), ('three.tiff', 3)):
+        path = str(tmp_path / name)
+        pages = [_page_image(f'page {i}') for i in range(page_count)]
+        pages[0].save(path, save_all=True, append_images=pages[1:])
+        paths.append(path)
+    paths.append(str(tmp_path / 'missing.png'))
+
+    ocr = TesseractOCR(max_workers=2)
+    try:
+        results = {result['local_path']: result for result in ocr.detect_documents_text(paths)}
+    finally:
+        ocr.close()
+
+    assert sorted(results) == sorted(paths)
+    assert results[paths[2]]['error'].startswith('Cannot read document')
+    for path in paths[:2]:
+        assert 'pytesseract' in results[path]['error'] and results[path]['blocks'] == []
+
+
+@pytest.mark.skipif(shutil.which('tesseract') is None, reason='tesseract binary not installed')
+def test_ocr_documents_with_tesseract(tmp_path):
+    pytest.importorskip('pytesseract')
+    path = str(tmp_path / 'bol.tiff')
+    pages = [_page_image('Shipment ID: ABC123', (1600, 300)), _page_image('Carrier: ACME', (1600, 300))]
+    pages[0].save(path, save_all=True, append_images=pages[1:])
+
+    ocr = TesseractOCR(max_workers=2)
+    try:
+        [result] = list(ocr.detect_documents_text([path]))
+    finally:
+        ocr.close()
+
+    assert result['error'] is None
+    lines = [block for block in result['blocks'] if block['BlockType'] == 'LINE']
+    assert [line['Page'] for line in lines] == sorted(line['Page'] for line in lines)
+    assert 'ABC123' in ' '.join(line['Text'] for line in lines)
@@ -0,0 +1,215 @@
+import itertools
+import json
+import os
+import sys
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from botocore.stub import Stubber
+from moto import mock_aws
+
+# Add the repository root to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..', '..'))
+
+from bill_of_lading_automation.aws.textract_utils import TextractClient, TextractJobError, TextractJobTracker
+
+REGION = 'us-east-1'
+
+
+def _client_error(code, operation):
+    return ClientError({'Error': {'Code': code, 'Message': f'{code} raised'}}, operation)
+
+
+class FakeTextract:
+    """Jobs that stay in progress for a number of polls, tracking concurrency."""
+
+    def __init__(self, polls_until_done):
+        self.polls_until_done = polls_until_done
+        self.jobs = {}
+        self.running = 0
+        self.max_running = 0
+        self.polls = 0
+
+    def start_document_text_detection(self, s3_bucket, s3_key, notification_channel=None):
+        if s3_key.startswith('missing'):
+            raise _client_error('InvalidS3ObjectException', 'StartDocumentTextDetection')
+        job_id = f'job-{len(self.jobs)}'
+        self.jobs[job_id] = [s3_key, self.polls_until_done(s3_key)]
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        return job_id
+
+    def get_job_status(self, job_id):
+        self.polls += 1
+        job = self.jobs[job_id]
+        if job[0].startswith('expired'):
+            raise _client_error('InvalidJobIdException', 'GetDocumentTextDetection')
+        if job[0].startswith('throttled') and self.polls % 2:
+            raise _client_error('ThrottlingException', 'GetDocumentTextDetection')
+        job[1] -= 1
+        if job[1] > 0:
+            return 'IN_PROGRESS', {'JobStatus': 'IN_PROGRESS'}
+        self.running -= 1
+        if job[0].startswith('bad'):
+            return 'FAILED', {'JobStatus': 'FAILED', 'StatusMessage': 'Unsupported document'}
+        return 'SUCCEEDED', {'JobStatus': 'SUCCEEDED'}
+
+    def iter_document_text_blocks(self, job_id):
+        yield {'BlockType': 'LINE', 'Text': self.jobs[job_id][0]}
+
+
+def test_jobs_run_concurrently_within_limit_and_finish_out_of_order():
+    keys = [f'doc-{i}.pdf' for i in range(12)] + ['bad.pdf']
+    # Even documents take longer than odd ones
+    fake = FakeTextract(lambda key: 4 if key[-5:-4].isdigit() and int(key[-5:-4]) % 2 == 0 else 1)
+    tracker = TextractJobTracker(fake, max_concurrent_jobs=4, poll_interval=0.001, max_poll_interval=0.004)
+
+    results = list(tracker.run('bucket', keys))
+
+    assert sorted(result['s3_key'] for result in results) == sorted(keys)
+    assert fake.max_running == 4
+    assert [result['s3_key'] for result in results] != keys
+    failed = [result for result in results if result['error']]
+    assert [(result['s3_key'], result['error'], list(result['blocks'])) for result in failed] == [
+        ('bad.pdf', 'Unsupported document', [])
+    ]
+    ok = next(result for result in results if result['s3_key'] == 'doc-3.pdf')
+    assert list(ok['blocks']) == [{'BlockType': 'LINE', 'Text': 'doc-3.pdf'}]
+    # One status poll per job for quick documents, a few more for slow ones
+    assert fake.polls == 6 * 1 + 6 * 4 + 1
+
+
+def test_job_that_cannot_start_does_not_abandon_the_batch():
+    keys = ['doc-0.pdf', 'missing.pdf', 'doc-1.pdf', 'doc-2.pdf']
+    fake = FakeTextract(lambda key: 2)
+    tracker = TextractJobTracker(fake, max_concurrent_jobs=2, poll_interval=0.001, max_poll_interval=0.004)
+
+    results = {result['s3_key']: result for result in tracker.run('bucket', keys)}
+
+    assert sorted(results) == sorted(keys)
+    assert results['missing.pdf']['job_id'] is None and 'InvalidS3ObjectException' in results['missing.pdf']['error']
+    assert all(results[key]['error'] is None for key in keys if key != 'missing.pdf')
+
+
+def test_failed_status_poll_fails_only_its_job():
+    keys = ['doc-0.pdf', 'expired.pdf', 'throttled.pdf', 'doc-1.pdf']
+    fake = FakeTextract(lambda key: 2)
+    tracker = TextractJobTracker(fake, max_concurrent_jobs=4, poll_interval=0.001, max_poll_interval=0.004)
+
+    results = {result['s3_key']: result for result in tracker.run('bucket', keys)}
+
+    assert sorted(results) == sorted(keys)
+    assert results['expired.pdf']['status'] == 'FAILED' and 'InvalidJobIdException' in results['expired.pdf']['error']
+    # Throttled polls are retried, so the job still finishes
+    assert all(results[key]['error'] is None for key in ('doc-0.pdf', 'throttled.pdf', 'doc-1.pdf'))
+
+
+def test_unreadable_completion_queue_falls_back_to_polling():
+    class BrokenQueue:
+        def receive_message(self, **kwargs):
+            raise _client_error('AWS.SimpleQueueService.NonExistentQueue', 'ReceiveMessage')
+
+    fake = FakeTextract(lambda key: 2)
+    tracker = TextractJobTracker(
+        fake, max_concurrent_jobs=2, max_poll_interval=0.01,
+        notification_channel={'SNSTopicArn': 'topic', 'RoleArn': 'role'}, sqs_client=BrokenQueue(), queue_url='queue',
+    )
+
+    results = list(tracker.run('bucket', ['doc-0.pdf', 'doc-1.pdf', 'doc-2.pdf']))
+
+    assert sorted(result['s3_key'] for result in results) == ['doc-0.pdf', 'doc-1.pdf', 'doc-2.pdf']
+    assert all(result['error'] is None for result in results)
+
+
+@mock_aws
+def test_detect_documents_text_against_moto():
+    textract = TextractClient(REGION)
+    keys = [f'input/doc-{i}.pdf' for i in range(7)]
+
+    results = list(textract.detect_documents_text('bucket', keys, max_concurrent_jobs=3, poll_interval=0.001))
+
+    assert sorted(result['s3_key'] for result in results) == keys
+    assert all(result['status'] == 'SUCCEEDED' and result['error'] is None for result in results)
+
+
+@mock_aws
+def test_completion_notifications_replace_polling():
+    sns = boto3.client('sns', region_name=REGION)
+    sqs = boto3.client('sqs', region_name=REGION)
+    topic_arn = sns.create_topic(Name='textract-completions')['TopicArn']
+    queue_url = sqs.create_queue(QueueName='textract-completions')['QueueUrl']
+    queue_arn = sqs.get_queue_attributes(QueueUrl=queue_url, AttributeNames=['QueueArn'])['Attributes']['QueueArn']
+    sns.subscribe(TopicArn=topic_arn, Protocol='sqs', Endpoint=queue_arn)
+    # A completion of another run sharing the queue
+    sns.publish(TopicArn=topic_arn, Message=json.dumps({'JobId': 'other-run-job', 'Status': 'SUCCEEDED'}))
+
+    textract = TextractClient(REGION)
+    keys = [f'input/doc-{i}.pdf' for i in range(5)]
+    tracker = TextractJobTracker(
+        textract, max_concurrent_jobs=2, max_poll_interval=60,
+        notification_channel={'SNSTopicArn': topic_arn, 'RoleArn': 'arn:aws:iam::123456789012:role/textract'},
+        sqs_client=sqs, queue_url=queue_url,
+    )
+
+    # With a 60s fallback poll this only finishes quickly if notifications are consumed
+    results = list(tracker.run('bucket', keys))
+
+    assert sorted(result['s3_key'] for result in results) == keys
+    assert 'Messages' not in sqs.receive_message(QueueUrl=queue_url)
+    # Only the other run's notification is left, waiting to become visible again
+    attributes = sqs.get_queue_attributes(QueueUrl=queue_url, AttributeNames=['All'])['Attributes']
+    assert int(attributes['ApproximateNumberOfMessages']) + int(attributes['ApproximateNumberOfMessagesNotVisible']) == 1
+
+
+def _page(blocks, next_token=None, status='SUCCEEDED'):
+    response = {'JobStatus': status, 'Blocks': blocks}
+    if next_token:
+        response['NextToken'] = next_token
+    return response
+
+
+def _line(i):
+    return {'BlockType': 'LINE', 'Id': str(i), 'Text': f'line {i}'}
+
+
+def test_blocks_follow_next_token_lazily():
+    textract = TextractClient(REGION)
+    calls = []
+    textract.client.meta.events.register('before-parameter-build.textract.GetDocumentTextDetection',
+                                         lambda **kwargs: calls.append(1))
+    with Stubber(textract.client) as stubber:
+        stubber.add_response('get_document_text_detection', _page([_line(0), _line(1)], 'page-2'),
+                             {'JobId': 'job', 'MaxResults': 2})
+        stubber.add_response('get_document_text_detection', _page([_line(2), _line(3)], 'page-3'),
+                             {'JobId': 'job', 'MaxResults': 2, 'NextToken': 'page-2'})
+        stubber.add_response('get_document_text_detection', _page([_line(4)]),
+                             {'JobId': 'job', 'MaxResults': 2, 'NextToken': 'page-3'})
+
+        blocks = textract.iter_document_text_blocks('job', page_size=2)
+        assert [block['Id'] for block in itertools.islice(blocks, 3)] == ['0', '1', '2']
+        # Only the pages needed so far have been requested
+        assert len(calls) == 2
+        assert [block['Id'] for block in blocks] == ['3', '4']
+        stubber.assert_no_pending_responses()
+
+
+def test_get_document_text_detection_returns_every_page(monkeypatch):
+    monkeypatch.setattr('bill_of_lading_automation.aws.textract_utils.time.sleep', lambda seconds: None)
+    textract = TextractClient(REGION)
+    with Stubber(textract.client) as stubber:
+        stubber.add_response('get_document_text_detection', _page([], status='IN_PROGRESS'),
+                             {'JobId': 'job', 'MaxResults': 1})
+        stubber.add_response('get_document_text_detection', _page([_line(0)], 'more'),
+                             {'JobId': 'job', 'MaxResults': 1})
+        stubber.add_response('get_document_text_detection', _page([_line(0)], 'page-2'),
+                             {'JobId': 'job', 'MaxResults': 1000})
+        stubber.add_response('get_document_text_detection', _page([_line(1)]),
+                             {'JobId': 'job', 'MaxResults': 1000, 'NextToken': 'page-2'})
+        stubber.add_response('get_document_text_detection', _page([], status='FAILED'),
+                             {'JobId': 'failed', 'MaxResults': 1000})
+
+        assert [block['Id'] for block in textract.get_document_text_detection('job')] == ['0', '1']
+        with pytest.raises(TextractJobError):
+            list(textract.iter_document_text_blocks('failed'))
@@ -0,0 +1,167 @@
+import ast
+import atexit
+import json
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def _as_list(value) -> List[Any]:
+    """Tags read back from a dataset may be serialized lists."""
+    if isinstance(value, (list, tuple, set)):
+        return list(value)
+    if isinstance(value, str):
+        for parse in (json.loads, ast.literal_eval):
+            try:
+                parsed = parse(value)
+            except (ValueError, SyntaxError):
+                continue
+            if isinstance(parsed, (list, tuple)):
+                return list(parsed)
+        return [value] if value else []
+    return []
+
+
+def _copy_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    copied = dict(entry)
+    copied['tags'] = list(entry.get('tags') or [])
+    return copied
+
+
+class CatalogIndex:
+    def __init__(self, entries: Iterable[Dict[str, Any]] = ()):
+        """In-memory catalog keyed by dataset name.
+
+        Entries are returned as copies; change them through ``upsert``.
+        Tag, sensitivity and text search live in ``CatalogSearchIndex``.
+        """
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._order: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        for entry in entries:
+            self.upsert(entry)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> 'CatalogIndex':
+        if df is None or df.empty:
+            return cls()
+        return cls(df.to_dict('records'))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, dataset_name: str) -> bool:
+        return dataset_name in self._entries
+
+    def get(self, dataset_name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(dataset_name)
+            return _copy_entry(entry) if entry is not None else None
+
+    def entries(self, dataset_names: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Copies of the given entries (default all), in catalog (insertion) order."""
+        with self._lock:
+            if dataset_names is None:
+                return [_copy_entry(entry) for entry in self._entries.values()]
+            names = sorted(
+                (name for name in dataset_names if name in self._entries),
+                key=self._order.__getitem__
+            )
+            return [_copy_entry(self._entries[name]) for name in names]
+
+    def upsert(self, entry: Dict[str, Any]) -> None:
+        """Insert or replace an entry."""
+        entry = dict(entry)
+        entry['tags'] = _as_list(entry.get('tags'))
+        name = entry['dataset_name']
+        with self._lock:
+            if name not in self._entries:
+                self._order[name] = len(self._order)
+            self._entries[name] = entry
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Snapshot of the catalog in the dataset's row layout."""
+        with self._lock:
+            return pd.DataFrame([_copy_entry(entry) for entry in self._entries.values()])
+
+
+class WriteBehindWriter:
+    def __init__(self, store, index: CatalogIndex, flush_interval: float = 5.0, max_pending: int = 500):
+        """Persist the catalog index in periodic batched writes.
+
+        Updates only mark the catalog dirty; a background thread writes a
+        single snapshot every ``flush_interval`` seconds, or sooner once
+        ``max_pending`` updates have accumulated. Pending updates are
+        flushed on ``close`` and at interpreter exit.
+
+        Args:
+            store: Dataset with ``write_with_schema(df)``
+            index: Catalog index to snapshot
+            flush_interval: Maximum seconds between an update and its write
+            max_pending: Updates that trigger an early write
+        """
+        self.store = store
+        self.index = index
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.writes = 0
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='catalog-write-behind', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def mark_dirty(self):
+        with self._lock:
+            self._pending += 1
+            if self._pending >= self.max_pending:
+                self._wake.set()
+
+    def flush(self):
+        """Write the current catalog if anything changed since the last write."""
+        with self._write_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                count = self._pending
+                self._pending = 0
+            snapshot = self.index.to_dataframe()
+            try:
+                self.store.write_with_schema(snapshot)
+                self.writes += 1
+            except Exception:
+                with self._lock:
+                    self._pending += count
+                raise
+
+    def close(self):
+        """Stop the background thread and write any pending updates."""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+        atexit.unregister(self.close)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self._stopped.is_set():
+                break
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error writing catalog: {str(e)}")
@@ -0,0 +1,199 @@
+import bisect
+import json
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Name matches count more than schema column matches, which count more than description matches
+FIELD_WEIGHTS = {'dataset_name': 3.0, 'columns': 2.0, 'description': 1.0}
+BM25_K1 = 1.2
+BM25_B = 0.75
+MAX_PREFIX_EXPANSIONS = 50
+
+
+def tokenize(text) -> List[str]:
+    """Lowercase alphanumeric tokens; ``fraud_transactions`` -> ``fraud``, ``transactions``."""
+    return _TOKEN_PATTERN.findall(str(text or '').lower())
+
+
+def _column_names(schema) -> List[str]:
+    if isinstance(schema, str):
+        try:
+            schema = json.loads(schema)
+        except ValueError:
+            return []
+    if not isinstance(schema, dict):
+        return []
+    return [str(column.get('name', '')) for column in schema.get('columns') or [] if isinstance(column, dict)]
+
+
+def _bits(bitmap: int) -> Iterable[int]:
+    """Positions of the set bits of an integer bitmap, lowest first."""
+    # One pass over the binary string; shifting a large int per bit is quadratic
+    bits = bin(bitmap)[:1:-1]
+    position = bits.find('1')
+    while position != -1:
+        yield position
+        position = bits.find('1', position + 1)
+
+
+class CatalogSearchIndex:
+    def __init__(self, entries: Iterable[Dict[str, Any]] = ()):
+        """Inverted-index search over catalog entries.
+
+        Dataset names, descriptions and schema column names are tokenized
+        into weighted term frequencies and ranked with BM25. The last query
+        term also matches as a prefix (``fra`` finds ``fraud``) through a
+        sorted vocabulary. Tag and sensitivity filters are integer bitmaps
+        over document ids, so multi-tag filters are a few big-int ANDs.
+
+        Entries are indexed incrementally with ``add``; re-adding a dataset
+        replaces its previous version.
+        """
+        self._doc_ids: Dict[str, int] = {}
+        self._names: List[Optional[str]] = []
+        self._doc_terms: List[Optional[Counter]] = []
+        self._doc_lengths: List[float] = []
+        self._total_length = 0.0
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._vocabulary: List[str] = []
+        self._tag_bitmaps: Dict[Any, int] = {}
+        self._sensitivity_bitmaps: Dict[Any, int] = {}
+        self._doc_filters: List[Tuple[List[Any], Any]] = []
+        self._all_docs = 0
+        self._lock = threading.RLock()
+        for entry in entries:
+            self.add(entry)
+
+    def __len__(self) -> int:
+        return len(self._doc_ids)
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        """Index an entry, replacing any previous version of the same dataset."""
+        name = entry['dataset_name']
+        terms = Counter()
+        for token in tokenize(name):
+            terms[token] += FIELD_WEIGHTS['dataset_name']
+        for token in tokenize(entry.get('description')):
+            terms[token] += FIELD_WEIGHTS['description']
+        for column in _column_names(entry.get('schema')):
+            for token in tokenize(column):
+                terms[token] += FIELD_WEIGHTS['columns']
+        tags = list(entry.get('tags') or [])
+        sensitivity = entry.get('sensitivity_level')
+
+        with self._lock:
+            doc_id = self._doc_ids.get(name)
+            if doc_id is None:
+                doc_id = len(self._names)
+                self._doc_ids[name] = doc_id
+                self._names.append(name)
+                self._doc_terms.append(None)
+                self._doc_lengths.append(0.0)
+                self._doc_filters.append(([], None))
+                self._all_docs |= 1 << doc_id
+            else:
+                self._remove_terms(doc_id)
+                self._remove_filters(doc_id)
+
+            bit = 1 << doc_id
+            for term, weight in terms.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    bisect.insort(self._vocabulary, term)
+                postings[doc_id] = weight
+            self._doc_terms[doc_id] = terms
+            self._doc_lengths[doc_id] = sum(terms.values())
+            self._total_length += self._doc_lengths[doc_id]
+
+            for tag in tags:
+                self._tag_bitmaps[tag] = self._tag_bitmaps.get(tag, 0) | bit
+            self._sensitivity_bitmaps[sensitivity] = self._sensitivity_bitmaps.get(sensitivity, 0) | bit
+            self._doc_filters[doc_id] = (tags, sensitivity)
+
+    def search(self, query: str = '', tags: Optional[List[str]] = None,
+               sensitivity_level: Optional[str] = None, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Rank datasets matching ``query`` within the tag and sensitivity filters.
+
+        Without a query every dataset passing the filters is returned, in
+        indexing order, with a score of 0.
+
+        Returns:
+            (dataset_name, score) pairs, best first
+        """
+        with self._lock:
+            allowed = self._filter_bitmap(tags, sensitivity_level)
+            if not allowed:
+                return []
+
+            query_terms = tokenize(query)
+            if not query_terms:
+                names = [(self._names[doc_id], 0.0) for doc_id in _bits(allowed)]
+                return names[:limit] if limit is not None else names
+
+            # Membership tests against a set; only built when a filter applies
+            allowed_ids = None if allowed == self._all_docs else set(_bits(allowed))
+            scores: Dict[int, float] = {}
+            n_docs = len(self._doc_ids)
+            avg_length = self._total_length / n_docs if n_docs else 1.0
+            for i, token in enumerate(query_terms):
+                is_last = i == len(query_terms) - 1
+                for term in (self._expand_prefix(token) if is_last else [token]):
+                    postings = self._postings.get(term)
+                    if not postings:
+                        continue
+                    idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                    if allowed_ids is None:
+                        matches = postings.items()
+                    elif len(allowed_ids) < len(postings):
+                        matches = ((doc_id, postings[doc_id]) for doc_id in allowed_ids if doc_id in postings)
+                    else:
+                        matches = ((doc_id, tf) for doc_id, tf in postings.items() if doc_id in allowed_ids)
+                    for doc_id, tf in matches:
+                        norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_lengths[doc_id] / avg_length)
+                        scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+            if limit is not None:
+                ranked = ranked[:limit]
+            return [(self._names[doc_id], score) for doc_id, score in ranked]
+
+    def _filter_bitmap(self, tags, sensitivity_level) -> int:
+        allowed = self._all_docs
+        for tag in tags or []:
+            allowed &= self._tag_bitmaps.get(tag, 0)
+        if sensitivity_level:
+            allowed &= self._sensitivity_bitmaps.get(sensitivity_level, 0)
+        return allowed
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        """The exact term plus vocabulary terms starting with ``prefix``."""
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        terms = []
+        for term in self._vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms or [prefix]
+
+    def _remove_terms(self, doc_id: int) -> None:
+        for term in self._doc_terms[doc_id] or ():
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+                index = bisect.bisect_left(self._vocabulary, term)
+                del self._vocabulary[index]
+        self._total_length -= self._doc_lengths[doc_id]
+
+    def _remove_filters(self, doc_id: int) -> None:
+        mask = ~(1 << doc_id)
+        tags, sensitivity = self._doc_filters[doc_id]
+        for tag in tags:
+            self._tag_bitmaps[tag] &= mask
+        self._sensitivity_bitmaps[sensitivity] &= mask
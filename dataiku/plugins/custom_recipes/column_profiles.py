@@ -0,0 +1,333 @@
+import base64
+import json
+import math
+import os
+from datetime import datetime
+from urllib.parse import quote, unquote
+
+import numpy as np
+import pandas as pd
+
+from reference_index import HyperLogLog, hash_values
+
+# Quantiles are within 1% of the true value
+DEFAULT_RELATIVE_ACCURACY = 0.01
+# 4096 distinct-count registers per column, ~1.6% relative error
+DISTINCT_PRECISION = 12
+
+PROFILE_SUFFIX = '.json'
+TOTAL_FILE = 'total.json'
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch with relative error guarantees.
+
+    Values go into logarithmic buckets (as in DDSketch): bucket ``i`` holds
+    values in ``(gamma**(i-1), gamma**i]``, so any quantile is returned
+    within ``relative_accuracy`` of its true value. Merging adds bucket
+    counts, which makes per-partition sketches combine exactly.
+    """
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY, positive=None, negative=None, zeros=0):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = dict(positive or {})
+        self.negative = dict(negative or {})
+        self.zeros = int(zeros)
+
+    @property
+    def count(self):
+        return sum(self.positive.values()) + sum(self.negative.values()) + self.zeros
+
+    def update(self, values):
+        """Add finite values."""
+        values = np.asarray(values, dtype=np.float64)
+        self._add(self.positive, values[values > 0])
+        self._add(self.negative, -values[values < 0])
+        self.zeros += int(np.count_nonzero(values == 0))
+
+    def _add(self, buckets, values):
+        if len(values) == 0:
+            return
+        indices, counts = np.unique(np.ceil(np.log(values) / self._log_gamma).astype(np.int64), return_counts=True)
+        for index, count in zip(indices.tolist(), counts.tolist()):
+            buckets[index] = buckets.get(index, 0) + count
+
+    def merge(self, other):
+        for buckets, other_buckets in ((self.positive, other.positive), (self.negative, other.negative)):
+            for index, count in other_buckets.items():
+                buckets[index] = buckets.get(index, 0) + count
+        self.zeros += other.zeros
+
+    def quantile(self, q):
+        total = self.count
+        if not total:
+            return None
+        rank = q * (total - 1)
+        seen = 0
+        # Most negative values first: the largest negative bucket indices
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return -self._bucket_value(index)
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return self._bucket_value(index)
+        return self._bucket_value(max(self.positive))
+
+    def _bucket_value(self, index):
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def to_dict(self):
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'positive': {str(index): count for index, count in self.positive.items()},
+            'negative': {str(index): count for index, count in self.negative.items()},
+            'zeros': self.zeros,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data['relative_accuracy'],
+            positive={int(index): count for index, count in data['positive'].items()},
+            negative={int(index): count for index, count in data['negative'].items()},
+            zeros=data['zeros'],
+        )
+
+
+class ColumnProfile:
+    """Mergeable statistics of one column.
+
+    Counts, min/max and a quantile sketch merge by addition or comparison;
+    mean and variance merge with Chan's parallel formulas; distinct
+    counts come from a HyperLogLog sketch whose registers merge by max.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.nulls = 0
+        self.numeric_count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        self.quantiles = QuantileSketch()
+        self.distinct = HyperLogLog(DISTINCT_PRECISION)
+
+    def update(self, series):
+        nulls = series.isna()
+        self.count += len(series)
+        self.nulls += int(nulls.sum())
+        values = series[~nulls]
+        if len(values) == 0:
+            return
+        self.distinct.update(hash_values(values))
+        if pd.api.types.is_numeric_dtype(values):
+            values = values.to_numpy(dtype=np.float64)
+            values = values[np.isfinite(values)]
+            if len(values):
+                self._merge_moments(len(values), float(values.mean()), float(((values - values.mean()) ** 2).sum()),
+                                    float(values.min()), float(values.max()))
+                self.quantiles.update(values)
+
+    def merge(self, other):
+        self.count += other.count
+        self.nulls += other.nulls
+        if other.numeric_count:
+            self._merge_moments(other.numeric_count, other.mean, other.m2, other.min, other.max)
+        self.quantiles.merge(other.quantiles)
+        self.distinct.merge(other.distinct)
+
+    def _merge_moments(self, n, mean, m2, minimum, maximum):
+        total = self.numeric_count + n
+        delta = mean - self.mean
+        self.m2 += m2 + delta * delta * self.numeric_count * n / total
+        self.mean += delta * n / total
+        self.numeric_count = total
+        self.min = minimum if self.min is None else min(self.min, minimum)
+        self.max = maximum if self.max is None else max(self.max, maximum)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.numeric_count - 1) if self.numeric_count > 1 else None
+
+    def summary(self):
+        summary = {
+            'count': self.count,
+            'nulls': self.nulls,
+            'null_ratio': self.nulls / self.count if self.count else None,
+            'distinct': round(self.distinct.estimate()),
+        }
+        if self.numeric_count:
+            summary.update({
+                'min': self.min,
+                'max': self.max,
+                'mean': self.mean,
+                'std': math.sqrt(self.variance) if self.variance is not None else None,
+                'p50': self.quantiles.quantile(0.5),
+                'p95': self.quantiles.quantile(0.95),
+                'p99': self.quantiles.quantile(0.99),
+            })
+        return summary
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'nulls': self.nulls,
+            'numeric_count': self.numeric_count,
+            'mean': self.mean,
+            'm2': self.m2,
+            'min': self.min,
+            'max': self.max,
+            'quantiles': self.quantiles.to_dict(),
+            'distinct': base64.b64encode(self.distinct.registers.tobytes()).decode('ascii'),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        profile = cls()
+        for key in ('count', 'nulls', 'numeric_count', 'mean', 'm2', 'min', 'max'):
+            setattr(profile, key, data[key])
+        profile.quantiles = QuantileSketch.from_dict(data['quantiles'])
+        registers = np.frombuffer(base64.b64decode(data['distinct']), dtype=np.uint8).copy()
+        profile.distinct = HyperLogLog(DISTINCT_PRECISION, registers)
+        return profile
+
+
+class DatasetProfile:
+    def __init__(self, columns=None, rows=0, partitions=(), profiled_at=None):
+        """Column profiles of a dataset, a partition, or a merge of partitions."""
+        self.columns = dict(columns or {})
+        self.rows = rows
+        self.partitions = list(partitions)
+        self.profiled_at = profiled_at
+
+    def update(self, chunk):
+        for column in chunk.columns:
+            if column not in self.columns:
+                self.columns[column] = ColumnProfile()
+                # Rows seen before the column appeared count as missing
+                self.columns[column].count = self.columns[column].nulls = self.rows
+            self.columns[column].update(chunk[column])
+        for column, profile in self.columns.items():
+            if column not in chunk.columns:
+                profile.count += len(chunk)
+                profile.nulls += len(chunk)
+        self.rows += len(chunk)
+        self.profiled_at = datetime.now().isoformat()
+
+    def merge(self, other):
+        for column in set(self.columns) | set(other.columns):
+            if column not in self.columns:
+                self.columns[column] = ColumnProfile()
+                self.columns[column].count = self.columns[column].nulls = self.rows
+            if column in other.columns:
+                self.columns[column].merge(other.columns[column])
+            else:
+                self.columns[column].count += other.rows
+                self.columns[column].nulls += other.rows
+        self.rows += other.rows
+        self.partitions.extend(p for p in other.partitions if p not in self.partitions)
+        self.profiled_at = max(filter(None, [self.profiled_at, other.profiled_at]), default=None)
+
+    def summary(self):
+        return {column: profile.summary() for column, profile in self.columns.items()}
+
+    def to_dict(self):
+        return {
+            'rows': self.rows,
+            'partitions': self.partitions,
+            'profiled_at': self.profiled_at,
+            'columns': {column: profile.to_dict() for column, profile in self.columns.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        columns = {column: ColumnProfile.from_dict(profile) for column, profile in data['columns'].items()}
+        return cls(columns, data['rows'], data['partitions'], data['profiled_at'])
+
+
+class ProfileStore:
+    def __init__(self, directory):
+        """Persisted per-partition profiles and their merged total.
+
+        Each partition's profile is one JSON file under ``partitions/``;
+        ``total.json`` is the merge of all of them. Partitions are
+        assumed immutable once profiled, so updating only reads new
+        partitions (and any listed in ``refresh``).
+        """
+        self.directory = directory
+        self._partition_dir = os.path.join(directory, 'partitions')
+        os.makedirs(self._partition_dir, exist_ok=True)
+
+    def partitions(self):
+        return sorted(
+            unquote(name[:-len(PROFILE_SUFFIX)])
+            for name in os.listdir(self._partition_dir) if name.endswith(PROFILE_SUFFIX)
+        )
+
+    def load(self, partition):
+        return self._read(self._partition_path(partition))
+
+    def save(self, partition, profile):
+        self._write(self._partition_path(partition), profile)
+
+    def total(self):
+        path = os.path.join(self.directory, TOTAL_FILE)
+        return self._read(path) if os.path.exists(path) else None
+
+    def update(self, partitions, read_partition, refresh=()):
+        """Profile partitions without a stored profile and merge them into the total.
+
+        Args:
+            partitions: Partition identifiers that should be profiled
+            read_partition: Callable returning an iterable of DataFrame chunks for a partition
+            refresh: Partitions to re-profile even if a profile is stored
+
+        Returns:
+            DatasetProfile: the total over all stored partitions
+        """
+        stored = set(self.partitions())
+        new = [p for p in partitions if p not in stored or p in refresh]
+        new_profiles = []
+        for partition in new:
+            profile = DatasetProfile(partitions=[partition])
+            for chunk in read_partition(partition):
+                profile.update(chunk)
+            self.save(partition, profile)
+            new_profiles.append(profile)
+
+        total = self.total()
+        if total is not None and set(total.partitions) == stored | set(new) and not new_profiles:
+            return total
+        if total is not None and set(total.partitions) == stored and not stored & set(new):
+            for profile in new_profiles:
+                total.merge(profile)
+        else:
+            # A partition was replaced, or the total is out of step: re-merge stored profiles
+            total = DatasetProfile()
+            for partition in self.partitions():
+                total.merge(self.load(partition))
+        self._write(os.path.join(self.directory, TOTAL_FILE), total)
+        return total
+
+    def _partition_path(self, partition):
+        return os.path.join(self._partition_dir, quote(str(partition), safe='') + PROFILE_SUFFIX)
+
+    @staticmethod
+    def _read(path):
+        with open(path) as f:
+            return DatasetProfile.from_dict(json.load(f))
+
+    @staticmethod
+    def _write(path, profile):
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(profile.to_dict(), f)
+        os.replace(tmp_path, path)
@@ -3,11 +3,22 @@ import pandas as pd
 from datetime import datetime
 import logging
 from typing import Dict, List, Any, Optional
+from catalog_index import CatalogIndex, WriteBehindWriter
+from catalog_search import CatalogSearchIndex
 
 class DataCatalog:
-    def __init__(self):
+    def __init__(self, flush_interval: float = 5.0, max_pending_writes: int = 500):
+        """Catalog served from an in-memory index.
+
+        The catalog dataset is read once at startup; updates are written
+        back in coalesced batches (see WriteBehindWriter). Call ``flush``
+        to force a write, or ``close`` when done.
+        """
         self.logger = logging.getLogger(__name__)
         self.catalog_store = dataiku.Dataset("data_catalog")
+        self.index = CatalogIndex.from_dataframe(self.catalog_store.get_dataframe())
+        self.search_index = CatalogSearchIndex(self.index.entries())
+        self.writer = WriteBehindWriter(self.catalog_store, self.index, flush_interval, max_pending_writes)
         
     def register_dataset(self, dataset_name: str, description: str, 
                         owner: str, tags: List[str], schema: Dict[str, Any],
@@ -45,53 +56,38 @@ class DataCatalog:
         return self._get_dataset_entry(dataset_name)
     
     def search_datasets(self, query: str, tags: List[str] = None,
-                       sensitivity_level: str = None) -> List[Dict[str, Any]]:
-        """Search for datasets based on various criteria"""
-        df = self.catalog_store.get_dataframe()
-        
-        # Apply filters
-        if tags:
-            df = df[df['tags'].apply(lambda x: all(tag in x for tag in tags))]
-        if sensitivity_level:
-            df = df[df['sensitivity_level'] == sensitivity_level]
-        
-        # Text search
-        if query:
-            mask = (
-                df['dataset_name'].str.contains(query, case=False) |
-                df['description'].str.contains(query, case=False)
-            )
-            df = df[mask]
+                       sensitivity_level: str = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Search for datasets based on various criteria
         
-        return df.to_dict('records')
+        Matches names, descriptions and schema column names, best match
+        first (BM25); the last query word also matches as a prefix.
+        """
+        results = self.search_index.search(query, tags, sensitivity_level, limit)
+        return [self.index.get(dataset_name) for dataset_name, _ in results]
     
     def get_dataset_schema(self, dataset_name: str) -> Optional[Dict[str, Any]]:
         """Get the schema for a specific dataset"""
         entry = self._get_dataset_entry(dataset_name)
         return entry.get('schema') if entry else None
     
+    def flush(self):
+        """Write pending catalog updates now"""
+        self.writer.flush()
+    
+    def close(self):
+        """Write pending catalog updates and stop the background writer"""
+        self.writer.close()
+    
     def _get_dataset_entry(self, dataset_name: str) -> Optional[Dict[str, Any]]:
         """Get a single dataset entry from the catalog"""
-        df = self.catalog_store.get_dataframe()
-        matches = df[df['dataset_name'] == dataset_name]
-        return matches.iloc[0].to_dict() if not matches.empty else None
+        return self.index.get(dataset_name)
     
     def _save_catalog_entry(self, entry: Dict[str, Any]):
-        """Save or update a catalog entry"""
+        """Save or update a catalog entry; persisted by the write-behind writer"""
         try:
-            current_data = self.catalog_store.get_dataframe()
-            
-            # Check if entry exists
-            mask = current_data['dataset_name'] == entry['dataset_name']
-            if mask.any():
-                # Update existing entry
-                current_data.loc[mask] = pd.Series(entry)
-            else:
-                # Add new entry
-                new_entry = pd.DataFrame([entry])
-                current_data = pd.concat([current_data, new_entry], ignore_index=True)
-            
-            self.catalog_store.write_with_schema(current_data)
+            self.index.upsert(entry)
+            self.search_index.add(self.index.get(entry['dataset_name']))
+            self.writer.mark_dirty()
         except Exception as e:
             self.logger.error(f"Error saving catalog entry: {str(e)}")
             raise
@@ -137,6 +133,8 @@ def main():
     
     logging.info(f"Search results: {results}")
     logging.info(f"Schema: {schema}")
+    
+    catalog.close()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
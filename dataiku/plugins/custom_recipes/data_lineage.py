@@ -1,13 +1,31 @@
 import dataiku
 import json
+import pandas as pd
 from datetime import datetime
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
+from lineage_graph import LineageGraph
+from lineage_log import LineageLog
 
 class DataLineageTracker:
-    def __init__(self):
+    def __init__(self, log_dir: Optional[str] = None):
+        """Track lineage in an append-only log.
+        
+        New records are appended to a segmented log (by default in the
+        "lineage_log" managed folder) instead of rewriting the data_lineage
+        dataset on every event. The log is the source of truth: the
+        dataset seeds it once, when the log is still empty, and is then an
+        export of the log that ``compact()`` and ``export()`` rewrite for
+        downstream Flow consumers.
+        """
         self.logger = logging.getLogger(__name__)
         self.lineage_store = dataiku.Dataset("data_lineage")
+        self.log = LineageLog(log_dir or dataiku.Folder("lineage_log").get_path())
+        # Lineage recorded before the log existed
+        self.log.seed(lambda: self.lineage_store.get_dataframe().to_dict('records'))
+        self.graph = LineageGraph()
+        self._log_position = 0
+        self.refresh()
         
     def track_dataset_creation(self, dataset_name: str, source_datasets: List[str], 
                              transformation_type: str, parameters: Dict[str, Any]):
@@ -37,40 +55,71 @@ class DataLineageTracker:
         self._save_lineage_record(modification_record)
         return modification_record
     
+    def track_many(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Record several lineage records in a single append
+        
+        Records without a timestamp are stamped with the current time.
+        """
+        now = datetime.now().isoformat()
+        records = [{**record, 'timestamp': record.get('timestamp', now)} for record in records]
+        self._save_lineage_records(records)
+        return records
+    
+    def refresh(self):
+        """Index records appended since the last read, including other recipes' records"""
+        records, self._log_position = self.log.read(self._log_position)
+        self.graph.add_records(records)
+    
+    def compact(self) -> bool:
+        """Merge sealed log segments and export the log to the data_lineage dataset"""
+        compacted = self.log.compact()
+        self.export()
+        return compacted
+    
+    def export(self) -> int:
+        """Rewrite the data_lineage dataset with every record in the log"""
+        records, _ = self.log.read()
+        self.lineage_store.write_with_schema(pd.DataFrame(records))
+        return len(records)
+    
     def get_dataset_lineage(self, dataset_name: str) -> List[Dict[str, Any]]:
         """Retrieve the lineage history for a dataset"""
-        df = self.lineage_store.get_dataframe()
-        return df[df['dataset_name'] == dataset_name].to_dict('records')
+        self.refresh()
+        return self.graph.records(dataset_name)
     
-    def get_upstream_dependencies(self, dataset_name: str) -> List[str]:
-        """Get all upstream dependencies for a dataset"""
-        lineage = self.get_dataset_lineage(dataset_name)
-        dependencies = set()
-        
-        for record in lineage:
-            if 'source_datasets' in record:
-                dependencies.update(record['source_datasets'])
-        
-        return list(dependencies)
+    def get_upstream_dependencies(self, dataset_name: str, transitive: bool = False) -> List[str]:
+        """Get upstream dependencies for a dataset (direct sources unless transitive)"""
+        self.refresh()
+        if transitive:
+            return list(self.graph.upstream(dataset_name))
+        return list(self.graph.parents(dataset_name))
     
-    def get_downstream_dependencies(self, dataset_name: str) -> List[str]:
-        """Get all downstream dependencies for a dataset"""
-        df = self.lineage_store.get_dataframe()
-        downstream = set()
-        
-        for _, row in df.iterrows():
-            if 'source_datasets' in row and dataset_name in row['source_datasets']:
-                downstream.add(row['dataset_name'])
-        
-        return list(downstream)
+    def get_downstream_dependencies(self, dataset_name: str, transitive: bool = False) -> List[str]:
+        """Get downstream dependencies for a dataset (direct dependents unless transitive)"""
+        self.refresh()
+        if transitive:
+            return list(self.graph.downstream(dataset_name))
+        return list(self.graph.children(dataset_name))
+    
+    def get_impact_analysis(self, dataset_name: str) -> List[Tuple[str, int]]:
+        """Datasets affected by a change to a dataset, with their distance in hops"""
+        self.refresh()
+        return self.graph.impact(dataset_name)
+    
+    def get_lineage_path(self, source_dataset: str, dataset_name: str) -> Optional[List[str]]:
+        """Shortest derivation chain from a source to a dataset, if any"""
+        self.refresh()
+        return self.graph.shortest_path(source_dataset, dataset_name)
     
     def _save_lineage_record(self, record: Dict[str, Any]):
         """Save a lineage record to the lineage store"""
+        self._save_lineage_records([record])
+    
+    def _save_lineage_records(self, records: List[Dict[str, Any]]):
+        """Append lineage records to the log and index them"""
         try:
-            current_data = self.lineage_store.get_dataframe()
-            new_record = pd.DataFrame([record])
-            updated_data = pd.concat([current_data, new_record], ignore_index=True)
-            self.lineage_store.write_with_schema(updated_data)
+            self.log.append_many(records)
+            self.refresh()
         except Exception as e:
             self.logger.error(f"Error saving lineage record: {str(e)}")
             raise
@@ -100,14 +149,19 @@ def main():
         }
     )
     
+    # Keep the data_lineage dataset current for downstream Flow consumers
+    lineage_tracker.compact()
+    
     # Get lineage information
     lineage = lineage_tracker.get_dataset_lineage("processed_transactions")
     upstream = lineage_tracker.get_upstream_dependencies("processed_transactions")
     downstream = lineage_tracker.get_downstream_dependencies("processed_transactions")
+    impact = lineage_tracker.get_impact_analysis("raw_transactions")
     
     logging.info(f"Lineage: {lineage}")
     logging.info(f"Upstream dependencies: {upstream}")
     logging.info(f"Downstream dependencies: {downstream}")
+    logging.info(f"Impact of raw_transactions: {impact}")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,87 +1,114 @@
 import dataiku
 import pandas as pd
 import numpy as np
+import os
+import re
 from datetime import datetime
 import logging
+from quality_engine import (
+    DEFAULT_CHUNK_SIZE, AccuracyCheck, CompletenessCheck, ConsistencyCheck, FreshnessCheck, QualityCheckPlan
+)
+from reference_index import load_or_build_reference_index
+from column_profiles import ProfileStore
 
 class DataQualityCheck:
-    def __init__(self, dataset_name):
+    def __init__(self, dataset_name, chunksize=DEFAULT_CHUNK_SIZE, reference_cache_dir=None,
+                 reference_max_age_hours=24):
+        """
+        Args:
+            dataset_name: Dataset to check
+            chunksize: Rows read at a time (None reads the dataset in one piece)
+            reference_cache_dir: Where reference indexes are cached
+                (default: the "reference_indexes" managed folder)
+            reference_max_age_hours: Rebuild cached reference indexes older than this
+        """
+        self.dataset_name = dataset_name
         self.dataset = dataiku.Dataset(dataset_name)
+        self.chunksize = chunksize
+        self.reference_cache_dir = reference_cache_dir
+        self.reference_max_age_hours = reference_max_age_hours
         self.logger = logging.getLogger(__name__)
         
     def check_completeness(self, threshold=0.95):
         """Check for missing values in the dataset"""
-        df = self.dataset.get_dataframe()
-        completeness = {}
-        
-        for column in df.columns:
-            missing_ratio = df[column].isnull().mean()
-            completeness[column] = {
-                'missing_ratio': missing_ratio,
-                'status': 'PASS' if missing_ratio < (1 - threshold) else 'FAIL'
-            }
-        
-        return completeness
+        return self._run(CompletenessCheck(threshold))['completeness']
     
     def check_consistency(self, rules):
         """Check data consistency based on defined rules"""
-        df = self.dataset.get_dataframe()
-        consistency = {}
-        
-        for rule in rules:
-            column = rule['column']
-            condition = rule['condition']
-            result = eval(f"df['{column}'].{condition}")
-            consistency[column] = {
-                'violations': (~result).sum(),
-                'status': 'PASS' if (~result).sum() == 0 else 'FAIL'
-            }
-        
-        return consistency
+        return self._run(ConsistencyCheck(rules))['consistency']
     
     def check_accuracy(self, reference_data, key_columns):
         """Check data accuracy against reference data"""
-        df = self.dataset.get_dataframe()
-        ref_df = reference_data.get_dataframe()
-        
-        accuracy = {}
-        for column in key_columns:
-            matches = df[column].isin(ref_df[column]).mean()
-            accuracy[column] = {
-                'match_ratio': matches,
-                'status': 'PASS' if matches > 0.95 else 'FAIL'
-            }
-        
-        return accuracy
+        return self._run(self._accuracy_check(reference_data, key_columns))['accuracy']
     
     def check_freshness(self, timestamp_column, max_age_hours=24):
         """Check data freshness based on timestamp"""
-        df = self.dataset.get_dataframe()
-        current_time = datetime.now()
-        
-        if timestamp_column in df.columns:
-            latest_timestamp = pd.to_datetime(df[timestamp_column]).max()
-            age_hours = (current_time - latest_timestamp).total_seconds() / 3600
-            
-            return {
-                'age_hours': age_hours,
-                'status': 'PASS' if age_hours <= max_age_hours else 'FAIL'
-            }
-        
-        return {'status': 'ERROR', 'message': 'Timestamp column not found'}
+        return self._run(FreshnessCheck(timestamp_column, max_age_hours))['freshness']
     
-    def run_all_checks(self, rules, reference_data=None, key_columns=None):
-        """Run all data quality checks"""
-        results = {
-            'completeness': self.check_completeness(),
-            'consistency': self.check_consistency(rules),
-            'timestamp': datetime.now().isoformat()
-        }
-        
+    def run_all_checks(self, rules, reference_data=None, key_columns=None, timestamp_column=None):
+        """Run all data quality checks in a single scan of the dataset"""
+        plan = QualityCheckPlan([CompletenessCheck(), ConsistencyCheck(rules)])
         if reference_data and key_columns:
-            results['accuracy'] = self.check_accuracy(reference_data, key_columns)
+            plan.add(self._accuracy_check(reference_data, key_columns))
+        if timestamp_column:
+            plan.add(FreshnessCheck(timestamp_column))
         
+        results = plan.run(self._chunks())
+        results['timestamp'] = datetime.now().isoformat()
         return results
+    
+    def profile_partitions(self, profile_dir=None, partitions=None, refresh=()):
+        """Profile partitions not profiled yet and merge them into the dataset totals
+        
+        Args:
+            profile_dir: Where profiles are kept (default: a directory named after
+                the dataset in the "quality_profiles" managed folder)
+            partitions: Partitions to cover (default: all partitions of the dataset)
+            refresh: Partitions to re-profile even if already profiled
+        
+        Returns:
+            DatasetProfile: merged profile of all profiled partitions
+        """
+        if profile_dir is None:
+            profile_dir = os.path.join(dataiku.Folder("quality_profiles").get_path(), self.dataset_name)
+        if partitions is None:
+            # Unpartitioned datasets have no partitions; profile them whole, every time
+            partitions = self.dataset.list_partitions() or ['NP']
+            if partitions == ['NP']:
+                refresh = ['NP']
+        
+        def read_partition(partition):
+            dataset = dataiku.Dataset(self.dataset_name)
+            if partition != 'NP':
+                dataset.add_read_partitions(partition)
+            return self._chunks(dataset)
+        
+        total = ProfileStore(profile_dir).update(partitions, read_partition, refresh=refresh)
+        self.logger.info(f"Profiled {self.dataset_name}: {len(total.partitions)} partitions, {total.rows} rows")
+        return total
+    
+    def _run(self, check):
+        return QualityCheckPlan([check]).run(self._chunks())
+    
+    def _chunks(self, dataset=None, columns=None):
+        """Stream the dataset in bounded chunks"""
+        dataset = dataset or self.dataset
+        if self.chunksize is None:
+            return [dataset.get_dataframe(columns=columns)]
+        return dataset.iter_dataframes(chunksize=self.chunksize, columns=columns)
+    
+    def _accuracy_check(self, reference_data, key_columns):
+        """Accuracy against a reference index built once and cached on disk"""
+        key_columns = list(key_columns)
+        cache_dir = self.reference_cache_dir or dataiku.Folder("reference_indexes").get_path()
+        cache_name = re.sub(r'[^\w.-]', '_', '__'.join([reference_data.name] + key_columns))
+        index = load_or_build_reference_index(
+            os.path.join(cache_dir, f"{cache_name}.npz"),
+            lambda: self._chunks(reference_data, key_columns),
+            key_columns,
+            max_age_hours=self.reference_max_age_hours
+        )
+        return AccuracyCheck(index)
 
 def main():
     # Example usage
@@ -0,0 +1,108 @@
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from drift_sketches import DEFAULT_PSI_BINS, ks_pvalue, population_stability_index
+
+# Below this many features the thread pool costs more than it saves
+PARALLEL_MIN_FEATURES = 32
+
+
+class _SortedReference:
+    """A reference sample sorted once, with everything derived from it cached."""
+
+    def __init__(self, values, psi_bins):
+        values = np.asarray(values, dtype=np.float64)
+        self.values = np.sort(values[~np.isnan(values)])
+        self.n = len(self.values)
+        # Reference CDF at its own points never changes, so compute it once
+        self.cdf = np.searchsorted(self.values, self.values, side='right') / self.n
+        # Equal-mass PSI bins taken straight from the sorted sample
+        self.psi_edges = np.unique(self.values[(np.arange(1, psi_bins) * self.n) // psi_bins])
+        self.psi_proportions = np.diff(
+            np.concatenate([[0], np.searchsorted(self.values, self.psi_edges, side='right'), [self.n]])
+        ) / self.n
+
+
+class BatchDriftEngine:
+    def __init__(self, reference, n_jobs=None, psi_bins=DEFAULT_PSI_BINS):
+        """Exact two-sample KS and PSI against presorted reference samples.
+
+        Args:
+            reference: DataFrame or mapping of feature name to raw training values
+            n_jobs: Worker threads used for wide frames (None runs serially)
+            psi_bins: Number of equal-mass bins used for PSI
+        """
+        self.n_jobs = n_jobs
+        self.references = {}
+        items = reference.items() if isinstance(reference, dict) else (
+            (column, reference[column].to_numpy(dtype=np.float64))
+            for column in reference.select_dtypes(include=[np.number, 'bool']).columns
+        )
+        for feature, values in items:
+            ref = _SortedReference(values, psi_bins)
+            if ref.n:
+                self.references[feature] = ref
+
+    def __contains__(self, feature):
+        return feature in self.references
+
+    def compute(self, X, features=None):
+        """Compute drift statistics for every referenced feature of ``X``.
+
+        The current frame is sorted in a single NumPy call; each
+        feature then only needs ``searchsorted`` against its presorted
+        reference, so nothing from the training side is re-sorted.
+
+        Returns:
+            dict: feature -> ``ks_statistic``, ``p_value`` and ``psi``
+        """
+        if features is None:
+            features = [column for column in X.columns if column in self.references]
+        if not features:
+            return {}
+
+        # One row per feature keeps every sorted sample contiguous in memory
+        current = np.sort(X[features].to_numpy(dtype=np.float64).T, axis=1)
+        # np.sort puts NaNs last, so each row's valid prefix length is its count
+        valid = (~np.isnan(current)).sum(axis=1)
+
+        tasks = [(feature, current[i, :valid[i]]) for i, feature in enumerate(features)]
+        if self.n_jobs and self.n_jobs > 1 and len(tasks) >= PARALLEL_MIN_FEATURES:
+            with ThreadPoolExecutor(max_workers=self.n_jobs) as pool:
+                stats = list(pool.map(lambda task: self._ks_and_psi(*task), tasks))
+        else:
+            stats = [self._ks_and_psi(*task) for task in tasks]
+
+        ks_stats = np.array([ks for ks, _, _ in stats])
+        n_ref = np.array([self.references[feature].n for feature in features], dtype=np.float64)
+        n_cur = np.array([m for _, _, m in stats], dtype=np.float64)
+        p_values = ks_pvalue(ks_stats, n_ref, np.maximum(n_cur, 1))
+
+        return {
+            feature: {
+                'ks_statistic': float(ks_stats[i]),
+                'p_value': float(p_values[i]),
+                'psi': stats[i][1]
+            }
+            for i, feature in enumerate(features)
+        }
+
+    def _ks_and_psi(self, feature, current):
+        ref = self.references[feature]
+        m = len(current)
+        if m == 0:
+            return 0.0, 0.0, 0
+
+        # The empirical CDFs only change at observed points, so the supremum
+        # is reached at a point of one of the two samples.
+        cur_cdf_at_cur = np.searchsorted(current, current, side='right') / m
+        ref_cdf_at_cur = np.searchsorted(ref.values, current, side='right') / ref.n
+        cur_cdf_at_ref = np.searchsorted(current, ref.values, side='right') / m
+        ks_stat = max(
+            np.max(np.abs(cur_cdf_at_cur - ref_cdf_at_cur)),
+            np.max(np.abs(cur_cdf_at_ref - ref.cdf))
+        )
+
+        cur_counts = np.diff(np.concatenate([[0], np.searchsorted(current, ref.psi_edges, side='right'), [m]]))
+        psi = population_stability_index(ref.psi_proportions, cur_counts / m)
+
+        return float(ks_stat), psi, m
@@ -0,0 +1,158 @@
+import numpy as np
+from scipy import stats
+
+# Number of quantile bins kept per feature in the reference sketch
+DEFAULT_N_BINS = 64
+
+# PSI and JS are computed on this many equal-mass groups of sketch bins;
+# finer bins make both statistics noisy for small production samples
+DEFAULT_PSI_BINS = 10
+
+# Floor applied to bin proportions so PSI/JS stay finite for empty bins
+_EPSILON = 1e-6
+
+
+class FeatureSketch:
+    """Fixed-bin histogram summarising one feature's training distribution.
+
+    Bin edges are taken from the training quantiles, so every bin holds
+    roughly the same share of the reference mass. Duplicate edges are
+    collapsed, which keeps discrete features (flags, counts) in exact
+    per-value bins. The outermost bins are open-ended so production values
+    outside the training range are still counted.
+    """
+
+    def __init__(self, edges, counts):
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        if len(self.counts) != len(self.edges) + 1:
+            raise ValueError("A sketch needs exactly len(edges) + 1 bin counts")
+
+    @classmethod
+    def from_values(cls, values, n_bins=DEFAULT_N_BINS):
+        """Build a sketch from raw training values, ignoring NaNs."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            raise ValueError("Cannot build a sketch from an empty sample")
+
+        quantiles = np.linspace(0, 1, n_bins + 1)[1:-1]
+        edges = np.unique(np.quantile(values, quantiles))
+        # Always split at the minimum so the lowest value gets its own
+        # closed bin rather than sharing the open (-inf, ...) bin.
+        edges = np.unique(np.concatenate([[values.min()], edges]))
+        sketch = cls(edges, np.zeros(len(edges) + 1, dtype=np.int64))
+        sketch.counts = sketch.bin_counts(values)
+        return sketch
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def bin_counts(self, values):
+        """Count values into this sketch's bins (O(m log bins))."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        idx = np.searchsorted(self.edges, values, side='right')
+        return np.bincount(idx, minlength=len(self.edges) + 1).astype(np.int64)
+
+    def compare(self, values, psi_bins=DEFAULT_PSI_BINS):
+        """Compare a production sample against the sketch.
+
+        Returns the approximate KS statistic and p-value evaluated at the
+        bin edges, the population stability index and the Jensen-Shannon
+        divergence (base 2). Everything after binning is O(bins).
+        """
+        current = self.bin_counts(values)
+        return compare_histograms(self.counts, current, psi_bins=psi_bins)
+
+
+def compare_histograms(reference_counts, current_counts, psi_bins=DEFAULT_PSI_BINS):
+    """Drift statistics between two histograms sharing the same bins."""
+    reference_counts = np.asarray(reference_counts, dtype=np.float64)
+    current_counts = np.asarray(current_counts, dtype=np.float64)
+    n_ref = reference_counts.sum()
+    n_cur = current_counts.sum()
+    if n_ref == 0 or n_cur == 0:
+        return {
+            'ks_statistic': 0.0,
+            'p_value': 1.0,
+            'psi': 0.0,
+            'js_divergence': 0.0
+        }
+
+    ref_cdf = np.cumsum(reference_counts) / n_ref
+    cur_cdf = np.cumsum(current_counts) / n_cur
+    ks_stat = float(np.max(np.abs(ref_cdf - cur_cdf)))
+
+    if psi_bins and len(reference_counts) > psi_bins:
+        reference_counts, current_counts = _merge_bins(reference_counts, current_counts, psi_bins)
+    ref_p = np.clip(reference_counts / n_ref, _EPSILON, None)
+    cur_p = np.clip(current_counts / n_cur, _EPSILON, None)
+    psi = population_stability_index(ref_p, cur_p)
+
+    mid = 0.5 * (ref_p + cur_p)
+    js = 0.5 * np.sum(ref_p * np.log2(ref_p / mid)) + 0.5 * np.sum(cur_p * np.log2(cur_p / mid))
+
+    return {
+        'ks_statistic': ks_stat,
+        'p_value': ks_pvalue(ks_stat, n_ref, n_cur),
+        'psi': psi,
+        'js_divergence': float(max(js, 0.0))
+    }
+
+
+def population_stability_index(reference_proportions, current_proportions):
+    """PSI between two binned distributions given as proportions."""
+    ref_p = np.clip(reference_proportions, _EPSILON, None)
+    cur_p = np.clip(current_proportions, _EPSILON, None)
+    return float(np.sum((cur_p - ref_p) * np.log(cur_p / ref_p)))
+
+
+def _merge_bins(reference_counts, current_counts, n_groups):
+    """Merge adjacent bins into ``n_groups`` of roughly equal reference mass."""
+    ref_cdf = np.cumsum(reference_counts) / reference_counts.sum()
+    cuts = np.searchsorted(ref_cdf, np.linspace(0, 1, n_groups + 1)[1:-1], side='left') + 1
+    starts = np.unique(np.concatenate([[0], cuts[cuts < len(reference_counts)]]))
+    return np.add.reduceat(reference_counts, starts), np.add.reduceat(current_counts, starts)
+
+
+def ks_pvalue(ks_stat, n_ref, n_cur):
+    """Asymptotic two-sample KS p-value (Kolmogorov distribution).
+
+    Accepts scalars or arrays of statistics.
+    """
+    en = np.sqrt(n_ref * n_cur / (n_ref + n_cur))
+    p_value = stats.kstwobign.sf(np.asarray(ks_stat) * en)
+    return float(p_value) if np.ndim(p_value) == 0 else p_value
+
+
+def build_feature_sketches(X, n_bins=DEFAULT_N_BINS):
+    """Build a sketch for every numeric column of a training frame."""
+    sketches = {}
+    for feature in X.select_dtypes(include=[np.number, 'bool']).columns:
+        values = X[feature].to_numpy(dtype=np.float64)
+        if np.isnan(values).all():
+            continue
+        sketches[feature] = FeatureSketch.from_values(values, n_bins=n_bins)
+    return sketches
+
+
+def save_sketches(sketches, path):
+    """Write sketches to a compressed ``.npz`` sidecar file."""
+    arrays = {'features': np.array(list(sketches.keys()), dtype=str)}
+    for i, sketch in enumerate(sketches.values()):
+        arrays[f'edges_{i}'] = sketch.edges
+        arrays[f'counts_{i}'] = sketch.counts
+    # Pass a file handle so numpy does not append a second ".npz" suffix
+    with open(path, 'wb') as f:
+        np.savez_compressed(f, **arrays)
+
+
+def load_sketches(path):
+    """Load sketches written by :func:`save_sketches`."""
+    with np.load(path, allow_pickle=False) as data:
+        return {
+            str(feature): FeatureSketch(data[f'edges_{i}'], data[f'counts_{i}'])
+            for i, feature in enumerate(data['features'])
+        }
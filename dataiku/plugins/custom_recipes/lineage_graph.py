@@ -0,0 +1,156 @@
+import ast
+import json
+import threading
+from collections import defaultdict, deque
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+def _as_list(value) -> List[Any]:
+    """Source lists read back from a dataset may be serialized."""
+    if isinstance(value, (list, tuple, set)):
+        return list(value)
+    if isinstance(value, str):
+        for parse in (json.loads, ast.literal_eval):
+            try:
+                parsed = parse(value)
+            except (ValueError, SyntaxError):
+                continue
+            if isinstance(parsed, (list, tuple)):
+                return list(parsed)
+        return [value] if value else []
+    return []
+
+
+class LineageGraph:
+    def __init__(self, records: Iterable[Dict[str, Any]] = ()):
+        """Adjacency-indexed dataset lineage.
+
+        Keeps forward (source -> derived) and reverse edges plus each
+        dataset's lineage records. Traversals only visit the part of the
+        graph in their answer. Transitive closures are memoized; a new
+        edge only evicts the closures it can change: upstream sets of the
+        derived dataset and its descendants, downstream sets of the source
+        and its ancestors.
+        """
+        self._parents: Dict[str, Set[str]] = defaultdict(set)
+        self._children: Dict[str, Set[str]] = defaultdict(set)
+        self._records: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._upstream_cache: Dict[str, frozenset] = {}
+        self._downstream_cache: Dict[str, frozenset] = {}
+        self._lock = threading.RLock()
+        self.add_records(records)
+
+    def __contains__(self, dataset_name: str) -> bool:
+        return dataset_name in self._records or dataset_name in self._children
+
+    def add_records(self, records: Iterable[Dict[str, Any]]):
+        for record in records:
+            self.add_record(record)
+
+    def add_record(self, record: Dict[str, Any]):
+        """Index a lineage record, adding an edge from each of its sources."""
+        dataset_name = record['dataset_name']
+        with self._lock:
+            self._records[dataset_name].append(record)
+            for source in _as_list(record.get('source_datasets')):
+                self.add_edge(source, dataset_name)
+
+    def add_edge(self, source: str, dataset_name: str):
+        with self._lock:
+            if source in self._parents[dataset_name]:
+                return
+            # Closures that can change; computed before the edge exists
+            stale_upstream = {dataset_name} | (
+                self._downstream_cache.get(dataset_name) or self._reachable(dataset_name, self._children)
+            )
+            stale_downstream = {source} | (
+                self._upstream_cache.get(source) or self._reachable(source, self._parents)
+            )
+
+            self._parents[dataset_name].add(source)
+            self._children[source].add(dataset_name)
+            for name in stale_upstream:
+                self._upstream_cache.pop(name, None)
+            for name in stale_downstream:
+                self._downstream_cache.pop(name, None)
+
+    def records(self, dataset_name: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._records.get(dataset_name, []))
+
+    def parents(self, dataset_name: str) -> Set[str]:
+        with self._lock:
+            return set(self._parents.get(dataset_name, ()))
+
+    def children(self, dataset_name: str) -> Set[str]:
+        with self._lock:
+            return set(self._children.get(dataset_name, ()))
+
+    def upstream(self, dataset_name: str) -> frozenset:
+        """All datasets ``dataset_name`` is transitively derived from."""
+        with self._lock:
+            cached = self._upstream_cache.get(dataset_name)
+            if cached is None:
+                cached = self._upstream_cache[dataset_name] = frozenset(self._reachable(dataset_name, self._parents))
+            return cached
+
+    def downstream(self, dataset_name: str) -> frozenset:
+        """All datasets transitively derived from ``dataset_name``."""
+        with self._lock:
+            cached = self._downstream_cache.get(dataset_name)
+            if cached is None:
+                cached = self._downstream_cache[dataset_name] = frozenset(
+                    self._reachable(dataset_name, self._children)
+                )
+            return cached
+
+    def impact(self, dataset_name: str) -> List[Tuple[str, int]]:
+        """Downstream datasets with their distance in hops, nearest first."""
+        with self._lock:
+            return sorted(self._distances(dataset_name, self._children).items(), key=lambda item: (item[1], item[0]))
+
+    def shortest_path(self, source: str, target: str) -> Optional[List[str]]:
+        """Shortest derivation chain from ``source`` to ``target``, or None."""
+        with self._lock:
+            if source == target:
+                return [source]
+            previous = {source: None}
+            queue = deque([source])
+            while queue:
+                node = queue.popleft()
+                for child in self._children.get(node, ()):
+                    if child in previous:
+                        continue
+                    previous[child] = node
+                    if child == target:
+                        path = [child]
+                        while previous[path[-1]] is not None:
+                            path.append(previous[path[-1]])
+                        return path[::-1]
+                    queue.append(child)
+            return None
+
+    @staticmethod
+    def _reachable(start: str, edges: Dict[str, Set[str]]) -> Set[str]:
+        seen = set()
+        stack = [start]
+        while stack:
+            for neighbour in edges.get(stack.pop(), ()):
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    stack.append(neighbour)
+        seen.discard(start)
+        return seen
+
+    @staticmethod
+    def _distances(start: str, edges: Dict[str, Set[str]]) -> Dict[str, int]:
+        distances = {start: 0}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            for neighbour in edges.get(node, ()):
+                if neighbour not in distances:
+                    distances[neighbour] = distances[node] + 1
+                    queue.append(neighbour)
+        del distances[start]
+        return distances
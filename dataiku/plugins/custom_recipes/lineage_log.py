@@ -0,0 +1,165 @@
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are serialized
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = '.jsonl'
+DEFAULT_SEGMENT_BYTES = 16 * 1024 * 1024
+DEFAULT_COMPACT_MIN_SEGMENTS = 8
+
+
+class LineageLog:
+    def __init__(self, directory: str, segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+                 compact_min_segments: int = DEFAULT_COMPACT_MIN_SEGMENTS):
+        """Append-only, segmented JSON-lines log of lineage records.
+
+        The log is one logical byte stream split into segment files named
+        after their starting offset. Appends write whole lines to the last
+        segment under an exclusive file lock, so concurrent recipes (threads
+        or processes) never interleave or overwrite each other's records.
+        A segment is sealed once it reaches ``segment_bytes`` and the next
+        one starts where it ends.
+
+        Compaction concatenates sealed segments byte for byte into the
+        first of them. Offsets in the logical stream never change, so a
+        reader's position stays valid across compactions.
+        """
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.compact_min_segments = compact_min_segments
+        os.makedirs(directory, exist_ok=True)
+        self._lock_path = os.path.join(directory, '.lock')
+        self._thread_lock = threading.Lock()
+        self._active = None
+
+    def append(self, record: Dict[str, Any]) -> None:
+        self.append_many([record])
+
+    def append_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Append records in a single write; returns the number appended."""
+        with self._exclusive():
+            return self._write(records)
+
+    def seed(self, load_records: Callable[[], Iterable[Dict[str, Any]]]) -> int:
+        """Write ``load_records()`` as the start of the log if it is still empty.
+
+        Checked and written under the log lock, so concurrent recipes seed
+        it once; returns the number of records written.
+        """
+        with self._exclusive():
+            if any(os.path.getsize(path) for _, path in self._segments()):
+                return 0
+            return self._write(load_records())
+
+    def read(self, position: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """Records appended at or after ``position`` in the logical stream.
+
+        Returns:
+            The records and the position just after the last complete one
+        """
+        records = []
+        segments = self._segments()
+        for i, (start, path) in enumerate(segments):
+            end = segments[i + 1][0] if i + 1 < len(segments) else None
+            if end is not None and end <= position:
+                continue
+            try:
+                with open(path, 'rb') as file:
+                    file.seek(max(position - start, 0))
+                    while end is None or start + file.tell() < end:
+                        line = file.readline()
+                        if not line.endswith(b'\n'):
+                            # End of segment, or a partial line of an in-progress write
+                            break
+                        records.append(json.loads(line))
+                        position = start + file.tell()
+            except FileNotFoundError:
+                # Merged away by a concurrent compaction; re-read from there
+                more, position = self.read(position)
+                records.extend(more)
+                break
+        return records, position
+
+    def compact(self) -> bool:
+        """Merge sealed segments into one file; returns whether anything was merged."""
+        with self._exclusive():
+            sealed = self._segments()[:-1]
+            if len(sealed) < max(self.compact_min_segments, 2):
+                return False
+            first_path = sealed[0][1]
+            tmp_path = first_path + '.compacting'
+            with open(tmp_path, 'wb') as out:
+                for _, path in sealed:
+                    with open(path, 'rb') as segment:
+                        while True:
+                            chunk = segment.read(1024 * 1024)
+                            if not chunk:
+                                break
+                            out.write(chunk)
+                out.flush()
+                os.fsync(out.fileno())
+            # The merged file takes the first segment's name, so every offset keeps its meaning
+            os.replace(tmp_path, first_path)
+            for _, path in sealed[1:]:
+                os.remove(path)
+            logger.info(f"Compacted {len(sealed)} lineage log segments")
+            return True
+
+    def _write(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Append records to the active segment (lock held)."""
+        lines = [json.dumps(record, default=str) + '\n' for record in records]
+        if not lines:
+            return 0
+        path = self._active_segment()
+        with open(path, 'ab') as file:
+            file.write(''.join(lines).encode('utf-8'))
+            file.flush()
+            os.fsync(file.fileno())
+        return len(lines)
+
+    def _segments(self) -> List[Tuple[int, str]]:
+        segments = []
+        for name in os.listdir(self.directory):
+            if name.endswith(SEGMENT_SUFFIX) and name[:-len(SEGMENT_SUFFIX)].isdigit():
+                segments.append((int(name[:-len(SEGMENT_SUFFIX)]), os.path.join(self.directory, name)))
+        return sorted(segments)
+
+    def _segment_path(self, start: int) -> str:
+        return os.path.join(self.directory, f'{start:020d}{SEGMENT_SUFFIX}')
+
+    def _active_segment(self) -> str:
+        """Last segment, rolling over to a new one when it is full (lock held)."""
+        active = self._active
+        if active is None or not os.path.exists(active[1]):
+            segments = self._segments()
+            active = segments[-1] if segments else (0, self._segment_path(0))
+        start, path = active
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        while size >= self.segment_bytes:
+            # Another writer may already have rolled; the next name is deterministic
+            start, path = start + size, self._segment_path(start + size)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+        self._active = (start, path)
+        return path
+
+    @contextmanager
+    def _exclusive(self):
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self._lock_path, 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
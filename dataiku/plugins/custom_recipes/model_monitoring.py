@@ -1,18 +1,26 @@
 import pandas as pd
 import numpy as np
-from scipy import stats
 import joblib
 import json
+import os
 from datetime import datetime
 from sklearn.metrics import precision_score, recall_score, f1_score
 import logging
+from drift_engine import BatchDriftEngine
+from drift_sketches import load_sketches
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class ModelMonitor:
-    def __init__(self, model_path, metadata_path):
-        """Initialize model monitor with trained model and metadata."""
+    def __init__(self, model_path, metadata_path, reference_data=None, n_jobs=None):
+        """Initialize model monitor with trained model and metadata.
+        
+        ``reference_data`` holds raw training features for exact KS tests;
+        without it, raw values stored in the metadata are used when present
+        and the binned training sketches cover every other feature.
+        ``n_jobs`` sets the worker threads used on wide frames.
+        """
         self.model = joblib.load(model_path)
         with open(metadata_path, 'r') as f:
             self.metadata = json.load(f)
@@ -21,31 +29,42 @@ class ModelMonitor:
         self.training_date = self.metadata.get('training_date')
         self.model_parameters = self.metadata.get('model_parameters', {})
         
+        # Load reference sketches written next to the metadata at training time
+        self.feature_sketches = {}
+        sketches_file = self.metadata.get('feature_sketches')
+        if sketches_file:
+            sketches_path = os.path.join(os.path.dirname(os.path.abspath(metadata_path)), sketches_file)
+            self.feature_sketches = load_sketches(sketches_path)
+        
+        # Presort raw reference samples once so drift checks only search them
+        if reference_data is None:
+            reference_data = {
+                feature: dist['values']
+                for feature, dist in self.metadata.get('feature_distributions', {}).items()
+                if feature in self.feature_importance and 'values' in dist
+            }
+        self.drift_engine = BatchDriftEngine(reference_data, n_jobs=n_jobs)
+        
         # Initialize drift detection thresholds
         self.drift_threshold = 0.1
+        self.psi_threshold = 0.2
         self.performance_threshold = 0.8
     
     def detect_drift(self, X):
-        """Detect data drift using Kolmogorov-Smirnov test."""
-        drift_metrics = {}
+        """Detect data drift against the training reference distributions."""
+        # Exact statistics for all features with a raw reference, in one batch
+        drift_metrics = self.drift_engine.compute(X)
         
         for feature in X.columns:
-            if feature in self.feature_importance:
-                # Get feature distribution from training data
-                train_dist = self.metadata.get('feature_distributions', {}).get(feature, {})
-                
-                if train_dist:
-                    # Perform KS test
-                    ks_stat, p_value = stats.ks_2samp(
-                        train_dist['values'],
-                        X[feature].values
-                    )
-                    
-                    drift_metrics[feature] = {
-                        'ks_statistic': float(ks_stat),
-                        'p_value': float(p_value),
-                        'drift_detected': p_value < self.drift_threshold
-                    }
+            if feature not in drift_metrics and feature in self.feature_sketches:
+                # Compare against the binned training distribution
+                drift_metrics[feature] = self.feature_sketches[feature].compare(X[feature].values)
+        
+        for metrics in drift_metrics.values():
+            metrics['drift_detected'] = bool(
+                metrics['p_value'] < self.drift_threshold or
+                metrics['psi'] >= self.psi_threshold
+            )
         
         return drift_metrics
     
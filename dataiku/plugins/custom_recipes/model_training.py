@@ -7,13 +7,16 @@ import lightgbm as lgb
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 import joblib
 import json
+import os
 from datetime import datetime
+from drift_sketches import build_feature_sketches, save_sketches
 
 class FraudDetectionModel:
     def __init__(self, model_type='xgboost'):
         self.model_type = model_type
         self.model = None
         self.feature_importance = None
+        self.feature_sketches = None
         self.models = {
             'xgboost': xgb.XGBClassifier(
                 max_depth=6,
@@ -56,7 +59,10 @@ class FraudDetectionModel:
         
         # Get feature importance if available
         if hasattr(self.model, 'feature_importances_'):
-            self.feature_importance = dict(zip(X.columns, self.model.feature_importances_))
+            self.feature_importance = dict(zip(X.columns, map(float, self.model.feature_importances_)))
+        
+        # Summarise the training distributions for drift monitoring
+        self.feature_sketches = build_feature_sketches(X_train)
         
         return X_test, y_test
     
@@ -93,6 +99,12 @@ class FraudDetectionModel:
             'model_parameters': self.model.get_params()
         }
         
+        # Save reference distributions as a compact binary sidecar
+        if self.feature_sketches:
+            sketches_path = f"{model_path}_sketches.npz"
+            save_sketches(self.feature_sketches, sketches_path)
+            metadata['feature_sketches'] = os.path.basename(sketches_path)
+        
         with open(f"{model_path}_metadata.json", 'w') as f:
             json.dump(metadata, f, indent=2)
 
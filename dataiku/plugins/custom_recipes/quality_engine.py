@@ -0,0 +1,178 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+from reference_index import ReferenceIndex
+from rule_expressions import compile_rules
+
+# Rows per chunk when streaming a dataset; bounds peak memory
+DEFAULT_CHUNK_SIZE = 100000
+# Violating row positions kept per column; counts are always exact
+MAX_VIOLATION_INDICES = 1000
+
+
+class CompletenessCheck:
+    """Missing-value ratio per column, accumulated as null and row counts."""
+
+    name = 'completeness'
+
+    def __init__(self, threshold=0.95):
+        self.threshold = threshold
+        self.rows = 0
+        self.nulls = None
+
+    def update(self, chunk):
+        counts = chunk.isnull().sum()
+        self.nulls = counts if self.nulls is None else self.nulls.add(counts, fill_value=0)
+        self.rows += len(chunk)
+
+    def result(self):
+        completeness = {}
+        if self.nulls is None:
+            return completeness
+        for column, nulls in self.nulls.items():
+            missing_ratio = nulls / self.rows if self.rows else np.nan
+            completeness[column] = {
+                'missing_ratio': missing_ratio,
+                'status': 'PASS' if missing_ratio < (1 - self.threshold) else 'FAIL'
+            }
+        return completeness
+
+
+class ConsistencyCheck:
+    """Rule violations counted chunk by chunk.
+
+    Rule conditions are compiled once into vectorized predicates (see
+    ``rule_expressions``); rules over the same column are fused, so a row
+    counts once per column however many of its rules it breaks.
+    """
+
+    name = 'consistency'
+
+    def __init__(self, rules, max_violation_indices=MAX_VIOLATION_INDICES):
+        self.rule_set = compile_rules(rules)
+        self.max_violation_indices = max_violation_indices
+        self.rows = 0
+        self.violations = {column: 0 for column in self.rule_set.rules_by_column}
+        self.rule_violations = {
+            column: [0] * len(rules) for column, rules in self.rule_set.rules_by_column.items()
+        }
+        self.violation_indices = {column: [] for column in self.rule_set.rules_by_column}
+
+    def update(self, chunk):
+        for column, (violated, per_rule) in self.rule_set.evaluate(chunk).items():
+            self.violations[column] += int(violated.sum())
+            for i, rule_violated in enumerate(per_rule):
+                self.rule_violations[column][i] += int(rule_violated.sum())
+            indices = self.violation_indices[column]
+            room = self.max_violation_indices - len(indices)
+            if room > 0:
+                # Row positions in the whole dataset, not the chunk
+                indices.extend((np.flatnonzero(violated)[:room] + self.rows).tolist())
+        self.rows += len(chunk)
+
+    def result(self):
+        consistency = {}
+        for column, rules in self.rule_set.rules_by_column.items():
+            violations = self.violations[column]
+            consistency[column] = {
+                'violations': violations,
+                'violation_indices': self.violation_indices[column],
+                'rules': [
+                    {'condition': rule.condition, 'violations': count}
+                    for rule, count in zip(rules, self.rule_violations[column])
+                ],
+                'status': 'PASS' if violations == 0 else 'FAIL'
+            }
+        return consistency
+
+
+class AccuracyCheck:
+    """Share of key values found in reference values, counted chunk by chunk."""
+
+    name = 'accuracy'
+
+    def __init__(self, reference_values, threshold=0.95):
+        """
+        Args:
+            reference_values: A ``ReferenceIndex``, or dict of column -> reference values
+            threshold: Minimum match ratio for a PASS
+        """
+        if not isinstance(reference_values, ReferenceIndex):
+            reference_values = ReferenceIndex.from_values(reference_values)
+        self.index = reference_values
+        self.threshold = threshold
+        self.rows = 0
+        self.matches = dict.fromkeys(self.index.columns, 0)
+
+    def update(self, chunk):
+        for column in self.matches:
+            self.matches[column] += int(self.index.contains(column, chunk[column]).sum())
+        self.rows += len(chunk)
+
+    def result(self):
+        accuracy = {}
+        for column, matches in self.matches.items():
+            match_ratio = matches / self.rows if self.rows else np.nan
+            accuracy[column] = {
+                'match_ratio': match_ratio,
+                # Bloom filter lookups can over-count matches by their false positive rate
+                'approximate': not self.index.is_exact(column),
+                'status': 'PASS' if match_ratio > self.threshold else 'FAIL'
+            }
+        return accuracy
+
+
+class FreshnessCheck:
+    """Age of the latest timestamp, keeping only the running maximum."""
+
+    name = 'freshness'
+
+    def __init__(self, timestamp_column, max_age_hours=24):
+        self.timestamp_column = timestamp_column
+        self.max_age_hours = max_age_hours
+        self.latest = pd.NaT
+        self.found = False
+
+    def update(self, chunk):
+        if self.timestamp_column not in chunk.columns:
+            return
+        self.found = True
+        latest = pd.to_datetime(chunk[self.timestamp_column]).max()
+        if pd.notnull(latest) and (pd.isnull(self.latest) or latest > self.latest):
+            self.latest = latest
+
+    def result(self):
+        if not self.found:
+            return {'status': 'ERROR', 'message': 'Timestamp column not found'}
+        age_hours = (datetime.now() - self.latest).total_seconds() / 3600
+        return {
+            'age_hours': age_hours,
+            'status': 'PASS' if age_hours <= self.max_age_hours else 'FAIL'
+        }
+
+
+class QualityCheckPlan:
+    def __init__(self, checks=None):
+        """A set of quality checks evaluated together in one scan.
+
+        Each check only keeps running aggregates (counts, maxima), so the
+        data can be streamed in chunks and every check sees each chunk
+        while it is in memory.
+        """
+        self.checks = list(checks or [])
+
+    def add(self, check):
+        self.checks.append(check)
+        return self
+
+    def run(self, chunks):
+        """Evaluate all checks over an iterable of DataFrame chunks.
+
+        Returns:
+            dict: check name -> that check's result
+        """
+        for chunk in chunks:
+            for check in self.checks:
+                check.update(chunk)
+        return {check.name: check.result() for check in self.checks}
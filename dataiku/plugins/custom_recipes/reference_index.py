@@ -0,0 +1,257 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# Columns with more distinct reference keys than this switch from an exact
+# hash set (8 bytes per key) to a Bloom filter (~1.8 bytes per key at 0.1%)
+DEFAULT_EXACT_MAX_VALUES = 5000000
+DEFAULT_FALSE_POSITIVE_RATE = 0.001
+
+# HyperLogLog precision: 2**14 one-byte registers, ~0.8% relative error
+HLL_PRECISION = 14
+
+_LOW_32 = np.uint64(0xFFFFFFFF)
+
+
+def hash_values(values):
+    """Stable 64-bit hashes of key values.
+
+    Numbers are hashed by value, so ``5`` and ``5.0`` match as they do with
+    ``isin``; everything else is hashed by its string form.
+    """
+    series = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(series):
+        # + 0.0 folds -0.0 into 0.0
+        series = series.astype(np.float64) + 0.0
+    else:
+        series = series.astype(str)
+    return pd.util.hash_pandas_object(series, index=False).to_numpy(dtype=np.uint64)
+
+
+class HyperLogLog:
+    """Distinct-count sketch over 64-bit hashes."""
+
+    def __init__(self, precision=HLL_PRECISION, registers=None):
+        self.precision = precision
+        self.registers = (np.zeros(1 << precision, dtype=np.uint8) if registers is None
+                          else np.asarray(registers, dtype=np.uint8))
+
+    def update(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if len(hashes) == 0:
+            return
+        shift = np.uint64(64 - self.precision)
+        buckets = (hashes >> shift).astype(np.intp)
+        # The remaining bits fit in a float64 mantissa, so frexp gives their exact bit length
+        rest = (hashes & np.uint64((1 << (64 - self.precision)) - 1)).astype(np.float64)
+        bit_length = np.frexp(rest)[1]
+        ranks = (64 - self.precision - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, buckets, ranks)
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            return m * np.log(m / zeros)
+        return float(raw)
+
+
+class BloomFilter:
+    """Bit-array membership filter over 64-bit hashes; no false negatives."""
+
+    def __init__(self, n_bits, n_hashes, bits=None):
+        self.n_bits = int(n_bits)
+        self.n_hashes = int(n_hashes)
+        self.bits = (np.zeros((self.n_bits + 7) // 8, dtype=np.uint8) if bits is None
+                     else np.asarray(bits, dtype=np.uint8))
+
+    @classmethod
+    def for_capacity(cls, capacity, false_positive_rate=DEFAULT_FALSE_POSITIVE_RATE):
+        capacity = max(int(capacity), 1)
+        n_bits = int(np.ceil(-capacity * np.log(false_positive_rate) / np.log(2) ** 2))
+        n_hashes = max(1, int(round(n_bits / capacity * np.log(2))))
+        return cls(n_bits, n_hashes)
+
+    def _positions(self, hashes):
+        # Double hashing: the i-th probe is h1 + i * h2
+        h1 = hashes & _LOW_32
+        h2 = (hashes >> np.uint64(32)) | np.uint64(1)
+        n_bits = np.uint64(self.n_bits)
+        for i in range(self.n_hashes):
+            yield (h1 + np.uint64(i) * h2) % n_bits
+
+    def add(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        for positions in self._positions(hashes):
+            np.bitwise_or.at(self.bits, positions >> np.uint64(3),
+                             np.left_shift(1, positions & np.uint64(7)).astype(np.uint8))
+
+    def contains(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        found = np.ones(len(hashes), dtype=bool)
+        for positions in self._positions(hashes):
+            found &= ((self.bits[positions >> np.uint64(3)] >> (positions & np.uint64(7))) & 1).astype(bool)
+        return found
+
+
+class ReferenceIndex:
+    def __init__(self, exact=None, blooms=None, sketches=None):
+        """Membership index over reference key columns.
+
+        Each column is either an exact hash set (a sorted array of 64-bit
+        value hashes, probed with ``searchsorted``) or, when the reference
+        has too many distinct keys, a Bloom filter sized from a
+        HyperLogLog estimate of the distinct count. Neither keeps the
+        reference values themselves, and the index can be saved and
+        reloaded instead of re-reading the reference.
+        """
+        self.exact = dict(exact or {})
+        self.blooms = dict(blooms or {})
+        self.sketches = dict(sketches or {})
+
+    @property
+    def columns(self):
+        return list(self.exact) + list(self.blooms)
+
+    @classmethod
+    def from_values(cls, reference_values):
+        """Exact index from in-memory values: dict of column -> values."""
+        exact = {column: np.unique(hash_values(values)) for column, values in reference_values.items()}
+        return cls(exact=exact)
+
+    @classmethod
+    def build(cls, iter_chunks, key_columns, exact_max_values=DEFAULT_EXACT_MAX_VALUES,
+              false_positive_rate=DEFAULT_FALSE_POSITIVE_RATE):
+        """Build an index by streaming the reference.
+
+        Args:
+            iter_chunks: Callable returning an iterable of reference DataFrame
+                chunks; called a second time only if a column needs a Bloom filter
+            key_columns: Columns to index
+            exact_max_values: Distinct keys above which a column uses a Bloom filter
+            false_positive_rate: Target false positive rate of Bloom filters
+        """
+        sketches = {column: HyperLogLog() for column in key_columns}
+        exact = {column: np.empty(0, dtype=np.uint64) for column in key_columns}
+        pending = {column: [] for column in key_columns}
+        pending_sizes = dict.fromkeys(key_columns, 0)
+
+        def compact(column):
+            exact[column] = np.unique(np.concatenate([exact[column]] + pending[column]))
+            pending[column], pending_sizes[column] = [], 0
+            if len(exact[column]) > exact_max_values:
+                del exact[column]
+
+        for chunk in iter_chunks():
+            for column in key_columns:
+                hashes = hash_values(chunk[column])
+                sketches[column].update(hashes)
+                if column not in exact:
+                    continue
+                pending[column].append(np.unique(hashes))
+                pending_sizes[column] += len(pending[column][-1])
+                # Deduplicate in batches so the buffer stays proportional to the set
+                if pending_sizes[column] > max(exact_max_values, len(exact[column])):
+                    compact(column)
+        for column in key_columns:
+            if column in exact:
+                compact(column)
+
+        blooms = {
+            column: BloomFilter.for_capacity(sketches[column].estimate() * 1.05, false_positive_rate)
+            for column in key_columns if column not in exact
+        }
+        if blooms:
+            for chunk in iter_chunks():
+                for column, bloom in blooms.items():
+                    bloom.add(hash_values(chunk[column]))
+        return cls(exact=exact, blooms=blooms, sketches=sketches)
+
+    def is_exact(self, column):
+        return column in self.exact
+
+    def distinct_count(self, column):
+        """Distinct reference keys; exact for hash sets, estimated otherwise."""
+        if column in self.exact:
+            return len(self.exact[column])
+        return self.sketches[column].estimate()
+
+    def contains(self, column, values):
+        """Boolean array, True where the value occurs in the reference column."""
+        hashes = hash_values(values)
+        if column in self.exact:
+            keys = self.exact[column]
+            if len(keys) == 0:
+                return np.zeros(len(hashes), dtype=bool)
+            # Sorted probes walk the key array in order; random probes thrash the cache
+            order = np.argsort(hashes)
+            probes = hashes[order]
+            positions = np.minimum(np.searchsorted(keys, probes), len(keys) - 1)
+            found = np.empty(len(hashes), dtype=bool)
+            found[order] = keys[positions] == probes
+            return found
+        return self.blooms[column].contains(hashes)
+
+    def save(self, path):
+        """Write the index to a ``.npz`` file, atomically replacing ``path``."""
+        arrays = {
+            'exact_columns': np.array(list(self.exact), dtype=str),
+            'bloom_columns': np.array(list(self.blooms), dtype=str),
+            'sketch_columns': np.array(list(self.sketches), dtype=str),
+        }
+        for i, keys in enumerate(self.exact.values()):
+            arrays[f'exact_{i}'] = keys
+        for i, bloom in enumerate(self.blooms.values()):
+            arrays[f'bloom_{i}'] = bloom.bits
+            arrays[f'bloom_shape_{i}'] = np.array([bloom.n_bits, bloom.n_hashes], dtype=np.int64)
+        for i, sketch in enumerate(self.sketches.values()):
+            arrays[f'sketch_{i}'] = sketch.registers
+        tmp_path = f'{path}.tmp'
+        # Pass a file handle so numpy does not append a second ".npz" suffix
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load an index written by :meth:`save`."""
+        with np.load(path, allow_pickle=False) as data:
+            exact = {str(column): data[f'exact_{i}'] for i, column in enumerate(data['exact_columns'])}
+            blooms = {}
+            for i, column in enumerate(data['bloom_columns']):
+                n_bits, n_hashes = data[f'bloom_shape_{i}']
+                blooms[str(column)] = BloomFilter(n_bits, n_hashes, data[f'bloom_{i}'])
+            sketches = {
+                str(column): HyperLogLog(registers=data[f'sketch_{i}'])
+                for i, column in enumerate(data['sketch_columns'])
+            }
+        return cls(exact=exact, blooms=blooms, sketches=sketches)
+
+
+def load_or_build_reference_index(path, iter_chunks, key_columns, max_age_hours=None, **build_options):
+    """Reuse the index cached at ``path`` unless it is missing, stale or lacks a column.
+
+    Args:
+        path: Cache file
+        iter_chunks: Callable returning reference DataFrame chunks (see ``ReferenceIndex.build``)
+        key_columns: Columns the index must cover
+        max_age_hours: Rebuild caches older than this (None never expires)
+    """
+    if os.path.exists(path):
+        age_hours = (time.time() - os.path.getmtime(path)) / 3600
+        if max_age_hours is None or age_hours <= max_age_hours:
+            index = ReferenceIndex.load(path)
+            if set(key_columns) <= set(index.columns):
+                return index
+    index = ReferenceIndex.build(iter_chunks, key_columns, **build_options)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    index.save(path)
+    return index
@@ -0,0 +1,285 @@
+import ast
+import re
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Conditions starting with one of these compare the rule's own column: '>= 0'
+_COMPARISON_PREFIX = re.compile(r'^\s*(<=|>=|==|!=|<|>|not\s+in\b|in\b)')
+# Conditions written as a pandas Series method call: 'between(0, 100)'
+_METHOD_PREFIX = re.compile(r'^\s*(between|isin|notnull|notna|isnull|isna|str\.\w+)\s*\(')
+
+_COMPARE_OPS = {
+    ast.Lt: lambda a, b: a < b,
+    ast.LtE: lambda a, b: a <= b,
+    ast.Gt: lambda a, b: a > b,
+    ast.GtE: lambda a, b: a >= b,
+    ast.Eq: lambda a, b: a == b,
+    ast.NotEq: lambda a, b: a != b,
+}
+
+_FUNCTIONS = {
+    'now': lambda: pd.Timestamp.now(),
+    'today': lambda: pd.Timestamp.now().normalize(),
+}
+
+# Legacy spellings of the functions above
+_QUALIFIED_FUNCTIONS = {
+    'pd.Timestamp.now': 'now',
+    'pd.Timestamp.today': 'today',
+}
+
+
+class RuleSyntaxError(ValueError):
+    """Raised when a rule condition is not valid in the rule language."""
+
+
+def _qualified_name(node):
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if isinstance(node, ast.Name):
+        parts.append(node.id)
+        return '.'.join(reversed(parts))
+    return None
+
+
+def _logical_not(value):
+    """``not`` per row; missing values count as false, as in the final mask."""
+    if isinstance(value, pd.Series):
+        return ~value.fillna(False).astype(bool)
+    return not value
+
+
+def _as_series(value, index):
+    if isinstance(value, pd.Series):
+        return value
+    return pd.Series(value, index=index)
+
+
+class _Compiler:
+    """Compile a restricted Python expression AST into a vectorized predicate.
+
+    Names refer to columns (``value`` is the rule's own column); only
+    comparisons, boolean operators, literals, set membership, ranges,
+    regex matching and null checks are accepted. Nothing is evaluated
+    with ``eval``.
+    """
+
+    def __init__(self, column):
+        self.column = column
+        self.columns = set()
+
+    def compile(self, node):
+        method = getattr(self, f'_{type(node).__name__}', None)
+        if method is None:
+            raise RuleSyntaxError(f"Unsupported syntax in rule: {type(node).__name__}")
+        return method(node)
+
+    def _Expression(self, node):
+        return self.compile(node.body)
+
+    def _Name(self, node):
+        name = self.column if node.id == 'value' else node.id
+        self.columns.add(name)
+        return lambda columns: columns[name]
+
+    def _Constant(self, node):
+        value = node.value
+        return lambda columns: value
+
+    def _UnaryOp(self, node):
+        operand = self.compile(node.operand)
+        if isinstance(node.op, ast.Not):
+            # ~ alone would invert the bits of integer columns and constants
+            return lambda columns: _logical_not(operand(columns))
+        if isinstance(node.op, ast.USub):
+            return lambda columns: -operand(columns)
+        raise RuleSyntaxError("Unsupported unary operator in rule")
+
+    def _BoolOp(self, node):
+        operands = [self.compile(value) for value in node.values]
+        if isinstance(node.op, ast.And):
+            def evaluate_and(columns):
+                result = operands[0](columns)
+                for operand in operands[1:]:
+                    result = result & operand(columns)
+                return result
+            return evaluate_and
+
+        def evaluate_or(columns):
+            result = operands[0](columns)
+            for operand in operands[1:]:
+                result = result | operand(columns)
+            return result
+        return evaluate_or
+
+    def _Compare(self, node):
+        left = self.compile(node.left)
+        pairs = []
+        for op, comparator in zip(node.ops, node.comparators):
+            if isinstance(op, (ast.In, ast.NotIn)):
+                values = self._literal_collection(comparator)
+                negate = isinstance(op, ast.NotIn)
+                pairs.append((self._membership(values, negate), None))
+            elif type(op) in _COMPARE_OPS:
+                pairs.append((_COMPARE_OPS[type(op)], self.compile(comparator)))
+            else:
+                raise RuleSyntaxError("Unsupported comparison in rule")
+
+        def evaluate(columns):
+            # a < b < c is (a < b) & (b < c), as in Python
+            result = None
+            current = left(columns)
+            for compare, right in pairs:
+                if right is None:
+                    step = compare(current)
+                else:
+                    other = right(columns)
+                    step = compare(current, other)
+                    current = other
+                result = step if result is None else result & step
+            return result
+        return evaluate
+
+    def _Call(self, node):
+        if node.keywords:
+            raise RuleSyntaxError("Keyword arguments are not supported in rules")
+        name = _qualified_name(node.func)
+        name = _QUALIFIED_FUNCTIONS.get(name, name)
+        if name in _FUNCTIONS:
+            function = _FUNCTIONS[name]
+            return lambda columns: function()
+
+        if not isinstance(node.func, ast.Attribute):
+            raise RuleSyntaxError(f"Unknown function in rule: {name}")
+        method = node.func.attr
+        target = node.func.value
+        is_str = isinstance(target, ast.Attribute) and target.attr == 'str'
+        subject = self.compile(target.value if is_str else target)
+        args = node.args
+
+        if is_str and method in ('match', 'fullmatch', 'contains') and len(args) == 1:
+            # Compiled once here rather than on every chunk
+            pattern = re.compile(self._literal(args[0]))
+
+            def evaluate_regex(columns):
+                series = subject(columns)
+                matched = getattr(series.astype(str).str, method)(pattern, na=False)
+                return matched & series.notna()
+            return evaluate_regex
+        if is_str:
+            raise RuleSyntaxError(f"Unsupported string method in rule: {method}")
+
+        if method == 'between' and len(args) == 2:
+            low, high = self.compile(args[0]), self.compile(args[1])
+            return lambda columns: subject(columns).between(low(columns), high(columns))
+        if method == 'isin' and len(args) == 1:
+            values = self._literal_collection(args[0])
+            return lambda columns: subject(columns).isin(values)
+        if method in ('notnull', 'notna') and not args:
+            return lambda columns: subject(columns).notna()
+        if method in ('isnull', 'isna') and not args:
+            return lambda columns: subject(columns).isna()
+        raise RuleSyntaxError(f"Unsupported method in rule: {method}")
+
+    def _membership(self, values, negate):
+        def compare(series):
+            result = series.isin(values)
+            return ~result if negate else result
+        return compare
+
+    def _literal(self, node):
+        try:
+            return ast.literal_eval(node)
+        except ValueError:
+            raise RuleSyntaxError("Expected a literal value in rule")
+
+    def _literal_collection(self, node):
+        if not isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+            raise RuleSyntaxError("Membership tests need a literal list, e.g. in ('USD', 'EUR')")
+        return list(self._literal(node))
+
+
+def _to_expression(condition):
+    """Rewrite shorthand conditions into expressions over ``value``."""
+    if _COMPARISON_PREFIX.match(condition):
+        return f'value {condition.strip()}'
+    if _METHOD_PREFIX.match(condition):
+        return f'value.{condition.strip()}'
+    return condition
+
+
+class CompiledRule:
+    def __init__(self, column, condition):
+        """A rule condition parsed once into a vectorized predicate.
+
+        Conditions may be shorthand for the rule's column (``>= 0``,
+        ``between(0, 100)``, ``in ('USD', 'EUR')``, ``str.match('^[A-Z]+$')``,
+        ``notnull()``) or full expressions where names are columns and
+        ``value`` is the rule's column (``value <= credit_limit and value > 0``).
+        """
+        self.column = column
+        self.condition = condition
+        try:
+            tree = ast.parse(_to_expression(condition), mode='eval')
+        except SyntaxError as e:
+            raise RuleSyntaxError(f"Invalid rule for column {column}: {condition}") from e
+        compiler = _Compiler(column)
+        self._predicate = compiler.compile(tree)
+        self.columns = compiler.columns
+
+    def evaluate(self, columns, index):
+        """Boolean array, True where the row satisfies the rule."""
+        result = self._predicate(columns)
+        if np.isscalar(result):
+            return np.full(len(index), bool(result))
+        return _as_series(result, index).fillna(False).to_numpy(dtype=bool)
+
+
+class _ColumnCache(dict):
+    """Columns extracted from a frame once and shared by every rule."""
+
+    def __init__(self, df):
+        super().__init__()
+        self.df = df
+
+    def __missing__(self, name):
+        if name not in self.df.columns:
+            raise KeyError(f"Rule refers to unknown column: {name}")
+        series = self[name] = self.df[name]
+        return series
+
+
+class CompiledRuleSet:
+    def __init__(self, rules):
+        """Rules compiled once and fused by column.
+
+        Rules over the same column are evaluated together against a single
+        extraction of that column; a row violates the column if it fails
+        any of its rules.
+        """
+        self.rules_by_column = OrderedDict()
+        for rule in rules:
+            compiled = CompiledRule(rule['column'], rule['condition'])
+            self.rules_by_column.setdefault(rule['column'], []).append(compiled)
+
+    def evaluate(self, df):
+        """Violation masks for one frame.
+
+        Returns:
+            dict: column -> (violation mask of the column, list of per-rule violation masks)
+        """
+        columns = _ColumnCache(df)
+        results = OrderedDict()
+        for column, rules in self.rules_by_column.items():
+            rule_violations = [~rule.evaluate(columns, df.index) for rule in rules]
+            combined = rule_violations[0] if len(rule_violations) == 1 else np.logical_or.reduce(rule_violations)
+            results[column] = (combined, rule_violations)
+        return results
+
+
+def compile_rules(rules):
+    return CompiledRuleSet(rules)
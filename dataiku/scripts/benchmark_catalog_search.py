@@ -0,0 +1,108 @@
+"""Benchmark catalog search over a synthetic 100k-dataset catalog.
+
+Compares the inverted-index search with the previous DataFrame scan
+(str.contains on name and description plus a per-row tag filter).
+
+    python dataiku/scripts/benchmark_catalog_search.py --datasets 100000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'plugins', 'custom_recipes'))
+
+from catalog_search import CatalogSearchIndex
+
+DOMAINS = ['fraud', 'customer', 'merchant', 'payment', 'card', 'account', 'device', 'chargeback', 'loan', 'risk']
+OBJECTS = ['transactions', 'profiles', 'events', 'scores', 'features', 'labels', 'alerts', 'snapshots']
+WORDS = ['daily', 'aggregated', 'raw', 'cleaned', 'historical', 'realtime', 'monthly', 'enriched', 'sampled']
+COLUMNS = ['id', 'amount', 'timestamp', 'country', 'status', 'score', 'currency', 'channel', 'segment']
+TAGS = ['pii', 'finance', 'ml_training', 'gold', 'silver', 'bronze', 'regulatory', 'deprecated', 'streaming']
+SENSITIVITY = ['public', 'internal', 'confidential', 'restricted']
+
+
+def generate_catalog(n, seed=0):
+    rng = random.Random(seed)
+    entries = []
+    for i in range(n):
+        domain, obj = rng.choice(DOMAINS), rng.choice(OBJECTS)
+        entries.append({
+            'dataset_name': f'{domain}_{obj}_{i}',
+            'description': ' '.join(rng.sample(WORDS, 3) + [domain, obj]),
+            'owner': f'team_{i % 40}',
+            'tags': rng.sample(TAGS, rng.randint(1, 4)),
+            'schema': {'columns': [{'name': f'{domain}_{column}', 'type': 'string'}
+                                   for column in rng.sample(COLUMNS, 4)]},
+            'sensitivity_level': rng.choice(SENSITIVITY),
+        })
+    return entries
+
+
+def scan_search(df, query, tags=None, sensitivity_level=None):
+    """The original DataCatalog.search_datasets logic."""
+    if tags:
+        df = df[df['tags'].apply(lambda x: all(tag in x for tag in tags))]
+    if sensitivity_level:
+        df = df[df['sensitivity_level'] == sensitivity_level]
+    if query:
+        mask = (
+            df['dataset_name'].str.contains(query, case=False) |
+            df['description'].str.contains(query, case=False)
+        )
+        df = df[mask]
+    return df.to_dict('records')
+
+
+def timed(func, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark catalog search')
+    parser.add_argument('--datasets', type=int, default=100000)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    entries = generate_catalog(args.datasets)
+    df = pd.DataFrame(entries)
+
+    start = time.perf_counter()
+    index = CatalogSearchIndex(entries)
+    build_seconds = time.perf_counter() - start
+    print(f"Catalog size:       {args.datasets}")
+    print(f"Index build:        {build_seconds:.2f} s ({args.datasets / build_seconds:,.0f} datasets/s)")
+
+    updates = generate_catalog(2000, seed=1)
+    start = time.perf_counter()
+    for entry in updates:
+        index.add(entry)
+    print(f"Incremental adds:   {len(updates) / (time.perf_counter() - start):,.0f} datasets/s")
+
+    queries = [
+        ('chargeback', None, None),
+        ('fraud transactions', None, None),
+        ('merch', None, None),
+        ('fraud', ['pii', 'finance'], 'confidential'),
+        ('', ['gold', 'regulatory'], None),
+    ]
+    print(f"{'query':<40}{'index ms':>10}{'scan ms':>10}{'hits':>8}")
+    for query, tags, sensitivity in queries:
+        index_ms = timed(lambda: index.search(query, tags, sensitivity, limit=50), args.repeats)
+        scan_ms = timed(lambda: scan_search(df, query, tags, sensitivity), args.repeats)
+        hits = len(index.search(query, tags, sensitivity))
+        label = f"{query!r} tags={tags} sensitivity={sensitivity}"
+        print(f"{label:<40.40}{index_ms:>10.2f}{scan_ms:>10.2f}{hits:>8}")
+
+
+if __name__ == '__main__':
+    main()
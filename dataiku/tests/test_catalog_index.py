@@ -0,0 +1,85 @@
+import os
+import sys
+import time
+
+import pandas as pd
+
+# Add the plugins directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..', 'plugins', 'custom_recipes'))
+
+from catalog_index import CatalogIndex, WriteBehindWriter
+
+
+class _Store:
+    def __init__(self):
+        self.written = []
+
+    def write_with_schema(self, df):
+        self.written.append(df)
+
+
+def _entry(name, tags, sensitivity='public'):
+    return {'dataset_name': name, 'description': name, 'tags': tags, 'sensitivity_level': sensitivity}
+
+
+def test_entries_keep_catalog_order():
+    index = CatalogIndex([
+        _entry('a', ['fraud', 'risk'], 'confidential'),
+        _entry('b', ['fraud']),
+        _entry('c', ['risk'], 'confidential'),
+    ])
+    index.upsert(_entry('a', ['fraud']))
+
+    assert [e['dataset_name'] for e in index.entries()] == ['a', 'b', 'c']
+    assert [e['dataset_name'] for e in index.entries(['c', 'missing', 'a'])] == ['a', 'c']
+
+
+def test_upsert_replaces_entry_and_returns_copies():
+    index = CatalogIndex([_entry('a', ['fraud'])])
+    entry = index.get('a')
+    entry['tags'].append('mutated')
+    assert index.get('a')['tags'] == ['fraud']
+
+    index.upsert(_entry('a', ['ml_training'], 'confidential'))
+
+    assert index.get('a')['tags'] == ['ml_training']
+    assert index.get('a')['sensitivity_level'] == 'confidential'
+    assert len(index) == 1
+
+
+def test_tags_read_back_as_strings():
+    df = pd.DataFrame([_entry('a', "['fraud', 'risk']"), _entry('b', '["risk"]')])
+    index = CatalogIndex.from_dataframe(df)
+
+    assert index.get('a')['tags'] == ['fraud', 'risk']
+    assert index.get('b')['tags'] == ['risk']
+
+
+def test_write_behind_coalesces_updates():
+    store = _Store()
+    index = CatalogIndex()
+    writer = WriteBehindWriter(store, index, flush_interval=60, max_pending=1000)
+    for i in range(200):
+        index.upsert(_entry(f'd{i}', ['t']))
+        writer.mark_dirty()
+
+    assert store.written == []
+    writer.close()
+    assert len(store.written) == 1
+    assert len(store.written[0]) == 200
+
+
+def test_write_behind_flushes_early_when_pending_fills_up():
+    store = _Store()
+    index = CatalogIndex()
+    writer = WriteBehindWriter(store, index, flush_interval=60, max_pending=10)
+    for i in range(10):
+        index.upsert(_entry(f'd{i}', []))
+        writer.mark_dirty()
+
+    deadline = time.time() + 2
+    while not store.written and time.time() < deadline:
+        time.sleep(0.01)
+    writer.close()
+    assert len(store.written) == 1
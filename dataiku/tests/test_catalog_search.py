@@ -0,0 +1,65 @@
+import os
+import sys
+
+# Add the plugins directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..', 'plugins', 'custom_recipes'))
+
+from catalog_search import CatalogSearchIndex, tokenize
+
+
+def _entry(name, description='', tags=(), sensitivity='public', columns=()):
+    return {
+        'dataset_name': name,
+        'description': description,
+        'tags': list(tags),
+        'sensitivity_level': sensitivity,
+        'schema': {'columns': [{'name': column, 'type': 'string'} for column in columns]},
+    }
+
+
+def _index():
+    return CatalogSearchIndex([
+        _entry('fraud_transactions', 'Fraudulent transaction records', ['fraud', 'risk'], 'confidential',
+               ['transaction_id', 'amount']),
+        _entry('customer_profiles', 'Customer master data mentioning fraud once', ['customer'],
+               columns=['customer_id']),
+        _entry('merchant_risk', 'Merchant risk scores', ['risk'], columns=['merchant_id', 'fraud_rate']),
+    ])
+
+
+def test_tokenize_splits_identifiers():
+    assert tokenize('fraud_transactions v2') == ['fraud', 'transactions', 'v2']
+
+
+def test_bm25_ranks_name_matches_first():
+    names = [name for name, _ in _index().search('fraud')]
+    assert names[0] == 'fraud_transactions'
+    assert set(names) == {'fraud_transactions', 'customer_profiles', 'merchant_risk'}
+
+
+def test_prefix_and_schema_column_matching():
+    index = _index()
+    assert [name for name, _ in index.search('merch')] == ['merchant_risk']
+    assert [name for name, _ in index.search('customer_id')][0] == 'customer_profiles'
+    assert index.search('nomatch') == []
+
+
+def test_tag_and_sensitivity_filters():
+    index = _index()
+    assert [name for name, _ in index.search('', tags=['risk'])] == ['fraud_transactions', 'merchant_risk']
+    assert [name for name, _ in index.search('fraud', tags=['risk'], sensitivity_level='confidential')] == [
+        'fraud_transactions'
+    ]
+    assert index.search('fraud', tags=['risk', 'missing']) == []
+
+
+def test_incremental_update_replaces_previous_version():
+    index = _index()
+    index.add(_entry('merchant_risk', 'Chargeback ratios', ['chargebacks']))
+
+    assert [name for name, _ in index.search('merchant')] == ['merchant_risk']
+    assert 'merchant_risk' not in [name for name, _ in index.search('scores')]
+    assert index.search('', tags=['risk']) == [('fraud_transactions', 0.0)]
+    assert [name for name, _ in index.search('chargeback')] == ['merchant_risk']
+    assert len(index) == 3
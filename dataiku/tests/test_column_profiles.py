@@ -0,0 +1,105 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add the plugins directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..', 'plugins', 'custom_recipes'))
+
+from column_profiles import ColumnProfile, DatasetProfile, ProfileStore, QuantileSketch
+
+
+def _partition(seed, n=5000):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'amount': rng.lognormal(3, 1, n) - 5,
+        'merchant_id': rng.integers(0, 800, n).astype(str),
+    })
+    df.loc[rng.random(n) < 0.05, 'amount'] = np.nan
+    return df
+
+
+def test_merged_profiles_match_whole_dataset_statistics():
+    partitions = [_partition(seed) for seed in range(4)]
+    merged = DatasetProfile()
+    for df in partitions:
+        profile = DatasetProfile()
+        for i in range(0, len(df), 1500):
+            profile.update(df.iloc[i:i + 1500])
+        merged.merge(profile)
+
+    whole = pd.concat(partitions)
+    amount = merged.columns['amount'].summary()
+    assert merged.rows == len(whole)
+    assert amount['nulls'] == whole['amount'].isna().sum()
+    assert np.isclose(amount['mean'], whole['amount'].mean())
+    assert np.isclose(amount['std'], whole['amount'].std())
+    assert amount['min'] == whole['amount'].min() and amount['max'] == whole['amount'].max()
+    for q in ('p50', 'p95', 'p99'):
+        true = whole['amount'].quantile(int(q[1:]) / 100)
+        assert abs(amount[q] - true) <= 0.02 * abs(true) + 1e-9
+    distinct = merged.columns['merchant_id'].summary()['distinct']
+    assert abs(distinct - whole['merchant_id'].nunique()) / whole['merchant_id'].nunique() < 0.05
+    assert 'mean' not in merged.columns['merchant_id'].summary()
+
+
+def test_quantile_sketch_handles_negative_and_zero_values():
+    sketch = QuantileSketch()
+    sketch.update(np.array([-10.0, -1.0, 0.0, 0.0, 1.0, 10.0, 100.0]))
+    assert abs(sketch.quantile(0) - -10) < 0.2
+    assert sketch.quantile(0.4) == 0.0
+    assert abs(sketch.quantile(1) - 100) < 2
+    assert QuantileSketch().quantile(0.5) is None
+
+
+def test_columns_missing_from_some_partitions_count_as_nulls():
+    profile = DatasetProfile()
+    profile.update(pd.DataFrame({'a': [1, 2]}))
+    profile.update(pd.DataFrame({'a': [3], 'b': ['x']}))
+    other = DatasetProfile()
+    other.update(pd.DataFrame({'c': [1.0, 2.0]}))
+    profile.merge(other)
+    assert {name: (column.count, column.nulls) for name, column in profile.columns.items()} == {
+        'a': (5, 2), 'b': (5, 4), 'c': (5, 3)
+    }
+
+
+def test_store_only_profiles_new_partitions(tmp_path):
+    data = {f'2024-01-0{day}': _partition(day, n=500) for day in range(1, 5)}
+    read = []
+
+    def read_partition(partition):
+        read.append(partition)
+        return [data[partition]]
+
+    store = ProfileStore(str(tmp_path))
+    total = store.update(['2024-01-01', '2024-01-02'], read_partition)
+    assert total.rows == 1000
+
+    total = store.update(list(data), read_partition)
+    assert read == list(data)
+    assert total.rows == 2000
+    assert sorted(total.partitions) == list(data)
+
+    # Nothing new: the stored total is returned as is
+    assert ProfileStore(str(tmp_path)).update(list(data), read_partition).rows == 2000
+    assert len(read) == 4
+
+    # A refreshed partition replaces its previous profile in the total
+    data['2024-01-01'] = data['2024-01-01'].iloc[:100]
+    total = store.update(list(data), read_partition, refresh=['2024-01-01'])
+    assert total.rows == 1600
+    assert store.total().rows == 1600
+
+    whole = pd.concat(data.values())
+    assert total.columns['amount'].nulls == whole['amount'].isna().sum()
+    assert np.isclose(total.columns['amount'].mean, whole['amount'].mean())
+
+
+def test_profile_round_trips_through_json():
+    column = ColumnProfile()
+    column.update(pd.Series([1.5, None, 3.0, 3.0]))
+    restored = ColumnProfile.from_dict(column.to_dict())
+    assert restored.summary() == column.summary()
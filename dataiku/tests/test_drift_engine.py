@@ -0,0 +1,42 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+# Add the plugins directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..', 'plugins', 'custom_recipes'))
+
+from drift_engine import BatchDriftEngine
+
+
+def _frame(rng, n, shift=0.0, width=40):
+    data = {f'f{i}': rng.normal(shift * (i % 2), 1 + i % 3, n) for i in range(width)}
+    data['flag'] = rng.binomial(1, 0.1, n)
+    return pd.DataFrame(data)
+
+
+def test_ks_matches_scipy():
+    rng = np.random.default_rng(7)
+    reference = _frame(rng, 3000)
+    current = _frame(rng, 800, shift=0.3)
+    current.loc[::50, 'f3'] = np.nan
+
+    serial = BatchDriftEngine(reference).compute(current)
+    threaded = BatchDriftEngine(reference, n_jobs=4).compute(current)
+
+    for feature in reference.columns:
+        expected = stats.ks_2samp(reference[feature], current[feature].dropna()).statistic
+        assert abs(serial[feature]['ks_statistic'] - expected) < 1e-12
+        assert serial[feature] == threaded[feature]
+
+
+def test_shifted_features_have_high_psi():
+    rng = np.random.default_rng(1)
+    reference = _frame(rng, 5000, width=4)
+    result = BatchDriftEngine(reference).compute(_frame(rng, 2000, shift=1.0, width=4))
+
+    assert result['f1']['psi'] > 0.2 and result['f1']['p_value'] < 0.01
+    assert result['f0']['psi'] < 0.05
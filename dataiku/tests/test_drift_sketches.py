@@ -0,0 +1,50 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# Add the plugins directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..', 'plugins', 'custom_recipes'))
+
+from drift_sketches import FeatureSketch, build_feature_sketches, save_sketches, load_sketches
+
+
+def test_sketch_detects_shift():
+    rng = np.random.default_rng(42)
+    sketch = FeatureSketch.from_values(rng.lognormal(4, 1, 20000))
+
+    same = sketch.compare(rng.lognormal(4, 1, 5000))
+    shifted = sketch.compare(rng.lognormal(4.5, 1, 5000))
+
+    assert same['psi'] < 0.05
+    assert same['p_value'] > 0.01
+    assert shifted['psi'] > 0.2
+    assert shifted['ks_statistic'] > same['ks_statistic']
+    assert shifted['js_divergence'] > same['js_divergence']
+
+
+def test_discrete_feature_keeps_value_bins():
+    sketch = FeatureSketch.from_values(np.array([0] * 900 + [1] * 100))
+
+    assert sketch.total == 1000
+    assert sorted(sketch.counts[sketch.counts > 0]) == [100, 900]
+
+
+def test_sketches_round_trip(tmp_path):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({
+        'amount': rng.lognormal(4, 1, 1000),
+        'location_change': rng.binomial(1, 0.1, 1000),
+        'merchant': ['m'] * 1000
+    })
+    sketches = build_feature_sketches(X)
+    path = tmp_path / 'model.joblib_sketches.npz'
+    save_sketches(sketches, path)
+    loaded = load_sketches(path)
+
+    assert set(loaded) == {'amount', 'location_change'}
+    for feature, sketch in sketches.items():
+        np.testing.assert_array_equal(loaded[feature].edges, sketch.edges)
+        np.testing.assert_array_equal(loaded[feature].counts, sketch.counts)
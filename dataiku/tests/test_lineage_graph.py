@@ -0,0 +1,58 @@
+import os
+import sys
+
+# Add the plugins directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..', 'plugins', 'custom_recipes'))
+
+from lineage_graph import LineageGraph
+
+
+def _record(name, sources):
+    return {'dataset_name': name, 'source_datasets': sources, 'transformation_type': 'join'}
+
+
+def _graph():
+    # raw -> cleaned -> features -> scores, customers -> features, raw -> audit
+    return LineageGraph([
+        _record('cleaned', ['raw']),
+        _record('features', ['cleaned', 'customers']),
+        _record('scores', ['features']),
+        _record('audit', "['raw']"),
+    ])
+
+
+def test_transitive_closure():
+    graph = _graph()
+    assert graph.parents('features') == {'cleaned', 'customers'}
+    assert graph.upstream('scores') == {'features', 'cleaned', 'customers', 'raw'}
+    assert graph.downstream('raw') == {'cleaned', 'features', 'scores', 'audit'}
+    assert graph.downstream('scores') == frozenset()
+
+
+def test_impact_and_shortest_path():
+    graph = _graph()
+    assert graph.impact('raw') == [('audit', 1), ('cleaned', 1), ('features', 2), ('scores', 3)]
+    assert graph.shortest_path('raw', 'scores') == ['raw', 'cleaned', 'features', 'scores']
+    assert graph.shortest_path('scores', 'raw') is None
+
+
+def test_new_edge_invalidates_only_affected_closures():
+    graph = _graph()
+    graph.upstream('scores')
+    graph.downstream('raw')
+    graph.upstream('audit')
+    graph.add_record(_record('dashboard', ['scores']))
+    graph.add_record(_record('cleaned', ['vendor_feed']))
+
+    assert 'scores' not in graph._upstream_cache
+    assert 'audit' in graph._upstream_cache
+    assert graph.upstream('scores') == {'features', 'cleaned', 'customers', 'raw', 'vendor_feed'}
+    assert graph.downstream('raw') == {'cleaned', 'features', 'scores', 'audit', 'dashboard'}
+    assert len(graph.records('cleaned')) == 2
+
+
+def test_cycles_terminate():
+    graph = LineageGraph([_record('a', ['b']), _record('b', ['a'])])
+    assert graph.upstream('a') == {'b'}
+    assert graph.shortest_path('a', 'b') == ['a', 'b']
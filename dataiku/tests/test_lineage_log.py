@@ -0,0 +1,78 @@
+import multiprocessing
+import os
+import sys
+import threading
+
+# Add the plugins directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..', 'plugins', 'custom_recipes'))
+
+from lineage_log import LineageLog
+
+
+def _record(i, writer=0):
+    return {'dataset_name': f'd{i}', 'source_datasets': [f'src{i}'], 'writer': writer}
+
+
+def _write(directory, writer, count):
+    log = LineageLog(directory, segment_bytes=2048)
+    for i in range(count):
+        log.append(_record(i, writer))
+
+
+def test_append_and_tail(tmp_path):
+    log = LineageLog(str(tmp_path))
+    log.append_many([_record(0), _record(1)])
+    records, position = log.read()
+    log.append(_record(2))
+    tail, end = log.read(position)
+
+    assert [r['dataset_name'] for r in records] == ['d0', 'd1']
+    assert [r['dataset_name'] for r in tail] == ['d2']
+    assert log.read(end) == ([], end)
+
+
+def test_rollover_and_compaction_keep_positions(tmp_path):
+    log = LineageLog(str(tmp_path), segment_bytes=512, compact_min_segments=2)
+    log.append_many([_record(i) for i in range(20)])
+    _, middle = log.read()
+    for i in range(20, 60):
+        log.append(_record(i))
+    assert len(log._segments()) > 3
+
+    before, end = log.read()
+    assert log.compact()
+    assert len(log._segments()) == 2
+    log.append(_record(60))
+
+    after, _ = log.read()
+    assert after[:60] == before
+    assert log.read(middle)[0] == after[20:]
+    assert [r['dataset_name'] for r in log.read(end)[0]] == ['d60']
+
+
+def test_seed_only_fills_an_empty_log(tmp_path):
+    log = LineageLog(str(tmp_path))
+    assert log.seed(lambda: [_record(0), _record(1)]) == 2
+
+    def reload():
+        raise AssertionError('history is not reloaded once the log has records')
+
+    assert log.seed(reload) == 0
+    log.append(_record(2))
+    assert [r['dataset_name'] for r in LineageLog(str(tmp_path)).read()[0]] == ['d0', 'd1', 'd2']
+
+
+def test_concurrent_writers_do_not_clobber(tmp_path):
+    directory = str(tmp_path)
+    threads = [threading.Thread(target=_write, args=(directory, w, 50)) for w in range(4)]
+    processes = [multiprocessing.Process(target=_write, args=(directory, w, 50)) for w in range(4, 6)]
+    for worker in threads + processes:
+        worker.start()
+    for worker in threads + processes:
+        worker.join()
+
+    records, _ = LineageLog(directory).read()
+    assert len(records) == 300
+    for writer in range(6):
+        assert [r['dataset_name'] for r in records if r['writer'] == writer] == [f'd{i}' for i in range(50)]
@@ -0,0 +1,55 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Add the plugins directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..', 'plugins', 'custom_recipes'))
+
+from quality_engine import (
+    AccuracyCheck, CompletenessCheck, ConsistencyCheck, FreshnessCheck, QualityCheckPlan
+)
+
+
+def _frame(n=1000, seed=3):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'amount': rng.normal(50, 40, n),
+        'merchant_id': rng.integers(0, 120, n),
+        'timestamp': [datetime.now() - timedelta(hours=int(h)) for h in rng.integers(1, 48, n)],
+    })
+    df.loc[rng.random(n) < 0.1, 'amount'] = np.nan
+    return df
+
+
+def _chunks(df, size):
+    return [df.iloc[i:i + size] for i in range(0, len(df), size)]
+
+
+def test_single_pass_matches_whole_frame_checks():
+    df = _frame()
+    reference = pd.Series(np.arange(100))
+    rules = [{'column': 'amount', 'condition': 'between(0, 100)'}]
+
+    results = QualityCheckPlan([
+        CompletenessCheck(),
+        ConsistencyCheck(rules),
+        AccuracyCheck({'merchant_id': reference}),
+        FreshnessCheck('timestamp'),
+    ]).run(_chunks(df, 128))
+
+    for column in df.columns:
+        assert np.isclose(results['completeness'][column]['missing_ratio'], df[column].isnull().mean())
+    assert results['consistency']['amount']['violations'] == (~df['amount'].between(0, 100)).sum()
+    assert np.isclose(results['accuracy']['merchant_id']['match_ratio'], df['merchant_id'].isin(reference).mean())
+    expected_age = (datetime.now() - df['timestamp'].max()).total_seconds() / 3600
+    assert abs(results['freshness']['age_hours'] - expected_age) < 0.01
+    assert results['freshness']['status'] == 'PASS'
+
+
+def test_missing_timestamp_column_and_empty_input():
+    assert FreshnessCheck('missing').result()['status'] == 'ERROR'
+    assert QualityCheckPlan([CompletenessCheck()]).run([]) == {'completeness': {}}
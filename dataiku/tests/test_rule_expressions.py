@@ -0,0 +1,107 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add the plugins directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(current_dir, '..', 'plugins', 'custom_recipes'))
+
+from quality_engine import ConsistencyCheck, QualityCheckPlan
+from rule_expressions import CompiledRule, RuleSyntaxError, compile_rules
+
+
+def _frame():
+    return pd.DataFrame({
+        'amount': [10.0, -5.0, np.nan, 250.0, 40.0],
+        'credit_limit': [100.0, 100.0, 100.0, 200.0, 30.0],
+        'currency': ['USD', 'EUR', 'GBP', 'usd', 'USD'],
+        'code': ['AB1', 'XY9', None, 'ab1', 'ZZ0'],
+        'transaction_date': pd.to_datetime(['2024-01-01', '2024-02-01', '2099-01-01', '2024-03-01', '2024-04-01']),
+    })
+
+
+def _passes(column, condition, df=None):
+    df = _frame() if df is None else df
+    return CompiledRule(column, condition).evaluate(df, df.index).tolist()
+
+
+def test_shorthand_conditions_match_pandas():
+    df = _frame()
+    assert _passes('amount', '>= 0') == df['amount'].ge(0).tolist()
+    assert _passes('amount', 'between(0, 100)') == df['amount'].between(0, 100).tolist()
+    assert _passes('currency', "isin(['USD', 'EUR'])") == [True, True, False, False, True]
+    assert _passes('currency', "in ('USD', 'EUR')") == [True, True, False, False, True]
+    assert _passes('currency', "not in ('USD', 'EUR')") == [False, False, True, True, False]
+    assert _passes('code', 'notnull()') == [True, True, False, True, True]
+    assert _passes('code', r"str.match(r'[A-Z]{2}\d')") == [True, True, False, False, True]
+    assert _passes('transaction_date', '<= pd.Timestamp.now()') == [True, True, False, True, True]
+    assert _passes('transaction_date', '<= now()') == [True, True, False, True, True]
+
+
+def test_full_expressions_and_cross_column_predicates():
+    assert _passes('amount', 'value <= credit_limit') == [True, True, False, False, False]
+    assert _passes('amount', '0 <= value <= credit_limit') == [True, False, False, False, False]
+    assert _passes('amount', "value < 0 or currency == 'EUR'") == [False, True, False, False, False]
+    assert _passes('amount', 'not (value > 100)') == [True, True, True, False, True]
+    assert _passes('amount', 'amount >= -5') == [True, True, False, True, True]
+
+
+def test_not_is_logical_on_numeric_columns_and_constants():
+    df = pd.DataFrame({'amount': [0, 1, 2], 'flag': [0, 1, 0], 'rate': [0.0, np.nan, 2.5]})
+    assert _passes('amount', 'not flag', df) == [True, False, True]
+    assert _passes('amount', 'not value', df) == [True, False, False]
+    assert _passes('amount', 'not rate', df) == [True, True, False]
+    assert _passes('amount', 'not 0', df) == [True, True, True]
+    assert _passes('amount', 'not True', df) == [False, False, False]
+    assert _passes('amount', 'value > 0 and not flag', df) == [False, False, True]
+
+
+@pytest.mark.parametrize('condition', [
+    "__import__('os').system('true')",
+    'value.apply(print)',
+    'value + ',
+    'value in other_column',
+    "[x for x in 'ab']",
+])
+def test_unsafe_or_invalid_conditions_are_rejected(condition):
+    with pytest.raises(RuleSyntaxError):
+        CompiledRule('amount', condition)
+
+
+def test_rules_on_same_column_are_fused():
+    df = _frame()
+    rule_set = compile_rules([
+        {'column': 'amount', 'condition': '>= 0'},
+        {'column': 'amount', 'condition': '<= 100'},
+        {'column': 'currency', 'condition': "in ('USD', 'EUR')"},
+    ])
+    results = rule_set.evaluate(df)
+    assert list(results) == ['amount', 'currency']
+    violated, per_rule = results['amount']
+    assert len(per_rule) == 2
+    assert violated.tolist() == [False, True, True, True, False]
+
+
+def test_consistency_check_reports_violating_rows_across_chunks():
+    df = _frame()
+    rules = [
+        {'column': 'amount', 'condition': '>= 0'},
+        {'column': 'amount', 'condition': '<= 100'},
+        {'column': 'code', 'condition': 'notnull()'},
+    ]
+    chunks = [df.iloc[:2], df.iloc[2:]]
+    result = QualityCheckPlan([ConsistencyCheck(rules)]).run(chunks)['consistency']
+
+    assert result['amount']['violations'] == 3
+    assert result['amount']['violation_indices'] == [1, 2, 3]
+    assert [rule['violations'] for rule in result['amount']['rules']] == [2, 2]
+    assert result['amount']['status'] == 'FAIL'
+    assert result['code']['violation_indices'] == [2]
+
+    capped = ConsistencyCheck(rules, max_violation_indices=2)
+    capped.update(df)
+    assert capped.result()['amount']['violation_indices'] == [1, 2]
+    assert capped.result()['amount']['violations'] == 3
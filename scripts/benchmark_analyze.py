@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Load test the /analyze endpoint.
+
+Start the API against the offline stub backend, then run this script:
+
+    LLM_BACKEND=stub uvicorn application.src.api.main:app --port 8000
+    python scripts/benchmark_analyze.py --requests 2000 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+import aiohttp
+
+MERCHANTS = ['Amazon', 'Walmart', 'Target', 'Unknown', 'New Merchant', 'Best Buy']
+LOCATIONS = ['New York, NY', 'Chicago, IL', 'Austin, TX', 'High Risk Area']
+
+
+def make_transaction(i, rng):
+    """Random transaction payload with a short customer history."""
+    timestamp = datetime(2024, 1, 1) + timedelta(minutes=rng.randint(0, 60 * 24 * 30))
+    history = [
+        {
+            'amount': round(rng.lognormvariate(4, 1), 2),
+            'merchant': rng.choice(MERCHANTS),
+            'date': (timestamp - timedelta(days=d + 1)).date().isoformat()
+        }
+        for d in range(rng.randint(0, 20))
+    ]
+    return {
+        'transaction_id': f'bench-{i}',
+        'amount': round(rng.lognormvariate(4, 1.2), 2),
+        'merchant_name': rng.choice(MERCHANTS),
+        'location': rng.choice(LOCATIONS),
+        'timestamp': timestamp.isoformat(),
+        'customer_history': {'previous_transactions': history, 'location_changes': rng.randint(0, 4)}
+    }
+
+
+async def run(url, total, concurrency, seed):
+    rng = random.Random(seed)
+    payloads = [make_transaction(i, rng) for i in range(total)]
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for payload in payloads:
+        queue.put_nowait(payload)
+
+    async def worker(session):
+        nonlocal errors
+        while not queue.empty():
+            payload = queue.get_nowait()
+            start = time.perf_counter()
+            async with session.post(url, json=payload) as response:
+                await response.read()
+                if response.status != 200:
+                    errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    async with aiohttp.ClientSession() as session:
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"Requests:    {total} ({errors} errors) with concurrency {concurrency}")
+    print(f"Throughput:  {total / elapsed:.1f} req/s")
+    print(f"Latency p50: {quantiles[49] * 1000:.1f} ms")
+    print(f"Latency p95: {quantiles[94] * 1000:.1f} ms")
+    print(f"Latency p99: {quantiles[98] * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://localhost:8000/analyze')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.requests, args.concurrency, args.seed))
+
+
+if __name__ == '__main__':
+    main()